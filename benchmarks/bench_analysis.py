@@ -0,0 +1,108 @@
+"""
+Benchmarks of the analysis of path sampling simulations
+"""
+import numpy as np
+import pandas as pd
+
+import openpathsampling as paths
+from openpathsampling.analysis.tis import StandardTISAnalysis
+from openpathsampling.analysis.tis.core import \
+    steps_to_weighted_trajectories
+
+from .toy_setup import toy_mstis, mstis_steps, toy_trajectories
+
+
+class StandardTISAnalysisStages(object):
+    """
+    The stages of the TIS analysis for the steps of a simulation
+
+    Combining the crossing probabilities needs overlapping histograms,
+    which short runs of the toy system do not reliably give. That stage is
+    covered by :class:`WHAMGenerateLnZ` instead.
+    """
+    params = [200]
+    param_names = ['n_steps']
+
+    def setup(self, n_steps):
+        system = toy_mstis()
+        network = system['network']
+        self.steps = mstis_steps(n_steps)
+        self.ensembles = network.sampling_ensembles
+        self.analysis = StandardTISAnalysis(
+            network=network,
+            scheme=system['scheme'],
+            max_lambda_calcs={
+                transition: {'bin_width': 0.02, 'bin_range': (0.0, 0.5)}
+                for transition in network.sampling_transitions
+            }
+        )
+        self.weighted_trajectories = steps_to_weighted_trajectories(
+            self.steps, self.ensembles)
+
+    def time_weighted_trajectories(self, n_steps):
+        steps_to_weighted_trajectories(self.steps, self.ensembles)
+
+    def time_flux(self, n_steps):
+        self.analysis.flux_method.calculate(self.steps)
+
+    def time_max_lambda_histograms(self, n_steps):
+        for tcp_method in self.analysis.tcp_methods.values():
+            tcp_method.max_lambda_calc.from_weighted_trajectories(
+                self.weighted_trajectories)
+
+    def time_conditional_transition_probability(self, n_steps):
+        self.analysis.ctp_method.from_weighted_trajectories(
+            self.weighted_trajectories)
+
+
+class WHAMGenerateLnZ(object):
+    """
+    The WHAM iteration for histograms of exponentially decaying crossing
+    probabilities
+    """
+    params = [(10, 200)]
+    param_names = ['interfaces x bins']
+
+    def setup(self, shape):
+        n_hists, n_bins = shape
+        lambdas = np.linspace(0.0, 1.0, n_bins)
+        interfaces = np.linspace(0.0, 0.8, n_hists)
+        data = np.array([
+            np.where(lambdas >= interface,
+                     np.exp(-5.0 * (lambdas - interface)), 0.0)
+            for interface in interfaces
+        ]).T
+        self.wham = paths.numerics.WHAM(cutoff=0.05, tol=1e-12)
+        cleaned = self.wham.prep_reverse_cumulative(
+            pd.DataFrame(data=data, index=lambdas))
+        self.guess = self.wham.guess_lnZ_crossing_probability(cleaned)
+        self.sum_k_Hk_Q = self.wham.sum_k_Hk_Q(cleaned)
+        self.unweighting = self.wham.unweighting_tis(cleaned)
+        self.weighted_counts = self.wham.weighted_counts_tis(
+            self.unweighting, self.wham.n_entries(cleaned))
+
+    def time_generate_lnZ(self, shape):
+        self.wham.generate_lnZ(self.guess, self.unweighting,
+                               self.weighted_counts, self.sum_k_Hk_Q)
+
+
+class PathDensityHistogramFill(object):
+    """Filling a path density histogram of toy trajectories"""
+    params = [(10, 100)]
+    param_names = ['trajectories x frames']
+
+    def setup(self, shape):
+        self.trajectories = toy_trajectories(*shape)
+        self.cvs = [
+            paths.FunctionCV('x', lambda snapshot: snapshot.xyz[0][0]),
+            paths.FunctionCV('y', lambda snapshot: snapshot.xyz[0][1])
+        ]
+
+    def time_fill(self, shape):
+        histogram = paths.PathDensityHistogram(
+            cvs=self.cvs,
+            left_bin_edges=(-1.0, -1.0),
+            bin_widths=(0.05, 0.05),
+            interpolate=True
+        )
+        histogram.add_data_to_histogram(self.trajectories)
@@ -0,0 +1,62 @@
+"""
+Benchmarks of the path sampling hot loop and of ensemble checks
+"""
+import time
+
+import numpy as np
+
+from .toy_setup import toy_mstis, path_sampling, SEED
+
+
+class PathSamplingRun(object):
+    """Monte Carlo steps of the toy MSTIS system without storage"""
+    params = [20]
+    param_names = ['n_steps']
+
+    def setup(self, n_steps):
+        toy_mstis()
+        np.random.seed(SEED)
+        self.simulation = path_sampling()
+
+    def time_run(self, n_steps):
+        self.simulation.run(n_steps)
+
+    def track_steps_per_second(self, n_steps):
+        start = time.time()
+        self.simulation.run(n_steps)
+        return n_steps / (time.time() - start)
+
+    track_steps_per_second.unit = 'steps/s'
+
+
+class SequentialEnsembleChecks(object):
+    """
+    The checks done for every frame while a trajectory is generated
+
+    Uses the minus ensembles, which are the longest sequential ensembles of
+    the system, and grows their trajectories frame by frame.
+    """
+    def setup(self):
+        system = toy_mstis()
+        self.samples = [
+            system['initial_conditions'][ensemble]
+            for ensemble in system['network'].special_ensembles['minus']
+        ]
+
+    def time_can_append(self):
+        for sample in self.samples:
+            ensemble = sample.ensemble
+            trajectory = sample.trajectory
+            for length in range(1, len(trajectory) + 1):
+                ensemble.can_append(trajectory[:length])
+
+    def time_can_prepend(self):
+        for sample in self.samples:
+            ensemble = sample.ensemble
+            trajectory = sample.trajectory
+            for length in range(1, len(trajectory) + 1):
+                ensemble.can_prepend(trajectory[-length:])
+
+    def time_call(self):
+        for sample in self.samples:
+            sample.ensemble(sample.trajectory)
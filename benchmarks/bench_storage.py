@@ -0,0 +1,58 @@
+"""
+Benchmarks of writing and opening storage files
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import openpathsampling as paths
+
+from .toy_setup import toy_trajectories, mstis_file
+
+
+class StorageSave(object):
+    """Saving trajectories of the toy engine and syncing them to disk"""
+    params = [(10, 100)]
+    param_names = ['trajectories x frames']
+
+    def setup(self, shape):
+        self.trajectories = toy_trajectories(*shape)
+        self.directory = tempfile.mkdtemp()
+        self.storage = paths.Storage(
+            os.path.join(self.directory, 'save.nc'), 'w')
+
+    def teardown(self, shape):
+        self.storage.close()
+        shutil.rmtree(self.directory)
+
+    def time_save(self, shape):
+        for trajectory in self.trajectories:
+            self.storage.save(trajectory)
+
+    def time_save_and_sync(self, shape):
+        for trajectory in self.trajectories:
+            self.storage.save(trajectory)
+        self.storage.sync_all()
+
+    def track_snapshots_per_second(self, shape):
+        start = time.time()
+        self.time_save_and_sync(shape)
+        return shape[0] * shape[1] / (time.time() - start)
+
+    track_snapshots_per_second.unit = 'snapshots/s'
+
+
+class AnalysisStorageOpen(object):
+    """Opening a file of a toy MSTIS simulation for analysis"""
+    params = [100]
+    param_names = ['n_steps']
+
+    def setup(self, n_steps):
+        self.filename = mstis_file(n_steps)
+
+    def time_open(self, n_steps):
+        paths.AnalysisStorage(self.filename).close()
+
+    def time_open_lazy(self, n_steps):
+        paths.AnalysisStorage(self.filename, lazy=True).close()
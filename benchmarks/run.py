@@ -0,0 +1,255 @@
+"""
+Run the benchmarks without network access and compare with earlier runs
+
+The benchmarks follow the conventions of airspeed velocity (asv), so they
+can also be run with ``asv run`` using ``asv.conf.json``. This runner needs
+nothing but openpathsampling and its dependencies:
+
+.. code-block:: bash
+
+    python -m benchmarks.run                       # run all, save results
+    python -m benchmarks.run -b PathSampling       # only matching names
+    python -m benchmarks.run --compare .benchmarks/<earlier run>.json
+
+Supported conventions: benchmark classes in ``bench_*.py`` modules with
+``time_*`` methods (the time is measured) and ``track_*`` methods (the
+returned value is recorded, higher is better), ``params`` for a single
+parameter, ``setup`` and ``teardown``. Raising ``NotImplementedError`` in
+``setup`` skips a benchmark.
+"""
+from __future__ import print_function
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import timeit
+import traceback
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR),
+                                   '.benchmarks')
+
+
+def discover(pattern=None):
+    """
+    Find all benchmarks
+
+    Parameters
+    ----------
+    pattern : str or None
+        regular expression; only benchmarks with a matching name are
+        returned
+
+    Returns
+    -------
+    list of (str, type, str, object)
+        name, class, method name and parameter of each benchmark
+    """
+    benchmarks = []
+    for filename in sorted(glob.glob(os.path.join(BENCHMARK_DIR,
+                                                  'bench_*.py'))):
+        module_name = os.path.splitext(os.path.basename(filename))[0]
+        module = importlib.import_module('benchmarks.' + module_name)
+        for cls_name, cls in sorted(vars(module).items()):
+            if not isinstance(cls, type) or \
+                    cls.__module__ != module.__name__:
+                continue
+            for method in sorted(vars(cls)):
+                if not method.startswith(('time_', 'track_')):
+                    continue
+                for param in getattr(cls, 'params', [None]):
+                    name = '.'.join([module_name, cls_name, method])
+                    if param is not None:
+                        name += '(%s)' % (param,)
+                    if pattern is None or re.search(pattern, name):
+                        benchmarks.append((name, cls, method, param))
+    return benchmarks
+
+
+def _call(obj, method, param):
+    fnc = getattr(obj, method, None)
+    if fnc is None:
+        return None
+    if param is None:
+        return fnc()
+    return fnc(param)
+
+
+def run_benchmark(cls, method, param, repeat):
+    """
+    Run one benchmark
+
+    Every repeat uses a new instance of the class with its own `setup` and
+    `teardown`, so benchmarks that change their state (like running more
+    steps of a simulation) always start from the same point.
+
+    Returns
+    -------
+    dict or None
+        the result, None if the benchmark is skipped or failed
+    """
+    values = []
+    for _ in range(repeat):
+        obj = cls()
+        try:
+            _call(obj, 'setup', param)
+        except NotImplementedError as err:
+            print('  skipped: %s' % err)
+            return None
+        try:
+            if method.startswith('time_'):
+                start = timeit.default_timer()
+                _call(obj, method, param)
+                values.append(timeit.default_timer() - start)
+            else:
+                values.append(float(_call(obj, method, param)))
+        except Exception:
+            traceback.print_exc()
+            print('  failed')
+            return None
+        finally:
+            _call(obj, 'teardown', param)
+
+    fnc = getattr(cls, method)
+    if method.startswith('time_'):
+        kind, unit = 'time', 's'
+    else:
+        kind, unit = 'track', getattr(fnc, 'unit', 'unit')
+
+    return {
+        'type': kind,
+        'unit': unit,
+        'min': min(values),
+        'max': max(values),
+        'median': float(np.median(values)),
+        'values': values
+    }
+
+
+def _commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR,
+            stderr=subprocess.STDOUT
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _environment():
+    import openpathsampling
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.node(),
+        'numpy': np.__version__,
+        'openpathsampling': getattr(openpathsampling, 'version', None) and
+        openpathsampling.version.version
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the ratio of each benchmark to an earlier run
+
+    For timings a ratio above `threshold` and for tracked values a ratio
+    below `1 / threshold` counts as a regression.
+
+    Returns
+    -------
+    list of str
+        the names of the benchmarks that regressed
+    """
+    regressions = []
+    print('\n%-70s %12s %12s %8s' % ('benchmark', 'before', 'after',
+                                     'ratio'))
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if result is None or before is None:
+            continue
+        ratio = result['median'] / before['median']
+        if result['type'] == 'time':
+            regressed = ratio > threshold
+        else:
+            regressed = ratio < 1.0 / threshold
+        if regressed:
+            regressions.append(name)
+        print('%-70s %12.4g %12.4g %8.2f%s' % (
+            name, before['median'], result['median'], ratio,
+            ' !' if regressed else ''))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run the openpathsampling benchmarks')
+    parser.add_argument('-b', '--bench', default=None,
+                        help='regular expression to select benchmarks')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='number of repeats of each benchmark')
+    parser.add_argument('-o', '--output', default=None,
+                        help='file for the results; default is a new file '
+                             'in %s' % DEFAULT_RESULTS_DIR)
+    parser.add_argument('-c', '--compare', default=None,
+                        help='results of an earlier run to compare with')
+    parser.add_argument('-t', '--threshold', type=float, default=1.2,
+                        help='ratio that counts as a regression')
+    parser.add_argument('--list', action='store_true',
+                        help='only list the benchmarks')
+    opts = parser.parse_args(argv)
+
+    benchmarks = discover(opts.bench)
+    if opts.list:
+        for name, _, _, _ in benchmarks:
+            print(name)
+        return 0
+
+    results = {}
+    for name, cls, method, param in benchmarks:
+        print(name)
+        result = run_benchmark(cls, method, param, opts.repeat)
+        results[name] = result
+        if result is not None:
+            print('  %.4g %s' % (result['median'], result['unit']))
+
+    commit = _commit()
+    output = opts.output
+    if output is None:
+        if not os.path.exists(DEFAULT_RESULTS_DIR):
+            os.makedirs(DEFAULT_RESULTS_DIR)
+        output = os.path.join(DEFAULT_RESULTS_DIR, '%s_%s.json' % (
+            time.strftime('%Y%m%d-%H%M%S'), commit))
+
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'environment': _environment(),
+            'results': results
+        }, f, indent=2, sort_keys=True)
+    print('\nresults written to %s' % output)
+
+    if opts.compare is not None:
+        with open(opts.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, opts.threshold)
+        if regressions:
+            print('\n%d benchmark(s) regressed by more than %.0f%%' % (
+                len(regressions), 100 * (opts.threshold - 1)))
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
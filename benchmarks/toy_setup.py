@@ -0,0 +1,297 @@
+"""
+Toy systems shared by the benchmarks
+
+The systems follow the `toy_model_mstis` examples: a 2D potential energy
+surface with three Gaussian wells, integrated by the toy engine. All
+random numbers are seeded, so every run of a benchmark does the same work.
+Building a system is expensive (bootstrapping), so each one is built once
+per process and shared.
+"""
+from __future__ import print_function
+
+import atexit
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+import openpathsampling as paths
+import openpathsampling.engines.toy as toys
+
+SEED = 12345
+
+_systems = {}
+
+
+def toy_engine():
+    """The toy engine and its potential as in the `toy_model_mstis` setup
+    """
+    pes = (
+        toys.OuterWalls([1.0, 1.0], [0.0, 0.0])
+        + toys.Gaussian(-0.7, [12.0, 12.0], [0.0, 0.4])
+        + toys.Gaussian(-0.7, [12.0, 12.0], [-0.5, -0.5])
+        + toys.Gaussian(-0.7, [12.0, 12.0], [0.5, -0.5])
+    )
+    topology = toys.Topology(n_spatial=2, masses=[1.0, 1.0], pes=pes)
+    integ = toys.LangevinBAOABIntegrator(dt=0.02, temperature=0.1,
+                                         gamma=2.5)
+    options = {
+        'integ': integ,
+        'n_frames_max': 5000,
+        'n_steps_per_frame': 1
+    }
+    return toys.Engine(options=options, topology=topology).named(
+        'toy_engine')
+
+
+def circle(snapshot, center):
+    # imports inside, so the function can be stored with the CV
+    import math
+    return math.sqrt((snapshot.xyz[0][0] - center[0]) ** 2
+                     + (snapshot.xyz[0][1] - center[1]) ** 2)
+
+
+@contextlib.contextmanager
+def _quiet():
+    # bootstrapping and initial conditions report progress on stdout
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        yield
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def _shoot_until(initial_ensemble, desired_ensemble, sample, engine):
+    # as in `toy_mstis_2_run`: shoot forward until the path is A->A
+    mover = paths.ForwardShootMover(ensemble=initial_ensemble,
+                                    selector=paths.UniformSelector(),
+                                    engine=engine)
+    while not desired_ensemble(sample):
+        change = mover.move_core([sample])
+        if desired_ensemble(change.trials[0]):
+            sample = change.trials[0]
+
+    return sample
+
+
+def _build_mstis():
+    np.random.seed(SEED)
+    engine = toy_engine()
+    centers = {'A': [-0.5, -0.5], 'B': [0.5, -0.5], 'C': [0.0, 0.4]}
+    velocities = {'A': [1.0, 0.0], 'B': [-1.0, 0.0], 'C': [0.0, -0.5]}
+    labels = sorted(centers)
+    cvs = {
+        label: paths.CoordinateFunctionCV(
+            name='op' + label, f=circle, center=centers[label])
+        for label in labels
+    }
+    states = {
+        label: paths.CVDefinedVolume(cvs[label], 0.0, 0.2).named(label)
+        for label in labels
+    }
+    interfaces = {
+        label: paths.VolumeInterfaceSet(cvs[label], 0.0, [0.2, 0.3, 0.4])
+        for label in labels
+    }
+    network = paths.MSTISNetwork(
+        [(states[label], interfaces[label]) for label in labels]
+    ).named('mstis')
+    scheme = paths.DefaultScheme(network, engine=engine).named('scheme')
+
+    with _quiet():
+        sample_sets = []
+        for label in labels:
+            snapshot = toys.Snapshot(
+                coordinates=np.array([centers[label]]),
+                velocities=np.array([velocities[label]]),
+                engine=engine
+            )
+            bootstrap = paths.FullBootstrapping(
+                transition=network.from_state[states[label]],
+                snapshot=snapshot,
+                engine=engine,
+                forbidden_states=[states[other] for other in labels
+                                  if other != label]
+            )
+            bootstrap.output_stream = sys.stdout
+            sample_sets.append(bootstrap.run())
+
+        bootstrapped = scheme.initial_conditions_from_trajectories(
+            paths.SampleSet.relabel_replicas_per_ensemble(sample_sets))
+
+        minus_samples = []
+        for minus_ensemble in network.special_ensembles['minus']:
+            state = minus_ensemble.state_vol
+            tis_ensemble = network.from_state[state].ensembles[0]
+            desired_ensemble = paths.TISEnsemble(state, state,
+                                                 tis_ensemble.interface)
+            sample = _shoot_until(tis_ensemble, desired_ensemble,
+                                  bootstrapped[tis_ensemble], engine)
+            minus_samples.append(
+                minus_ensemble.extend_sample_from_trajectories(
+                    sample, engine=engine, replica=-len(minus_samples) - 1))
+
+        initial_conditions = scheme.initial_conditions_from_trajectories(
+            minus_samples, sample_set=bootstrapped)
+
+    scheme.assert_initial_conditions(initial_conditions)
+
+    return {
+        'engine': engine,
+        'cvs': cvs,
+        'states': states,
+        'interfaces': interfaces,
+        'network': network,
+        'scheme': scheme,
+        'initial_conditions': initial_conditions,
+    }
+
+
+def toy_mstis():
+    """
+    The three state MSTIS system of the `toy_model_mstis` examples
+
+    Returns
+    -------
+    dict
+        with the `engine`, the `cvs`, `states` and `interfaces` (each a dict
+        by state label), the `network`, the default move `scheme` and the
+        bootstrapped `initial_conditions`
+    """
+    if 'mstis' not in _systems:
+        _systems['mstis'] = _build_mstis()
+    return _systems['mstis']
+
+
+class _StepCollector(paths.PathSampling):
+    # keeps the steps in memory, so analysis works without a storage
+    def __init__(self, *args, **kwargs):
+        self.steps = []
+        super(_StepCollector, self).__init__(*args, **kwargs)
+        self.output_stream = open(os.devnull, 'w')
+
+    def save_current_step(self):
+        self.steps.append(self._current_step)
+        super(_StepCollector, self).save_current_step()
+
+
+def path_sampling(storage=None):
+    """
+    A path sampling simulation of the MSTIS system
+
+    The simulation keeps all steps in its `steps` list and does not write
+    any progress output.
+
+    Parameters
+    ----------
+    storage : :class:`openpathsampling.Storage` or None
+        the storage to write the steps to
+
+    Returns
+    -------
+    :class:`openpathsampling.PathSampling`
+    """
+    system = toy_mstis()
+    return _StepCollector(
+        storage=storage,
+        sample_set=system['initial_conditions'],
+        move_scheme=system['scheme']
+    )
+
+
+def mstis_steps(n_steps):
+    """The first `n_steps` steps of a seeded MSTIS simulation"""
+    key = ('steps', n_steps)
+    if key not in _systems:
+        np.random.seed(SEED)
+        simulation = path_sampling()
+        simulation.run(n_steps)
+        _systems[key] = simulation.steps
+    return _systems[key]
+
+
+def work_directory():
+    """A temporary directory for files, removed when the process ends"""
+    if 'directory' not in _systems:
+        directory = tempfile.mkdtemp(prefix='ops_benchmarks_')
+        atexit.register(shutil.rmtree, directory, True)
+        _systems['directory'] = directory
+    return _systems['directory']
+
+
+def mstis_file(n_steps):
+    """
+    A file with `n_steps` steps of a seeded MSTIS simulation
+
+    The file is written once per process into :func:`work_directory`.
+
+    Parameters
+    ----------
+    n_steps : int
+        the number of steps
+
+    Returns
+    -------
+    str
+        the name of the file
+
+    Raises
+    ------
+    NotImplementedError
+        if the system cannot be stored in this environment, so that
+        benchmarks that need the file are skipped
+    """
+    key = ('file', n_steps)
+    if key not in _systems:
+        filename = os.path.join(work_directory(), 'mstis_%d.nc' % n_steps)
+        np.random.seed(SEED)
+        storage = paths.Storage(filename, 'w')
+        try:
+            path_sampling(storage).run(n_steps)
+            _systems[key] = filename
+        except Exception as err:
+            _systems[key] = NotImplementedError(
+                'cannot store the MSTIS system: %r' % err)
+        finally:
+            storage.close()
+
+    if isinstance(_systems[key], Exception):
+        raise _systems[key]
+    return _systems[key]
+
+
+def toy_trajectories(n_trajectories, n_frames):
+    """
+    Independent trajectories generated by the toy engine
+
+    Parameters
+    ----------
+    n_trajectories : int
+        the number of trajectories
+    n_frames : int
+        the number of frames of each trajectory
+
+    Returns
+    -------
+    list of :class:`openpathsampling.Trajectory`
+    """
+    key = ('trajectories', n_trajectories, n_frames)
+    if key not in _systems:
+        np.random.seed(SEED)
+        engine = toy_mstis()['engine']
+        length = paths.LengthEnsemble(n_frames).can_append
+        trajectories = []
+        for idx in range(n_trajectories):
+            snapshot = toys.Snapshot(
+                coordinates=np.array([[-0.5 + 0.01 * idx, -0.5]]),
+                velocities=np.array([[1.0, 0.5]]),
+                engine=engine
+            )
+            trajectories.append(engine.generate(snapshot, [length]))
+        _systems[key] = trajectories
+    return _systems[key]
@@ -30,24 +30,31 @@ except ImportError:  # pragma: no cover
     isrelease = str(ops_setup.preferences['released'])
 
 
-from .analysis.path_histogram import PathDensityHistogram
-
-from .analysis.replica_network import (
-    ReplicaNetwork, trace_ensembles_for_replica,
-    trace_replicas_for_ensemble, condense_repeats,
-    ReplicaNetworkGraph
-)
-
-from .analysis.shooting_point_analysis import (
-    ShootingPointAnalysis, SnapshotByCoordinateDict
-)
-
-from .analysis.trajectory_transition_analysis import (
-    TrajectoryTransitionAnalysis,
-    TrajectorySegmentContainer
-)
-
-from .analysis.channel_analysis import ChannelAnalysis
+from .lazy_import import lazy_attributes
+
+# analysis, visualization and numerics need pandas, matplotlib, networkx and
+# scipy, which take most of the time to import. They are only imported when
+# they are used first, e.g. by `paths.ReplicaNetwork`.
+__getattr__, __dir__ = lazy_attributes(__name__, globals(), dict(
+    [(name, ('.analysis.path_histogram', name))
+     for name in ['PathDensityHistogram']] +
+    [(name, ('.analysis.replica_network', name))
+     for name in ['ReplicaNetwork', 'trace_ensembles_for_replica',
+                  'trace_replicas_for_ensemble', 'condense_repeats',
+                  'ReplicaNetworkGraph']] +
+    [(name, ('.analysis.shooting_point_analysis', name))
+     for name in ['ShootingPointAnalysis', 'SnapshotByCoordinateDict']] +
+    [(name, ('.analysis.trajectory_transition_analysis', name))
+     for name in ['TrajectoryTransitionAnalysis',
+                  'TrajectorySegmentContainer']] +
+    [(name, ('.analysis.channel_analysis', name))
+     for name in ['ChannelAnalysis']] +
+    [(name, ('.step_visualizer_2D', name))
+     for name in ['StepVisualizer2D']] +
+    [('analysis', ('.analysis', None)),
+     ('numerics', ('.numerics', None)),
+     ('visualize', ('.visualize', None))]
+))
 
 from .bias_function import (
     BiasFunction, BiasLookupFunction, BiasEnsembleTable,
@@ -69,11 +76,9 @@ from .ensemble import (
     ReversedTrajectoryEnsemble, SequentialEnsemble, VolumeEnsemble,
     SequentialEnsemble, IntersectionEnsemble, UnionEnsemble,
     SingleFrameEnsemble, MinusInterfaceEnsemble, TISEnsemble,
-    OptionalEnsemble, join_ensembles
+    OptionalEnsemble, EnsembleStream, join_ensembles
 )
 
-from .step_visualizer_2D import StepVisualizer2D
-
 from .movechange import (
     EmptyMoveChange, ConditionalSequentialMoveChange,
     MoveChange, PartialAcceptanceSequentialMoveChange,
@@ -94,7 +99,7 @@ from .pathmover import (
     BackwardExtendMover, ForwardExtendMover, MinusMover,
     SingleReplicaMinusMover, PathReversalMover,
     ReplicaExchangeMover, EnsembleHopMover,
-    SequentialMover, ConditionalMover,
+    SequentialMover, ConditionalMover, ConcurrentMover,
     PathSimulatorMover, PathReversalSet,
     SampleMover, StateSwapMover, FinalSubtrajectorySelectMover, EngineMover,
     FirstSubtrajectorySelectMover,
@@ -108,7 +113,8 @@ from .pathmover import (
 
 from .pathsimulators import (
     PathSimulator, FullBootstrapping, Bootstrapping, PathSampling, MCStep,
-    CommittorSimulation, DirectSimulation, ShootFromSnapshotsSimulation
+    CommittorSimulation, DirectSimulation, ShootFromSnapshotsSimulation,
+    MultiWalkerPathSampling
 )
 
 from .sample import Sample, SampleSet
@@ -164,12 +170,10 @@ from .pathmovers import *
 from .collectivevariables import *
 from .pathmovers.move_schemes import *
 
-import openpathsampling.numerics as numerics
-
 from openpathsampling.engines import Trajectory, BaseSnapshot
 
 # until engines are proper subpackages, built-ins need to be findable!
-import openpathsampling.engines.openmm #as openmm
+# (`openmm` and `gromacs` are imported when first used)
 import openpathsampling.engines.toy #as toy
 
 
@@ -1,6 +1,15 @@
-from .path_histogram import PathHistogram, PathDensityHistogram
-from .channel_analysis import ChannelAnalysis
-from .replica_network import ReplicaNetwork, ReplicaNetworkGraph
-from .shooting_point_analysis import ShootingPointAnalysis
-from . import tis
-from . import tools
+from openpathsampling.lazy_import import lazy_attributes
+
+# most analysis modules need pandas, matplotlib, networkx or scipy; they are
+# only imported when used, so that e.g. `analysis.tools` stays fast to import
+__getattr__, __dir__ = lazy_attributes(__name__, globals(), {
+    'PathHistogram': ('.path_histogram', 'PathHistogram'),
+    'PathDensityHistogram': ('.path_histogram', 'PathDensityHistogram'),
+    'ChannelAnalysis': ('.channel_analysis', 'ChannelAnalysis'),
+    'ReplicaNetwork': ('.replica_network', 'ReplicaNetwork'),
+    'ReplicaNetworkGraph': ('.replica_network', 'ReplicaNetworkGraph'),
+    'ShootingPointAnalysis': ('.shooting_point_analysis',
+                              'ShootingPointAnalysis'),
+    'tis': ('.tis', None),
+    'tools': ('.tools', None),
+})
@@ -2,6 +2,7 @@ import collections
 import pandas as pd
 import numpy as np
 
+import openpathsampling as paths
 from openpathsampling.netcdfplus import StorableNamedObject
 
 class ChannelAnalysis(StorableNamedObject):
@@ -13,7 +14,7 @@ class ChannelAnalysis(StorableNamedObject):
 
     Parameters
     ----------
-    steps : iterable of :class:`.MCStep`
+    steps : iterable of :class:`.MCStep` or :class:`.StepIndex`
         the steps to analyze
     channels: dict of {string: :class:`.Ensemble`}
         names (keys) and ensembles (values) representing subtrajectories of the
@@ -71,6 +72,38 @@ class ChannelAnalysis(StorableNamedObject):
         """
         return step.mccycle
 
+    def _step_trajectories(self, steps):
+        """Step number and active trajectory of the replica in each step.
+
+        For a :class:`.StepIndex`, a trajectory is only loaded when it
+        differs from the one in the previous step.
+
+        Parameters
+        ----------
+        steps : iterable of :class:`.MCStep` or :class:`.StepIndex`
+            the steps
+
+        Yields
+        ------
+        tuple(int, :class:`.Trajectory`)
+            step number and trajectory
+        """
+        if isinstance(steps, paths.storage.StepIndex):
+            column = steps.replica_column(self.replica)
+            trajectories = steps.storage.trajectories
+            prev_idx = None
+            traj = None
+            for mccycle, idx in zip(steps.mccycle.tolist(),
+                                    steps.replica_trajectory[:, column]):
+                if idx != prev_idx:
+                    traj = trajectories[int(idx)]
+                    prev_idx = idx
+                yield mccycle, traj
+        else:
+            for step in steps:
+                traj = step.active[self.replica].trajectory
+                yield self._step_num(step), traj
+
     def _analyze(self, steps):
         """Primary analysis routine.
 
@@ -80,16 +113,14 @@ class ChannelAnalysis(StorableNamedObject):
 
         Parameters
         ----------
-        steps : iterable of :class:`.MCStep`
+        steps : iterable of :class:`.MCStep` or :class:`.StepIndex`
             the steps to analyze
         """
         # for now, this assumes only one ensemble per channel
         # (would like that to change in the future)
         prev_traj = None
         last_start = {c: None for c in self._results}
-        for step in steps:
-            step_num = self._step_num(step)
-            traj = step.active[self.replica].trajectory
+        for step_num, traj in self._step_trajectories(steps):
             if prev_traj is None:
                 prev_result = {c: len(self.channels[c].split(traj)) > 0
                                for c in self.channels}
@@ -1,4 +1,5 @@
 import collections
+import numpy as np
 import openpathsampling as paths
 import pandas as pd
 import scipy.sparse
@@ -110,6 +111,8 @@ class ReplicaNetwork(object):
     def _analysis_from_steps(self, steps=None):
         if steps is None:
             raise RuntimeError("No steps given to analyze!")
+        if isinstance(steps, paths.storage.StepIndex):
+            return self._analysis_from_step_index(steps)
         n_trials = 0
         analysis = {}
         analysis['n_trials'] = {}
@@ -140,10 +143,40 @@ class ReplicaNetwork(object):
         return analysis['n_trials'], analysis['n_accepted']
 
 
+    @staticmethod
+    def _analysis_from_step_index(index):
+        pathmovers = index.storage.pathmovers
+        ensembles = index.storage.ensembles
+        is_change_mover = {
+            idx: bool(pathmovers[int(idx)].is_ensemble_change_mover)
+            for idx in set(index.canonical_mover.tolist()) if idx >= 0
+        }
+        n_trials = 0
+        n_accepted = collections.Counter()
+        for row in range(1, len(index)):
+            if not is_change_mover.get(index.canonical_mover[row], False):
+                continue
+            n_trials += 1
+            old_replicas = index.ensemble_replica[row - 1]
+            new_replicas = index.ensemble_replica[row]
+            for col in np.flatnonzero((old_replicas >= 0)
+                                      & (old_replicas != new_replicas)):
+                new_ens = index.replica_ensemble[
+                    row, index.replica_column(old_replicas[col])]
+                hop = (ensembles[int(index.ensembles[col])],
+                       ensembles[int(new_ens)])
+                n_accepted[hop] += 1
+
+        n_trials = {key: n_trials for key in n_accepted}
+        return n_trials, dict(n_accepted)
+
     def _traces_from_steps(self, steps):
         """
         Calculates all the traces (fixed replica or fixed ensemble).
         """
+        if isinstance(steps, paths.storage.StepIndex):
+            return self._traces_from_step_index(steps)
+
         full_traces = collections.defaultdict(list)
         for step in steps:
             for sample in step.active:
@@ -156,6 +189,22 @@ class ReplicaNetwork(object):
         return traces
 
 
+    @staticmethod
+    def _traces_from_step_index(index):
+        ensembles = index.storage.ensembles
+        traces = {}
+        for col, ens_idx in enumerate(index.ensembles):
+            replicas = index.ensemble_replica[:, col]
+            traces[ensembles[int(ens_idx)]] = condense_repeats(
+                replicas[replicas >= 0].tolist())
+
+        for col, replica in enumerate(index.replicas.tolist()):
+            ens_column = index.replica_ensemble[:, col]
+            traces[replica] = condense_repeats(
+                [ensembles[int(idx)] for idx in ens_column if idx >= 0])
+
+        return traces
+
     def _transitions_from_traces(self, traces):
         """
         Calculate the transitions based on the trace of a given replica.
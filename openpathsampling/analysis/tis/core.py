@@ -14,8 +14,9 @@ def steps_to_weighted_trajectories(steps, ensembles):
 
     Parameters
     ----------
-    steps: iterable of :class:`.MCStep`
-        steps to be analyzed
+    steps: iterable of :class:`.MCStep` or :class:`.StepIndex`
+        steps to be analyzed. With a :class:`.StepIndex` only the distinct
+        trajectories are loaded from storage
     ensembles: list of :class:`.Ensemble`
         ensembles to include in the list. Note: ensemble must be given!
 
@@ -26,6 +27,9 @@ def steps_to_weighted_trajectories(steps, ensembles):
         trajectory associated with that ensemble to its counter of time
         spent in the ensemble.
     """
+    if isinstance(steps, paths.storage.StepIndex):
+        return _step_index_to_weighted_trajectories(steps, ensembles)
+
     results = {e: collections.Counter() for e in ensembles}
 
     # loop over blocks # TODO: add blocksize parameter, test various sizes
@@ -43,6 +47,21 @@ def steps_to_weighted_trajectories(steps, ensembles):
     return results
 
 
+def _step_index_to_weighted_trajectories(index, ensembles):
+    trajectories = index.storage.trajectories
+    results = {}
+    for ens in ensembles:
+        column = index.ensemble_trajectory[:, index.ensemble_column(ens)]
+        if np.any(column < 0):
+            raise KeyError(ens)
+        counts = collections.Counter(column.tolist())
+        results[ens] = collections.Counter({
+            trajectories[idx]: count for idx, count in counts.items()
+        })
+
+    return results
+
+
 class TransitionDictResults(StorableNamedObject):
     """Analysis result object for properties of a transition.
 
@@ -1,7 +1,6 @@
 import openpathsampling as paths
 import openpathsampling.netcdfplus.chaindict as cd
-from openpathsampling.integration_tools import md, error_if_no_mdtraj
-from openpathsampling.engines.openmm.tools import trajectory_to_mdtraj
+from openpathsampling.integration_tools import error_if_no_mdtraj
 from openpathsampling.netcdfplus import WeakKeyCache, \
     ObjectJSON, create_to_dict, ObjectStore, PseudoAttribute
 
@@ -567,6 +566,8 @@ class MDTrajFunctionCV(CoordinateFunctionCV):
     def _eval(self, items):
         trajectory = paths.Trajectory(items)
 
+        from openpathsampling.engines.openmm.tools import \
+            trajectory_to_mdtraj
         t = trajectory_to_mdtraj(trajectory, self.topology.mdtraj)
         return self.cv_callable(t, **self.kwargs)
 
@@ -656,6 +657,8 @@ class MSMBFeaturizerCV(CoordinateGeneratorCV):
         trajectory = paths.Trajectory(items)
 
         # create an mdtraj trajectory out of it
+        from openpathsampling.engines.openmm.tools import \
+            trajectory_to_mdtraj
         ptraj = trajectory_to_mdtraj(trajectory, self.topology.mdtraj)
 
         # run the featurizer
@@ -742,6 +745,8 @@ class PyEMMAFeaturizerCV(MSMBFeaturizerCV):
     def _eval(self, items):
         trajectory = paths.Trajectory(items)
 
+        from openpathsampling.engines.openmm.tools import \
+            trajectory_to_mdtraj
         t = trajectory_to_mdtraj(trajectory, self.topology.mdtraj)
         return self._instance.transform(t)
 
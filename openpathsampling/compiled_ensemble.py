@@ -0,0 +1,600 @@
+'''
+Evaluation of ensembles on precomputed per-frame volume memberships.
+
+Most ensembles used in path sampling (the ensembles of TIS and the minus
+interface) are sequential ensembles built from volume and length
+ensembles. Whether a trajectory is in such an ensemble only depends on
+which volumes each frame is in. Here, the sub-ensembles of a sequential
+ensemble are compiled to matchers that work on these memberships: every
+volume is evaluated once for the whole trajectory (see
+:meth:`.Volume.evaluate_trajectory`), and a matcher can tell the length of
+the longest subtrajectory (starting at a given frame) that a sub-ensemble
+can be extended to by a lookup into the membership masks, instead of
+calling the ensemble on every slice of the trajectory.
+
+The matching itself is the same deterministic automaton as in
+:meth:`.SequentialEnsemble.transition_frames`: the states are the indices
+of the sub-ensembles, and each transition jumps to the end of the longest
+subtrajectory of the current sub-ensemble.
+
+Ensembles that cannot be compiled are "opaque"; for them,
+:func:`compile_ensemble` returns None and the caller falls back to
+calling the ensemble itself.
+'''
+
+import numpy as np
+
+import openpathsampling as paths
+
+
+class FrameMasks(object):
+    """
+    Volume memberships of all frames of a trajectory.
+
+    Masks are computed on request, once per volume.
+
+    Parameters
+    ----------
+    trajectory : :class:`.Trajectory`
+        the trajectory
+    """
+
+    def __init__(self, trajectory):
+        try:
+            self.frames = trajectory.as_proxies()
+        except AttributeError:
+            self.frames = list(trajectory)
+        self.n_frames = len(self.frames)
+        self._masks = {}
+        self._indices = {}
+
+    def mask(self, volume):
+        """
+        Membership of all frames in a volume.
+
+        Parameters
+        ----------
+        volume : :class:`.Volume`
+            the volume
+
+        Returns
+        -------
+        np.ndarray of bool
+            for each frame, whether it is in the volume
+        """
+        key = id(volume)
+        try:
+            return self._masks[key][1]
+        except KeyError:
+            mask = volume.evaluate_trajectory(self.frames)
+            # keep the volume, so that its id is not reused
+            self._masks[key] = (volume, mask)
+            return mask
+
+    def indices(self, volume, value):
+        """
+        Sorted indices of the frames with a given membership in a volume.
+
+        Parameters
+        ----------
+        volume : :class:`.Volume`
+            the volume
+        value : bool
+            the membership to look for
+
+        Returns
+        -------
+        np.ndarray of int
+            the indices of all frames with ``volume(frame) == value``
+        """
+        key = (id(volume), value)
+        try:
+            return self._indices[key]
+        except KeyError:
+            mask = self.mask(volume)
+            indices = np.flatnonzero(mask == value)
+            self._indices[key] = indices
+            return indices
+
+    def next_index(self, volume, value, first):
+        """
+        First frame at or after `first` with a given membership.
+
+        Parameters
+        ----------
+        volume : :class:`.Volume`
+            the volume
+        value : bool
+            the membership to look for
+        first : int
+            the first frame to consider
+
+        Returns
+        -------
+        int
+            the index of the frame; the number of frames if there is none
+        """
+        indices = self.indices(volume, value)
+        pos = np.searchsorted(indices, first)
+        if pos < len(indices):
+            return int(indices[pos])
+        else:
+            return self.n_frames
+
+
+class Matcher(object):
+    """
+    Compiled version of an ensemble, for subtrajectories of a trajectory.
+
+    The subtrajectory starting at frame `first` with `length` frames is
+    ``trajectory[first:first + length]``. All methods get the
+    :class:`.FrameMasks` of the trajectory.
+
+    Attributes
+    ----------
+    prefix_closed : bool
+        True if the lengths for which :meth:`.can_continue` is True are
+        always ``1, ..., n`` for some n
+    append_is_call : bool
+        True if `can_append` and `__call__` of the ensemble agree for all
+        non-empty trajectories
+    """
+    prefix_closed = True
+    append_is_call = False
+
+    def call(self, masks, first, length):
+        """Result of `ensemble(subtrajectory)`"""
+        raise NotImplementedError
+
+    def can_append(self, masks, first, length):
+        """Result of `ensemble.can_append(subtrajectory)`"""
+        raise NotImplementedError
+
+    def strict_can_append(self, masks, first, length):
+        """Result of `ensemble.strict_can_append(subtrajectory)`"""
+        return self.can_append(masks, first, length)
+
+    def can_continue(self, masks, first, length):
+        """Whether a sequential ensemble would keep extending the
+        subtrajectory; see :meth:`.SequentialEnsemble._find_subtraj_final`
+        """
+        return (self.can_append(masks, first, length)
+                or self.call(masks, first, length))
+
+    def extent(self, masks, first):
+        """
+        Longest subtrajectory starting at `first` that the ensemble can be
+        extended to.
+
+        Returns
+        -------
+        int
+            the largest n such that :meth:`.can_continue` is True for all
+            lengths ``1, ..., n``; at most the number of remaining frames
+        """
+        available = masks.n_frames - first
+        length = 0
+        while length < available and \
+                self.can_continue(masks, first, length + 1):
+            length += 1
+        return length
+
+
+class ConstantMatcher(Matcher):
+    """Matcher of :class:`.EmptyEnsemble` and :class:`.FullEnsemble`"""
+    append_is_call = True
+
+    def __init__(self, value):
+        self.value = value
+
+    def call(self, masks, first, length):
+        return self.value
+
+    def can_append(self, masks, first, length):
+        return self.value
+
+    def extent(self, masks, first):
+        return masks.n_frames - first if self.value else 0
+
+
+class AllInVolumeMatcher(Matcher):
+    """Matcher of :class:`.AllInXEnsemble` and :class:`.AllOutXEnsemble`
+    """
+    append_is_call = True
+
+    def __init__(self, volume, value):
+        self.volume = volume
+        self.value = value
+
+    def extent(self, masks, first):
+        return masks.next_index(self.volume, not self.value, first) - first
+
+    def call(self, masks, first, length):
+        return 0 < length <= self.extent(masks, first)
+
+    def can_append(self, masks, first, length):
+        return length <= self.extent(masks, first)
+
+
+class PartInVolumeMatcher(Matcher):
+    """Matcher of :class:`.PartInXEnsemble` and :class:`.PartOutXEnsemble`
+    """
+
+    def __init__(self, volume, value):
+        self.volume = volume
+        self.value = value
+
+    def call(self, masks, first, length):
+        return masks.next_index(self.volume, self.value, first) < \
+            first + length
+
+    def can_append(self, masks, first, length):
+        return True
+
+    def extent(self, masks, first):
+        return masks.n_frames - first
+
+
+class LengthMatcher(Matcher):
+    """Matcher of :class:`.LengthEnsemble`"""
+
+    def __init__(self, ensemble):
+        self.ensemble = ensemble
+        length = ensemble.length
+        if type(length) is int:
+            self.max_length = length
+        elif length.stop is None:
+            self.max_length = None
+        elif length.start <= length.stop - 1:
+            self.max_length = length.stop - 1
+        else:
+            self.max_length = max(length.stop - 2, 0)
+
+    def call(self, masks, first, length):
+        return self.ensemble(_Length(length))
+
+    def can_append(self, masks, first, length):
+        return self.ensemble._can_extend_length(length)
+
+    def extent(self, masks, first):
+        available = masks.n_frames - first
+        if self.max_length is None:
+            return available
+        else:
+            return min(self.max_length, available)
+
+
+class _Length(object):
+    """Stand-in for a trajectory of a given length"""
+    def __init__(self, length):
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+
+class CombinationMatcher(Matcher):
+    """Matcher of :class:`.UnionEnsemble` and :class:`.IntersectionEnsemble`
+    """
+
+    def __init__(self, matcher1, matcher2, union):
+        self.matcher1 = matcher1
+        self.matcher2 = matcher2
+        self.union = union
+        both_closed = matcher1.prefix_closed and matcher2.prefix_closed
+        self.append_is_call = (matcher1.append_is_call
+                               and matcher2.append_is_call)
+        if union:
+            # can_continue is the union of the two can_continue
+            self.prefix_closed = both_closed
+        else:
+            # only the intersection of the two can_continue if one of the
+            # two has the same can_append and __call__
+            self.prefix_closed = both_closed and (
+                matcher1.append_is_call or matcher2.append_is_call
+            )
+
+    def _combine(self, fnc1, fnc2, masks, first, length):
+        a = fnc1(masks, first, length)
+        if a == self.union:
+            # short-circuit, as in EnsembleCombination
+            return a
+        return fnc2(masks, first, length)
+
+    def call(self, masks, first, length):
+        return self._combine(self.matcher1.call, self.matcher2.call,
+                             masks, first, length)
+
+    def can_append(self, masks, first, length):
+        return self._combine(self.matcher1.can_append,
+                             self.matcher2.can_append, masks, first, length)
+
+    def strict_can_append(self, masks, first, length):
+        return self._combine(self.matcher1.strict_can_append,
+                             self.matcher2.strict_can_append,
+                             masks, first, length)
+
+    def extent(self, masks, first):
+        if not self.prefix_closed:
+            return super(CombinationMatcher, self).extent(masks, first)
+        extent1 = self.matcher1.extent(masks, first)
+        if self.union:
+            if extent1 == masks.n_frames - first:
+                return extent1
+            return max(extent1, self.matcher2.extent(masks, first))
+        else:
+            if extent1 == 0:
+                return extent1
+            return min(extent1, self.matcher2.extent(masks, first))
+
+
+class SequenceMatcher(Matcher):
+    """Matcher of :class:`.SequentialEnsemble`
+
+    Sequences are only compiled as a whole (e.g., to scan a trajectory in
+    :meth:`.Ensemble.iter_valid_slices`), never as sub-ensembles of other
+    sequences.
+    """
+    prefix_closed = False
+
+    def __init__(self, matchers):
+        self.matchers = matchers
+
+    def call(self, masks, first, length):
+        return sequence_call(self.matchers, masks, first, first + length)
+
+    def can_append(self, masks, first, length):
+        return sequence_can_append(self.matchers, masks, first,
+                                   first + length, strict=False)
+
+    def strict_can_append(self, masks, first, length):
+        return sequence_can_append(self.matchers, masks, first,
+                                   first + length, strict=True)
+
+
+def _overrides(ensemble, names, cls):
+    return any(getattr(type(ensemble), name) is not getattr(cls, name)
+               for name in names)
+
+
+def _same_call(ensemble):
+    # the TIS ensemble only changes __call__ for candidate trajectories,
+    # which are never tested here
+    return isinstance(ensemble, paths.TISEnsemble) and not _overrides(
+        ensemble, ['__call__'], paths.TISEnsemble)
+
+
+def compile_ensemble(ensemble, sequences=False):
+    """
+    Compile an ensemble to a :class:`.Matcher`.
+
+    Parameters
+    ----------
+    ensemble : :class:`.Ensemble`
+        the ensemble
+    sequences : bool
+        if True, :class:`.SequentialEnsemble` are compiled, too; otherwise
+        they are opaque
+
+    Returns
+    -------
+    :class:`.Matcher` or None
+        the matcher; None if the ensemble is opaque
+    """
+    ens_type = type(ensemble)
+    if ens_type in (paths.EmptyEnsemble, paths.FullEnsemble):
+        return ConstantMatcher(ens_type is paths.FullEnsemble)
+    elif ens_type in (paths.AllInXEnsemble, paths.AllOutXEnsemble):
+        return AllInVolumeMatcher(ensemble.volume,
+                                  ens_type is paths.AllInXEnsemble)
+    elif ens_type in (paths.PartInXEnsemble, paths.PartOutXEnsemble):
+        return PartInVolumeMatcher(ensemble.volume,
+                                   ens_type is paths.PartInXEnsemble)
+    elif ens_type is paths.LengthEnsemble:
+        length = ensemble.length
+        if type(length) is not int and (length.start is None
+                                        or length.step is not None):
+            return None
+        return LengthMatcher(ensemble)
+    elif ens_type in (paths.UnionEnsemble, paths.IntersectionEnsemble):
+        matcher1 = compile_ensemble(ensemble.ensemble1, sequences)
+        matcher2 = compile_ensemble(ensemble.ensemble2, sequences)
+        if matcher1 is None or matcher2 is None:
+            return None
+        return CombinationMatcher(matcher1, matcher2,
+                                  ens_type is paths.UnionEnsemble)
+    elif isinstance(ensemble, paths.WrappedEnsemble) and not _overrides(
+            ensemble, ['_alter', 'can_append', 'strict_can_append'],
+            paths.WrappedEnsemble) and (
+                _same_call(ensemble)
+                or not _overrides(ensemble, ['__call__'],
+                                  paths.WrappedEnsemble)):
+        # e.g., OptionalEnsemble and SingleFrameEnsemble
+        return compile_ensemble(ensemble._new_ensemble, sequences)
+    elif sequences and isinstance(ensemble, paths.SequentialEnsemble):
+        if _overrides(ensemble, ['can_append', 'strict_can_append',
+                                 '_generic_can_append'],
+                      paths.SequentialEnsemble):
+            return None
+        matchers = ensemble._compiled_matchers()
+        if matchers is None:
+            return None
+        return SequenceMatcher(matchers)
+    else:
+        return None
+
+
+def compile_sequence(ensembles):
+    """
+    Compile the sub-ensembles of a :class:`.SequentialEnsemble`.
+
+    Parameters
+    ----------
+    ensembles : list of :class:`.Ensemble`
+        the sub-ensembles
+
+    Returns
+    -------
+    list of :class:`.Matcher` or None
+        the matchers; None if any sub-ensemble is opaque
+    """
+    matchers = [compile_ensemble(ens) for ens in ensembles]
+    if any(matcher is None for matcher in matchers):
+        return None
+    return matchers
+
+
+def transition_frames(matchers, masks, first=0):
+    """
+    Greedy assignment of frames to the sub-ensembles of a sequence.
+
+    Same as :meth:`.SequentialEnsemble.transition_frames`, but for the
+    compiled sub-ensembles.
+
+    Parameters
+    ----------
+    matchers : list of :class:`.Matcher`
+        the compiled sub-ensembles
+    masks : :class:`.FrameMasks`
+        the memberships of the trajectory
+    first : int
+        the frame where the first sub-ensemble starts
+
+    Returns
+    -------
+    list of int
+        the final frames (exclusive) of the subtrajectories assigned to
+        the sub-ensembles; shorter than the number of sub-ensembles if the
+        assignment fails
+    """
+    final_ens = len(matchers) - 1
+    transitions = []
+    subtraj_first = first
+    for ens_num, matcher in enumerate(matchers):
+        subtraj_final = subtraj_first + matcher.extent(masks, subtraj_first)
+        if subtraj_final > subtraj_first:
+            transitions.append(subtraj_final)
+            if ens_num == final_ens:
+                return transitions
+            subtraj_first = subtraj_final
+        elif matcher.call(masks, subtraj_first, 0):
+            transitions.append(subtraj_final)
+        else:
+            return transitions
+    return transitions
+
+
+def sequence_call(matchers, masks, first=0, final=None):
+    """
+    Whether a subtrajectory is in a sequential ensemble.
+
+    Same as :meth:`.SequentialEnsemble.__call__` for
+    ``trajectory[first:final]``.
+
+    Parameters
+    ----------
+    matchers : list of :class:`.Matcher`
+        the compiled sub-ensembles
+    masks : :class:`.FrameMasks`
+        the memberships of the trajectory
+    first : int
+        first frame of the subtrajectory
+    final : int or None
+        final frame (exclusive) of the subtrajectory; None for the end of
+        the trajectory
+
+    Returns
+    -------
+    bool
+        True if the subtrajectory is in the ensemble
+    """
+    if final is None:
+        final = masks.n_frames
+    if final != masks.n_frames:
+        # the greedy assignment can not look beyond the end of the
+        # subtrajectory
+        masks = _TruncatedMasks(masks, final)
+    transitions = transition_frames(matchers, masks, first)
+    if len(transitions) != len(matchers) or transitions[-1] != final:
+        return False
+
+    subtraj_first = first
+    for matcher, subtraj_final in zip(matchers, transitions):
+        if not matcher.call(masks, subtraj_first,
+                            subtraj_final - subtraj_first):
+            return False
+        subtraj_first = subtraj_final
+    return True
+
+
+def sequence_can_append(matchers, masks, first=0, final=None,
+                        strict=False):
+    """
+    Whether a subtrajectory can be appended in a sequential ensemble.
+
+    Same as :meth:`.SequentialEnsemble.can_append` (or
+    :meth:`.SequentialEnsemble.strict_can_append`, if `strict`) for
+    ``trajectory[first:final]``.
+
+    Parameters
+    ----------
+    matchers : list of :class:`.Matcher`
+        the compiled sub-ensembles
+    masks : :class:`.FrameMasks`
+        the memberships of the trajectory
+    first : int
+        first frame of the subtrajectory
+    final : int or None
+        final frame (exclusive) of the subtrajectory; None for the end of
+        the trajectory
+    strict : bool
+        if True, the first frame has to be in the first sub-ensemble
+
+    Returns
+    -------
+    bool
+        True if the subtrajectory can be appended
+    """
+    if final is None:
+        final = masks.n_frames
+    if final != masks.n_frames:
+        masks = _TruncatedMasks(masks, final)
+    final_ens = len(matchers) - 1
+    ens_first = 0
+    ens_num = 0
+    subtraj_first = first
+    while ens_num <= final_ens:
+        matcher = matchers[ens_num]
+        subtraj_final = subtraj_first + matcher.extent(masks, subtraj_first)
+        if subtraj_final > subtraj_first:
+            if ens_num == final_ens:
+                return subtraj_final == final and matcher.can_append(
+                    masks, subtraj_first, subtraj_final - subtraj_first)
+            ens_num += 1
+            subtraj_first = subtraj_final
+        elif subtraj_final == final:
+            # all frames assigned, the next frames might be in the
+            # remaining sub-ensembles
+            return True
+        elif matcher.call(masks, subtraj_first, 0):
+            ens_num += 1
+        elif ens_first == final_ens or strict:
+            return False
+        else:
+            # try sequences starting with the next sub-ensemble
+            ens_first += 1
+            ens_num = ens_first
+            subtraj_first = first
+    # more frames than sub-ensembles
+    return False
+
+
+class _TruncatedMasks(object):
+    """Memberships of a trajectory, ending at frame `n_frames`"""
+    def __init__(self, masks, n_frames):
+        self.masks = masks
+        self.n_frames = n_frames
+
+    def next_index(self, volume, value, first):
+        return min(self.masks.next_index(volume, value, first),
+                   self.n_frames)
@@ -1,5 +1,6 @@
 from .snapshot import BaseSnapshot, SnapshotFactory, SnapshotDescriptor
 from .trajectory import Trajectory
+from .frame_buffer import FrameBuffer, FrameBufferSnapshot
 
 from .topology import Topology
 
@@ -13,4 +14,10 @@ from .external_engine import ExternalEngine
 
 from . import external_snapshots
 
-from . import gromacs
+from openpathsampling.lazy_import import lazy_attributes
+
+# engines that need mdtraj or openmm are imported when first used
+__getattr__, __dir__ = lazy_attributes(__name__, globals(), {
+    'gromacs': ('.gromacs', None),
+    'openmm': ('.openmm', None),
+})
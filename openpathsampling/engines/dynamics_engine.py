@@ -101,6 +101,13 @@ class DynamicsEngine(StorableNamedObject):
             old trajectories, e.g. `lambda t: t[:10]` would restart with the
             first 10 frames
 
+    n_frames_chunk : int, default: 1
+        number of frames generated in one block by
+        :meth:`.generate_n_frames_until` during :meth:`.iter_generate`. The
+        stop conditions are checked for all frames of a block at once, and
+        frames after the first stopping frame are discarded. The default of
+        1 generates frame by frame with :meth:`.generate_next_frame`.
+
     Notes
     -----
     Should be considered an abstract class: only its subclasses can be
@@ -118,7 +125,8 @@ class DynamicsEngine(StorableNamedObject):
         'retries_when_error': 0,
         'retries_when_max_length': 0,
         'on_retry': 'full',
-        'on_error': 'fail'
+        'on_error': 'fail',
+        'n_frames_chunk': 1
     }
 
     #units = {
@@ -354,6 +362,75 @@ class DynamicsEngine(StorableNamedObject):
         when you hit a stop condition."""
         pass
 
+    def generate_n_frames_until(self, n_frames, until=None):
+        """
+        Generate a block of frames, stopping at a condition.
+
+        Engines that can run several frames without returning to Python
+        (or that can build the snapshots of a block more cheaply) should
+        override this. The default calls :meth:`.generate_next_frame`.
+
+        Parameters
+        ----------
+        n_frames : int
+            maximal number of frames to generate
+        until : function(list of :class:`.BaseSnapshot`) -> int or None
+            called once with all frames of the block; returns the index of
+            the first frame at which the simulation has to stop, or None.
+            The frames after that one are discarded, and the engine is reset
+            to the stopping frame.
+
+        Returns
+        -------
+        list of :class:`.BaseSnapshot`
+            the generated frames, in the order they were generated. If a
+            frame is not valid (see :meth:`.is_valid_snapshot`), it is the
+            last frame of the block.
+        """
+        frames = []
+        for _ in range(n_frames):
+            snapshot = self.generate_next_frame()
+            frames.append(snapshot)
+            if not self.is_valid_snapshot(snapshot):
+                break
+
+        return self._truncate_frames(frames, until)
+
+    def _truncate_frames(self, frames, until):
+        """Cut a block of frames after the stopping frame given by `until`
+        """
+        if until is not None:
+            stop_index = until(frames)
+            if stop_index is not None and stop_index < len(frames) - 1:
+                frames = frames[:stop_index + 1]
+                self.current_snapshot = frames[-1]
+        return frames
+
+    def _chunk_until(self, streams, direction, stop_indices):
+        """Stop condition of a block of frames, based on continue streams
+
+        The streams are fed with the frames of the block (as they are added
+        to the trajectory), and the stopping index is recorded in
+        `stop_indices`.
+        """
+        def until(frames):
+            new_frames = []
+            for snapshot in frames:
+                if not self.is_valid_snapshot(snapshot):
+                    break
+                if direction > 0:
+                    new_frames.append(snapshot)
+                else:
+                    new_frames.append(snapshot.reversed)
+
+            stops = [stream.first_stop(new_frames) for stream in streams]
+            stops = [idx for idx in stops if idx is not None]
+            stop_index = min(stops) if stops else None
+            stop_indices.append(stop_index)
+            return stop_index
+
+        return until
+
     def stop_conditions(self, trajectory, continue_conditions=None,
                         trusted=True):
         """
@@ -387,6 +464,68 @@ class DynamicsEngine(StorableNamedObject):
 
         return stop
 
+    @staticmethod
+    def continue_streams(continue_conditions, direction=+1):
+        """
+        Create the streams that evaluate the continue conditions
+        incrementally while a trajectory is generated.
+
+        Conditions that are extension checks of an ensemble (like
+        ``ensemble.can_append``) use the specialized stream of that
+        ensemble (see :meth:`.Ensemble.stream`); any other condition is
+        called with the whole trajectory after every frame.
+
+        Parameters
+        ----------
+        continue_conditions : (list of) function(Trajectory)
+            callable function of a 'Trajectory' that returns True or False.
+        direction : -1 or +1
+            whether new frames are appended (+1) or prepended (-1)
+
+        Returns
+        -------
+        list of :class:`.EnsembleStream`
+            one stream per condition; they still need to be started
+        """
+        from openpathsampling.ensemble import Ensemble, EnsembleStream
+        if continue_conditions is None:
+            return []
+        if not isinstance(continue_conditions, list):
+            continue_conditions = [continue_conditions]
+
+        streams = []
+        for condition in continue_conditions:
+            if condition is None:
+                continue
+            ensemble = getattr(condition, '__self__', None)
+            name = getattr(condition, '__name__', None)
+            if isinstance(ensemble, Ensemble) and \
+                    name in ensemble._stream_checks:
+                streams.append(ensemble.stream(name, direction))
+            else:
+                streams.append(EnsembleStream(condition, direction))
+        return streams
+
+    @staticmethod
+    def streams_stop(streams):
+        """
+        Test whether we can continue, based on continue streams.
+
+        Like :meth:`.stop_conditions`, all streams are evaluated.
+
+        Parameters
+        ----------
+        streams : list of :class:`.EnsembleStream`
+            the (started) streams of the continue conditions
+
+        Returns
+        -------
+        bool
+            true if the dynamics should be stopped; false otherwise
+        """
+        results = [stream.can_continue() for stream in streams]
+        return not all(results)
+
     def generate(self, snapshot, running=None, direction=+1):
         r"""
         Generate a trajectory consisting of ntau segments of tau_steps in
@@ -523,10 +662,18 @@ class DynamicsEngine(StorableNamedObject):
             self.start()
 
             frame = 0
+            # the stop conditions are evaluated incrementally: the streams
+            # follow the trajectory and are updated with every new frame
+            streams = self.continue_streams(running, direction)
+            for stream in streams:
+                stream.start(trajectory)
+
             # maybe we should stop before we even begin?
-            stop = self.stop_conditions(trajectory=trajectory,
-                                        continue_conditions=running,
-                                        trusted=False)
+            stop = self.streams_stop(streams)
+
+            # frames generated in a block whose stop conditions are known
+            block = []
+            stop_indices = []
 
             log_rate = 10
             has_nan = False
@@ -544,10 +691,28 @@ class DynamicsEngine(StorableNamedObject):
                 # Do integrator x steps
 
                 snapshot = None
+                checked = False
 
                 try:
                     with self.interrupter():
-                        snapshot = self.generate_next_frame()
+                        n_block = self.options.get('n_frames_chunk', 1)
+                        if max_length > 0:
+                            # a block never exceeds the max length
+                            n_block = min(n_block,
+                                          max_length - len(trajectory))
+                        if not block and n_block > 1:
+                            del stop_indices[:]
+                            block = self.generate_n_frames_until(
+                                n_block,
+                                self._chunk_until(streams, direction,
+                                                  stop_indices)
+                            )
+
+                        if block:
+                            snapshot = block.pop(0)
+                            checked = True
+                        else:
+                            snapshot = self.generate_next_frame()
 
                         # if self.on_nan != 'ignore' and \
                         if not self.is_valid_snapshot(snapshot):
@@ -579,14 +744,17 @@ class DynamicsEngine(StorableNamedObject):
                 # Store snapshot and add it to the trajectory.
                 # Stores also final frame the last time
                 if direction > 0:
-                    trajectory.append(snapshot)
+                    new_frame = snapshot
+                    trajectory.append(new_frame)
                 elif direction < 0:
-                    trajectory.insert(0, snapshot.reversed)
+                    new_frame = snapshot.reversed
+                    trajectory.insert(0, new_frame)
 
                 if 0 < max_length < len(trajectory):
                     # hit the max length criterion
                     on = self.on_max_length
                     del trajectory[-1]
+                    new_frame = None
 
                     if on == 'fail':
                         final_error = EngineMaxLengthError(
@@ -612,8 +780,19 @@ class DynamicsEngine(StorableNamedObject):
 
                 if stop is False:
                     # Check if we should stop. If not, continue simulation
-                    stop = self.stop_conditions(trajectory=trajectory,
-                                            continue_conditions=running)
+                    if checked:
+                        # the streams have already seen the frames of the
+                        # block; a stopping frame is the last of its block
+                        stop = not block and stop_indices[-1] is not None
+                    else:
+                        if new_frame is not None:
+                            for stream in streams:
+                                stream.extend(new_frame)
+                        else:
+                            # the trajectory was cut; follow it from scratch
+                            for stream in streams:
+                                stream.start(trajectory)
+                        stop = self.streams_stop(streams)
 
             if has_nan:
                 on = self.on_nan
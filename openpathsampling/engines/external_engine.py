@@ -3,18 +3,31 @@ from openpathsampling.engines.snapshot import BaseSnapshot
 from openpathsampling.engines.toy import ToySnapshot
 import numpy as np
 import os
+import atexit
+import weakref
 
 import logging
 
 import psutil
 import signal
 import shlex
+import subprocess
 import time
 
 import linecache
 
 logger = logging.getLogger(__name__)
 
+# engines with a running worker; their workers are ended at exit
+_engines_with_worker = weakref.WeakSet()
+
+
+@atexit.register
+def _stop_all_workers():
+    for engine in list(_engines_with_worker):
+        engine.stop_worker()
+
+
 def close_file_descriptors(basename):
     """Close file descriptors for the given filename.
 
@@ -51,6 +64,24 @@ def _debug_snapshot_loading(snapshot):
 class ExternalEngine(DynamicsEngine):
     """
     Generic object to handle arbitrary external engines. Subclass to use.
+
+    By default, a new engine process is launched for every trajectory (see
+    :meth:`.engine_command`), and the frames are read from the file it
+    writes. With the option `worker_mode`, a single resident worker process
+    (see :meth:`.worker_command`) runs all trajectories. It is controlled
+    through its stdin and stdout, with one message per line:
+
+    * ``start <frame>``: start a trajectory from the given initial frame;
+      the worker answers ``started``, followed by one ``frame <frame>``
+      line for every new frame
+    * ``stop``: stop the current trajectory; the worker answers
+      ``stopped`` after the last frame it sent
+    * ``quit`` (or closing stdin): end the worker
+
+    The frames in the messages are encoded by :meth:`.frame_to_message`
+    and decoded by :meth:`.frame_from_message`. The worker is ended by
+    :meth:`.stop_worker`, at the end of a ``with`` block using the engine,
+    when the engine is garbage collected, or at interpreter exit.
     """
 
     _default_options = {
@@ -62,10 +93,12 @@ class ExternalEngine(DynamicsEngine):
         'engine_directory' : "",
         'n_spatial' : 1,
         'n_atoms' : 1,
-        'n_poll_per_step': 1
+        'n_poll_per_step': 1,
+        'worker_mode': False
     }
 
     killsig = signal.SIGTERM
+    worker = None
 
     def __init__(self, options, descriptor, template,
                  first_frame_in_file=False):
@@ -79,6 +112,16 @@ class ExternalEngine(DynamicsEngine):
         self._traj_num = -1
         self._current_snapshot = template
         self.n_frames_since_start = None
+        self.worker = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop_worker()
+
+    def __del__(self):
+        self.stop_worker()
 
     @property
     def current_snapshot(self):
@@ -89,6 +132,9 @@ class ExternalEngine(DynamicsEngine):
         self._current_snapshot = snap
 
     def generate_next_frame(self):
+        if self.worker_mode:
+            return self._next_worker_frame()
+
         # should be completely general
         next_frame_found = False
         logger.debug("Looking for frame %d", self.n_frames_since_start+1)
@@ -131,6 +177,10 @@ class ExternalEngine(DynamicsEngine):
         return self.current_snapshot
 
     def start(self, snapshot=None):
+        if self.worker_mode:
+            self._start_worker_trajectory(snapshot)
+            return
+
         super(ExternalEngine, self).start(snapshot)
         self._traj_num += 1
         self.frame_num = 0
@@ -157,6 +207,10 @@ class ExternalEngine(DynamicsEngine):
     def stop(self, trajectory):
         super(ExternalEngine, self).stop(trajectory)
         logger.info("total_time {:.4f}".format(time.time() - self.start_time))
+        if self.worker_mode:
+            self._stop_worker_trajectory()
+            return
+
         proc = self.who_to_kill()
         logger.info("About to send signal %s to %s", str(self.killsig),
                     str(proc))
@@ -166,6 +220,97 @@ class ExternalEngine(DynamicsEngine):
         logger.debug("Zombie should be dead")
         self.cleanup()
 
+    def _launch_worker(self):
+        logger.info(self.worker_command())
+        self.worker = psutil.Popen(shlex.split(self.worker_command()),
+                                   stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE,
+                                   universal_newlines=True, bufsize=1,
+                                   preexec_fn=os.setsid)
+        _engines_with_worker.add(self)
+        logger.info("Started worker: " + str(self.worker))
+
+    def worker_is_running(self):
+        """Whether the resident worker process exists and has not exited.
+
+        Unlike :meth:`psutil.Process.is_running`, this is False for a worker
+        that has exited but has not been waited for (a zombie).
+        """
+        return self.worker is not None and self.worker.poll() is None
+
+    def _send_to_worker(self, message):
+        try:
+            self.worker.stdin.write(message + "\n")
+            self.worker.stdin.flush()
+        except (IOError, OSError):
+            raise RuntimeError("External engine worker died unexpectedly")
+
+    def _read_from_worker(self):
+        line = self.worker.stdout.readline()
+        if line == "":
+            raise RuntimeError("External engine worker died unexpectedly")
+        return line.rstrip("\n").split(" ", 1)
+
+    def _start_worker_trajectory(self, snapshot):
+        DynamicsEngine.start(self, snapshot)
+        self._traj_num += 1
+        self.frame_num = 0
+        self.n_frames_since_start = 0
+        if not self.worker_is_running():
+            self.stop_worker()  # reap a worker that exited
+            self._launch_worker()
+        self.start_time = time.time()
+        self._send_to_worker(
+            "start " + self.frame_to_message(self.current_snapshot))
+        reply = self._read_from_worker()
+        if reply[0] != "started":
+            raise RuntimeError("Unexpected reply from external engine "
+                               "worker: " + " ".join(reply))
+
+    def _next_worker_frame(self):
+        reply = self._read_from_worker()
+        if reply[0] != "frame" or len(reply) != 2:
+            raise RuntimeError("Unexpected reply from external engine "
+                               "worker: " + " ".join(reply))
+        self.current_snapshot = self.frame_from_message(reply[1])
+        self.n_frames_since_start += 1
+        self.frame_num += 1
+        return self.current_snapshot
+
+    def _stop_worker_trajectory(self):
+        self._send_to_worker("stop")
+        # skip the frames that the worker produced ahead of us
+        reply = self._read_from_worker()
+        while reply[0] == "frame":
+            reply = self._read_from_worker()
+        if reply[0] != "stopped":
+            raise RuntimeError("Unexpected reply from external engine "
+                               "worker: " + " ".join(reply))
+
+    def stop_worker(self):
+        """Ends the resident worker process (in `worker_mode`), if any.
+        """
+        if self.worker is None:
+            return
+        if self.worker_is_running():
+            try:
+                self._send_to_worker("quit")
+            except RuntimeError:  # pragma: no cover
+                pass
+        for stream in [self.worker.stdin, self.worker.stdout]:
+            try:
+                stream.close()
+            except (IOError, OSError):  # pragma: no cover
+                pass
+        try:
+            self.worker.wait(timeout=10)
+        except psutil.TimeoutExpired:
+            logger.warning("External engine worker did not quit; killing it")
+            self.worker.kill()
+            self.worker.wait()
+        self.worker = None
+        _engines_with_worker.discard(self)
+
     # FROM HERE ARE THE FUNCTIONS TO OVERRIDE IN SUBCLASSES:
     def read_frame_from_file(self, filename, frame_num):
         """Reads given frame number from file, and returns snapshot.
@@ -210,4 +355,25 @@ class ExternalEngine(DynamicsEngine):
         """Generates a string for the command to run the engine."""
         raise NotImplementedError()
 
+    def worker_command(self):
+        """Generates a string for the command to run the resident worker.
+
+        Only used in `worker_mode`.
+        """
+        raise NotImplementedError()
+
+    def frame_to_message(self, snapshot):
+        """Encodes a snapshot as a single line of text for the worker.
+
+        Only used in `worker_mode`.
+        """
+        raise NotImplementedError()
+
+    def frame_from_message(self, message):
+        """Decodes a snapshot from a line of text sent by the worker.
+
+        Only used in `worker_mode`.
+        """
+        raise NotImplementedError()
+
 
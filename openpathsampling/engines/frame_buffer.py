@@ -0,0 +1,289 @@
+"""
+Snapshots whose array features are rows of a shared frame buffer
+
+Usually every snapshot owns its arrays and the reversed snapshot owns a
+negated copy of the velocities. Engines that generate many frames can
+instead write the frames into a :class:`FrameBuffer` and create snapshots
+with views of its rows (see :class:`FrameBufferSnapshot`). Reversed
+snapshots share the coordinates and negate the velocities only when they
+are accessed, and the features of a trajectory of consecutive frames are a
+slice of the buffer instead of a stack of copies (see :func:`stack_frames`).
+"""
+import bisect
+
+import numpy as np
+
+
+class FrameBuffer(object):
+    """
+    Preallocated, growable arrays for the features of consecutive frames
+
+    The frames are stored in blocks, one array of shape
+    ``(block_size,) + shape`` per feature. If a block is full, a new block
+    twice as large is added. Blocks are never reallocated, so views of
+    their rows stay valid, and the memory of a block is released once no
+    snapshot uses it anymore.
+
+    Parameters
+    ----------
+    shapes : dict of str: tuple of int
+        the shape of each feature of a single frame, e.g.
+        ``{'coordinates': (n_atoms, 3), 'velocities': (n_atoms, 3)}``
+    dtype : numpy.dtype
+        the dtype of all features
+    capacity : int
+        the number of frames in the first block
+
+    Attributes
+    ----------
+    blocks : list of dict of str: numpy.ndarray
+        the arrays of each block
+    """
+
+    def __init__(self, shapes, dtype=np.float64, capacity=64):
+        self.shapes = {name: tuple(shape) for name, shape in shapes.items()}
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self.blocks = []
+        self._starts = []
+        self._n_frames = 0
+        self._free = 0
+
+    def __len__(self):
+        return self._n_frames
+
+    @property
+    def nbytes(self):
+        """int : the number of bytes allocated for all blocks"""
+        return sum(array.nbytes
+                   for block in self.blocks for array in block.values())
+
+    def _add_block(self):
+        if self.blocks:
+            size = 2 * len(next(iter(self.blocks[-1].values())))
+        else:
+            size = self.capacity
+        self.blocks.append({
+            name: np.empty((size,) + shape, dtype=self.dtype)
+            for name, shape in self.shapes.items()
+        })
+        self._starts.append(self._n_frames)
+        self._free = size
+
+    def append(self, **values):
+        """
+        Add a frame
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            the value of each feature of the frame
+
+        Returns
+        -------
+        block : dict of str: numpy.ndarray
+            the arrays of the block the frame was written to
+        row : int
+            the row of the frame in the block
+        """
+        if not self._free:
+            self._add_block()
+        block = self.blocks[-1]
+        row = self._n_frames - self._starts[-1]
+        for name, array in block.items():
+            array[row] = values[name]
+        self._n_frames += 1
+        self._free -= 1
+        return block, row
+
+    def locate(self, frame):
+        """
+        Return the block and row of a frame
+
+        Parameters
+        ----------
+        frame : int
+            the index of the frame, counting all appended frames
+
+        Returns
+        -------
+        block : dict of str: numpy.ndarray
+        row : int
+        """
+        if not 0 <= frame < self._n_frames:
+            raise IndexError('frame %d is out of range' % frame)
+        idx = bisect.bisect_right(self._starts, frame) - 1
+        return self.blocks[idx], frame - self._starts[idx]
+
+
+class FrameBufferSnapshot(object):
+    """
+    Mixin for snapshot classes whose array features can live in a buffer
+
+    Instances created with :meth:`from_frame_buffer` use views of a row of a
+    :class:`FrameBuffer` for their features. The reversed snapshot uses the
+    same views; features that change sign (the `minus` features, like
+    velocities) are negated whenever they are accessed instead of being
+    copied. Copies own their arrays and are of the original snapshot class.
+
+    Snapshots created the usual way behave like the original snapshot class.
+
+    Examples
+    --------
+    >>> class BufferedToySnapshot(FrameBufferSnapshot, ToySnapshot):
+    ...     pass
+    """
+
+    _frame_block = None
+    _frame = None
+    _lazy_reversed = False
+
+    @classmethod
+    def from_frame_buffer(cls, frame_buffer, **kwargs):
+        """
+        Create a snapshot and append its array features to a buffer
+
+        Parameters
+        ----------
+        frame_buffer : :class:`FrameBuffer`
+            the buffer; it must have all array features of the snapshot
+        kwargs
+            the features of the snapshot, as for `__init__`
+
+        Returns
+        -------
+        :class:`FrameBufferSnapshot`
+            the snapshot, with views of the buffer for the array features
+        """
+        block, row = frame_buffer.append(**{
+            name: kwargs[name] for name in frame_buffer.shapes})
+        for name in frame_buffer.shapes:
+            kwargs[name] = block[name][row]
+        this = cls(**kwargs)
+        this._frame_block = block
+        this._frame = row
+        return this
+
+    @classmethod
+    def _lazy_minus(cls):
+        features = cls.__features__
+        return [name for name in features.minus if name in features.numpy]
+
+    def __getattr__(self, item):
+        # minus features of reversed snapshots are not set
+        if self._lazy_reversed and item in self._lazy_minus():
+            return -getattr(self._reversed, item)
+
+        raise AttributeError("'%s' object has no attribute '%s'" % (
+            self.__class__.__name__, item))
+
+    def create_reversed(self):
+        features = self.__features__
+        if features.lazy:
+            return super(FrameBufferSnapshot, self).create_reversed()
+
+        lazy_minus = self._lazy_minus()
+        this = self.__class__.__new__(self.__class__)
+        this.__uuid__ = self.reverse_uuid()
+        this._reversed = self
+        this._lazy_reversed = True
+        this._frame_block = self._frame_block
+        this._frame = self._frame
+        for name in features.default_none:
+            setattr(this, name, None)
+        for name in features.variables:
+            if name in features.flip:
+                setattr(this, name, not getattr(self, name))
+            elif name in features.minus:
+                if name not in lazy_minus:
+                    setattr(this, name, - getattr(self, name))
+            else:
+                setattr(this, name, getattr(self, name))
+        return this
+
+    def to_dict(self):
+        dct = super(FrameBufferSnapshot, self).to_dict()
+        if self._lazy_reversed:
+            for name in self._lazy_minus():
+                dct[name] = getattr(self, name)
+        return dct
+
+
+def stack_frames(snapshots, feature):
+    """
+    Return a feature of several snapshots as one array, using frame buffers
+
+    Consecutive frames of the same block of a :class:`FrameBuffer` (in
+    forward or backward order) are taken as one slice of the block. If all
+    snapshots are such a run, the result is a read-only view of the buffer
+    and nothing is copied.
+
+    Parameters
+    ----------
+    snapshots : iterable of :class:`openpathsampling.engines.BaseSnapshot`
+        the snapshots, e.g. a trajectory
+    feature : str
+        the name of the array feature; `xyz` is taken from `coordinates`
+
+    Returns
+    -------
+    numpy.ndarray or None
+        the values of all snapshots, or None if none of the snapshots
+        uses a frame buffer for the feature. Views of the buffer are not
+        writeable, so that the snapshots cannot be changed through them.
+    """
+    name = 'coordinates' if feature == 'xyz' else feature
+    snapshots = list(snapshots)
+    blocks = [
+        snap._frame_block if isinstance(snap, FrameBufferSnapshot) else None
+        for snap in snapshots
+    ]
+    if not any(block is not None and name in block for block in blocks):
+        return None
+
+    parts = []
+    # the current run: [block, first row, last row, step, negated]
+    run = None
+
+    for snap, block in zip(snapshots, blocks):
+        if block is None or name not in block:
+            if run is not None:
+                parts.append(_run_to_array(name, *run))
+                run = None
+            parts.append(getattr(snap, feature)[np.newaxis])
+            continue
+
+        row = snap._frame
+        negated = snap._lazy_reversed and name in snap._lazy_minus()
+        if run is not None and run[0] is block and run[4] == negated:
+            step = row - run[2]
+            if step in (1, -1) and (run[3] is None or run[3] == step):
+                run[2] = row
+                run[3] = step
+                continue
+            parts.append(_run_to_array(name, *run))
+        elif run is not None:
+            parts.append(_run_to_array(name, *run))
+        run = [block, row, row, None, negated]
+
+    if run is not None:
+        parts.append(_run_to_array(name, *run))
+
+    if len(parts) == 1:
+        values = parts[0]
+        if not values.flags.owndata:
+            # a view of the buffer (or of a snapshot)
+            values.setflags(write=False)
+        return values
+
+    return np.concatenate(parts)
+
+
+def _run_to_array(name, block, first, last, step, negated):
+    if step == -1:
+        values = block[name][last:first + 1][::-1]
+    else:
+        values = block[name][first:last + 1]
+    if negated:
+        values = -values
+    return values
@@ -447,6 +447,49 @@ class OpenMMEngine(DynamicsEngine):
         self._current_snapshot = None
         return self.current_snapshot
 
+    def generate_n_frames_until(self, n_frames, until=None):
+        """Generate a block of frames.
+
+        If the simulation has no reporters, the integrator is stepped
+        directly, and the state of each frame is read without computing the
+        energy. The block ends early at the first frame with `nan`.
+
+        Parameters
+        ----------
+        n_frames : int
+            maximal number of frames to generate
+        until : function(list of :class:`.Snapshot`) -> int or None
+            returns the index of the first frame at which the simulation
+            has to stop (see :meth:`.DynamicsEngine.generate_n_frames_until`)
+
+        Returns
+        -------
+        list of :class:`.Snapshot`
+            the generated frames
+        """
+        if self.simulation.reporters:
+            step = self.simulation.step
+        else:
+            step = self.simulation.integrator.step
+
+        context = self.simulation.context
+        frames = []
+        for _ in range(n_frames):
+            step(self.n_steps_per_frame)
+            state = context.getState(getPositions=True, getVelocities=True)
+            snapshot = Snapshot.construct(
+                coordinates=state.getPositions(asNumpy=True),
+                box_vectors=state.getPeriodicBoxVectors(asNumpy=True),
+                velocities=state.getVelocities(asNumpy=True),
+                engine=self
+            )
+            frames.append(snapshot)
+            if not self.is_valid_snapshot(snapshot):
+                break
+
+        self._current_snapshot = frames[-1]
+        return self._truncate_frames(frames, until)
+
     def minimize(self):
         self.simulation.minimizeEnergy()
         # make sure that we get the minimized structure on request
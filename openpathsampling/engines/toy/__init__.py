@@ -4,7 +4,8 @@ from .pes import Gaussian, HarmonicOscillator, LinearSlope, OuterWalls, \
 
 from .engine import ToyEngine as Engine
 from .engine import ToyEngine
-from .snapshot import ToySnapshot
+from .engine import ToyBatchState
+from .snapshot import ToySnapshot, BufferedToySnapshot
 from .snapshot import ToySnapshot as Snapshot
 
 from .topology import ToyTopology as Topology
@@ -1,7 +1,53 @@
+import logging
+
 import numpy as np
 
-from openpathsampling.engines import DynamicsEngine, SnapshotDescriptor
+from openpathsampling.engines import (
+    DynamicsEngine, SnapshotDescriptor, Trajectory, EngineMaxLengthError)
+from openpathsampling.engines.frame_buffer import FrameBuffer
 from .snapshot import ToySnapshot as Snapshot
+from .snapshot import BufferedToySnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class ToyBatchState(object):
+    """Stacked state of several independent toy systems.
+
+    Provides the attributes of :class:`.ToyEngine` that are used by the
+    integrators and the PES, but with positions and velocities of shape
+    ``(n_walkers, n_spatial)``, so that one integrator step advances all
+    walkers at once.
+
+    Parameters
+    ----------
+    engine : :class:`.ToyEngine`
+        engine providing the PES and the masses
+    positions : np.array (n_walkers, n_spatial)
+        initial positions of the walkers
+    velocities : np.array (n_walkers, n_spatial)
+        initial velocities of the walkers
+    """
+    def __init__(self, engine, positions, velocities):
+        self.pes = engine.pes
+        self.mass = engine.mass
+        self._minv = engine._minv
+        self.positions = positions
+        self.velocities = velocities
+
+    def __len__(self):
+        return len(self.positions)
+
+    def select(self, rows):
+        """Keep only the walkers in the given rows.
+
+        Parameters
+        ----------
+        rows : list of int or np.array of bool
+            rows of the walkers to keep
+        """
+        self.positions = self.positions[rows]
+        self.velocities = self.velocities[rows]
 
 
 class ToyEngine(DynamicsEngine):
@@ -20,6 +66,11 @@ class ToyEngine(DynamicsEngine):
             'n_steps_per_frame' : int
                 number of integration steps per returned snapshot, default
                 is 10.
+            'frame_buffer' : bool
+                if True, generated frames are :class:`.BufferedToySnapshot`
+                objects that keep coordinates and velocities in one buffer
+                per trajectory, so that e.g. `trajectory.xyz` is a slice of
+                the buffer. Default is False.
 
     topology : :class:`.ToyTopology`
         object which includes masses, potential energy surface, and the
@@ -44,7 +95,8 @@ class ToyEngine(DynamicsEngine):
     _default_options = {
         'integ': None,
         'n_frames_max': 5000,
-        'n_steps_per_frame': 10
+        'n_steps_per_frame': 10,
+        'frame_buffer': False
     }
 
     def __init__(self, options, topology):
@@ -72,6 +124,7 @@ class ToyEngine(DynamicsEngine):
 
         self._mass = None
         self._minv = None
+        self._frame_buffer = None
 
         self.positions = None
         self.velocities = None
@@ -130,7 +183,190 @@ class ToyEngine(DynamicsEngine):
         self.positions = coords[0]
         self.velocities = vels[0]
 
+    def start(self, snapshot=None):
+        super(ToyEngine, self).start(snapshot)
+        # each trajectory gets its own frame buffer, so that the frames of
+        # a discarded trajectory are released together
+        self._frame_buffer = None
+
+    def _buffered_snapshot(self):
+        """The current state as a snapshot in the frame buffer"""
+        if self._frame_buffer is None:
+            shape = (1,) + np.shape(self.positions)
+            self._frame_buffer = FrameBuffer({
+                'coordinates': shape,
+                'velocities': shape
+            })
+
+        return BufferedToySnapshot.from_frame_buffer(
+            self._frame_buffer,
+            coordinates=self.positions[np.newaxis],
+            velocities=self.velocities[np.newaxis],
+            engine=self
+        )
+
     def generate_next_frame(self):
         for i in range(self.n_steps_per_frame):
             self.integ.step(sys=self)
+        if self.options['frame_buffer']:
+            return self._buffered_snapshot()
         return self.current_snapshot
+
+    def generate_n_frames_until(self, n_frames, until=None):
+        """Generate a block of frames in one go.
+
+        The positions and velocities of the block are recorded in stacked
+        arrays, and the snapshots are only built at the end.
+
+        Parameters
+        ----------
+        n_frames : int
+            number of frames to generate
+        until : function(list of :class:`.ToySnapshot`) -> int or None
+            returns the index of the first frame at which the simulation
+            has to stop (see :meth:`.DynamicsEngine.generate_n_frames_until`)
+
+        Returns
+        -------
+        list of :class:`.ToySnapshot`
+            the generated frames
+        """
+        if self.options['frame_buffer']:
+            frames = []
+            for frame in range(n_frames):
+                for i in range(self.n_steps_per_frame):
+                    self.integ.step(sys=self)
+                frames.append(self._buffered_snapshot())
+            return self._truncate_frames(frames, until)
+
+        positions = np.empty((n_frames,) + np.shape(self.positions))
+        velocities = np.empty((n_frames,) + np.shape(self.velocities))
+        for frame in range(n_frames):
+            for i in range(self.n_steps_per_frame):
+                self.integ.step(sys=self)
+            positions[frame] = self.positions
+            velocities[frame] = self.velocities
+
+        frames = [
+            Snapshot(
+                coordinates=positions[frame:frame + 1],
+                velocities=velocities[frame:frame + 1],
+                engine=self
+            )
+            for frame in range(n_frames)
+        ]
+        return self._truncate_frames(frames, until)
+
+    def generate_batch(self, snapshots, running=None, direction=+1):
+        """Generate one trajectory per initial snapshot, all at once.
+
+        All walkers are integrated together on stacked arrays, so that the
+        forces are evaluated once per integration step for the whole batch.
+        Each walker drops out of the batch as soon as its stop conditions
+        are met.
+
+        Parameters
+        ----------
+        snapshots : list of :class:`.ToySnapshot`
+            initial snapshots, one per trajectory
+        running : (list of) function(:class:`.Trajectory`)
+            callable function of a 'Trajectory' that returns True or False.
+            If one of these returns False the walker is stopped.
+        direction : -1 or +1 (DynamicsEngine.FORWARD or DynamicsEngine.BACKWARD)
+            If +1 then this will integrate forward, if -1 it will reverse
+            the momenta of the given snapshots and prepend the generated
+            snapshots with reversed momenta (see :meth:`.generate`)
+
+        Returns
+        -------
+        list of :class:`.Trajectory`
+            the generated trajectories, in the order of `snapshots`
+
+        Notes
+        -----
+        The batch is not restarted when it hits `n_frames_max`: the option
+        `on_max_length` is honored for `stop`; both `fail` and `retry`
+        raise an :class:`.EngineMaxLengthError`.
+        """
+        if direction == 0:
+            raise RuntimeError(
+                'direction must be positive (FORWARD) or negative (BACKWARD).')
+
+        try:
+            iter(running)
+        except TypeError:
+            running = [running]
+
+        trajectories = [Trajectory([snap]) for snap in snapshots]
+        if direction > 0:
+            initial = list(snapshots)
+        else:
+            initial = [snap.reversed for snap in snapshots]
+
+        for snap in initial:
+            self.check_snapshot_type(snap)
+
+        state = ToyBatchState(
+            engine=self,
+            positions=np.array([snap.coordinates[0] for snap in initial],
+                               dtype=float),
+            velocities=np.array([snap.velocities[0] for snap in initial],
+                                dtype=float)
+        )
+
+        # every walker follows its trajectory with its own streams, so that
+        # the walkers do not interfere through the caches of the ensembles
+        streams = []
+        for traj in trajectories:
+            walker_streams = self.continue_streams(running, direction)
+            for stream in walker_streams:
+                stream.start(traj)
+            streams.append(walker_streams)
+
+        active = [
+            idx for idx, walker_streams in enumerate(streams)
+            if not self.streams_stop(walker_streams)
+        ]
+        state.select(active)
+        max_length = self.options['n_frames_max'] or 0
+
+        while active:
+            for i in range(self.n_steps_per_frame):
+                self.integ.step(sys=state)
+
+            keep = []
+            for row, idx in enumerate(active):
+                snapshot = Snapshot(
+                    coordinates=state.positions[row:row + 1].copy(),
+                    velocities=state.velocities[row:row + 1].copy(),
+                    engine=self
+                )
+                trajectory = trajectories[idx]
+                if direction > 0:
+                    new_frame = snapshot
+                    trajectory.append(new_frame)
+                else:
+                    new_frame = snapshot.reversed
+                    trajectory.insert(0, new_frame)
+
+                for stream in streams[idx]:
+                    stream.extend(new_frame)
+                if self.streams_stop(streams[idx]):
+                    continue
+
+                if 0 < max_length <= len(trajectory):
+                    if self.on_max_length == 'stop':
+                        logger.info('Trajectory hit max length. Stopping.')
+                        continue
+                    raise EngineMaxLengthError(
+                        'Hit maximal length of %d frames.' % max_length,
+                        trajectory
+                    )
+
+                keep.append(row)
+
+            if len(keep) < len(active):
+                active = [active[row] for row in keep]
+                state.select(keep)
+
+        return trajectories
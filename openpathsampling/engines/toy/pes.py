@@ -8,6 +8,12 @@ from openpathsampling.netcdfplus import StorableObject
 
 class PES(StorableObject):
     """Abstract base class for toy potential energy surfaces.
+
+    The energies and derivatives are evaluated from ``sys.positions``,
+    which can either be a single configuration of shape ``(n_spatial,)``
+    or a stack of configurations of shape ``(n_walkers, n_spatial)``, as
+    used by :meth:`.ToyEngine.generate_batch`. Subclasses should only use
+    operations that broadcast over the leading axis.
     """
     # For now, we only support additive combinations; maybe someday that can
     # include multiplication, too
@@ -31,7 +37,7 @@ class PES(StorableObject):
         """
         v = sys.velocities
         m = sys.mass
-        return 0.5*np.dot(m, np.multiply(v, v))
+        return 0.5*np.sum(m * np.multiply(v, v), axis=-1)
 
 
 class PES_Combination(PES):
@@ -169,7 +175,7 @@ class HarmonicOscillator(PES):
         """
         dx = sys.positions - self.x0
         k = self.omega*self.omega*sys.mass
-        return 0.5*np.dot(self.A * k, dx * dx)
+        return 0.5*np.sum(self.A * k * dx * dx, axis=-1)
 
     def dVdx(self, sys):
         """Derivative of potential energy (-force)
@@ -206,7 +212,6 @@ class Gaussian(PES):
         self.A = A
         self.alpha = np.array(alpha)
         self.x0 = np.array(x0)
-        self._local_dVdx = np.zeros(self.x0.size)
 
     def __repr__(self):  # pragma: no cover
         return "Gaussian({o.A}, {o.alpha}, {o.x0})".format(o=self)
@@ -225,7 +230,8 @@ class Gaussian(PES):
             the potential energy
         """
         dx = sys.positions - self.x0
-        return self.A*np.exp(-np.dot(self.alpha, np.multiply(dx, dx)))
+        return self.A*np.exp(-np.sum(self.alpha * np.multiply(dx, dx),
+                                     axis=-1))
 
     def dVdx(self, sys):
         """Derivative of potential energy (-force)
@@ -241,10 +247,9 @@ class Gaussian(PES):
             the derivatives of the potential at this point
         """
         dx = sys.positions - self.x0
-        exp_part = self.A*np.exp(-np.dot(self.alpha, np.multiply(dx, dx)))
-        for i in range(len(dx)):
-            self._local_dVdx[i] = -2*self.alpha[i]*dx[i]*exp_part
-        return self._local_dVdx
+        exp_part = self.A*np.exp(-np.sum(self.alpha * np.multiply(dx, dx),
+                                         axis=-1))
+        return -2*self.alpha*dx*np.expand_dims(exp_part, -1)
 
 
 class OuterWalls(PES):
@@ -263,7 +268,6 @@ class OuterWalls(PES):
         super(OuterWalls, self).__init__()
         self.sigma = np.array(sigma)
         self.x0 = np.array(x0)
-        self._local_dVdx = np.zeros(self.x0.size)
 
     def __repr__(self):  # pragma: no cover
         return "OuterWalls({o.sigma}, {o.x0})".format(o=self)
@@ -282,10 +286,7 @@ class OuterWalls(PES):
             the potential energy
         """
         dx = sys.positions - self.x0
-        myV = 0.0
-        for i in range(len(dx)):
-            myV += self.sigma[i]*dx[i]**6
-        return myV
+        return np.sum(self.sigma * dx**6, axis=-1)
 
     def dVdx(self, sys):
         """Derivative of potential energy (-force)
@@ -301,9 +302,7 @@ class OuterWalls(PES):
             the derivatives of the potential at this point
         """
         dx = sys.positions - self.x0
-        for i in range(len(dx)):
-            self._local_dVdx[i] = 6.0*self.sigma[i]*dx[i]**5
-        return self._local_dVdx
+        return 6.0*self.sigma*dx**5
 
 
 class LinearSlope(PES):
@@ -339,7 +338,7 @@ class LinearSlope(PES):
         float
             the potential energy
         """
-        return np.dot(self.m, sys.positions) + self.c
+        return np.dot(sys.positions, self.m) + self.c
 
     def dVdx(self, sys):
         """Derivative of potential energy (-force)
@@ -6,6 +6,7 @@
 
 from openpathsampling.engines import BaseSnapshot, SnapshotFactory
 from openpathsampling.engines import features as feats
+from openpathsampling.engines.frame_buffer import FrameBufferSnapshot
 from . import features as toy_feats
 
 
@@ -29,6 +30,15 @@ class ToySnapshot(BaseSnapshot):
         return self.topology.masses
 
 
+class BufferedToySnapshot(FrameBufferSnapshot, ToySnapshot):
+    """
+    Toy snapshot that can keep coordinates and velocities in a frame buffer
+
+    Created by a :class:`.ToyEngine` with the option `frame_buffer`. The
+    reversed snapshot negates the velocities only when they are used.
+    """
+
+
 # The following code does almost the same as above
 
 # ToySnapshot = SnapshotFactory(
@@ -6,11 +6,13 @@
 import numpy as np
 
 from openpathsampling.integration_tools import (
-    error_if_no_mdtraj, is_simtk_quantity_type, md
+    error_if_no_mdtraj, is_simtk_quantity, is_simtk_quantity_type
 )
 from openpathsampling.netcdfplus import StorableObject, LoaderProxy
 import openpathsampling as paths
 
+from .frame_buffer import stack_frames
+
 
 # ==============================================================================
 # TRAJECTORY
@@ -24,6 +26,12 @@ class Trajectory(list, StorableObject):
 
     engine = None
 
+    # features of stored frames that are read with a single call to the
+    # storage, see `SnapshotWrapperStore.load_feature_block`, and of
+    # generated frames that are sliced from a frame buffer, see
+    # `frame_buffer.stack_frames`
+    block_features = ['xyz', 'coordinates', 'velocities']
+
     def __init__(self, trajectory=None):
         """
         Create a simulation trajectory object
@@ -130,6 +138,16 @@ class Trajectory(list, StorableObject):
         if len(self) == 0:
             return []
 
+        # stored frames are read from the file in one go
+        if item in self.block_features:
+            block = self._load_feature_block(item)
+            if block is not None:
+                return block
+
+            block = stack_frames(self, item)
+            if block is not None:
+                return block
+
         snapshot_class = self[0].__class__
         def is_snapshot_attr(cls, item):
             return hasattr(cls, item) or (hasattr(cls, '__features__') and
@@ -166,6 +184,61 @@ class Trajectory(list, StorableObject):
         raise AttributeError(msg)
 
 
+    def _load_feature_block(self, item):
+        """
+        Read a feature of all frames with a single call to the storage
+
+        Parameters
+        ----------
+        item : str
+            the feature; `xyz` is read as `coordinates` without units
+
+        Returns
+        -------
+        numpy.ndarray or None
+            the values of all frames, or None if not every frame is a proxy
+            to a snapshot in the same open storage that has not been loaded
+            yet
+        """
+        store = None
+        uuids = []
+        for frame in self.iter_proxies():
+            if not isinstance(frame, LoaderProxy):
+                return None
+            if store is None:
+                store = frame._store
+            elif frame._store is not store:
+                return None
+            if frame._subject is not None and frame._subject() is not None:
+                # loaded snapshots can differ from the file (e.g. float64
+                # instead of float32), so these are used as they are
+                return None
+            uuids.append(frame.__uuid__)
+
+        if not hasattr(store, 'load_feature_block') \
+                or not store.storage.isopen():
+            return None
+
+        try:
+            indices = [store.index[uuid] for uuid in uuids]
+        except KeyError:
+            return None
+
+        if any(idx in store.cache or idx ^ 1 in store.cache
+               for idx in indices):
+            return None
+
+        feature = 'coordinates' if item == 'xyz' else item
+        try:
+            block = store.load_feature_block(feature, indices)
+        except KeyError:
+            return None
+
+        if item == 'xyz' and is_simtk_quantity(block):
+            block = block._value
+
+        return block
+
     # ==========================================================================
     # LIST INHERITANCE FUNCTIONS
     # ==========================================================================
@@ -531,6 +604,7 @@ class Trajectory(list, StorableObject):
         MDTraj topology.
         """
         error_if_no_mdtraj("Converting to mdtraj")
+        from openpathsampling.integration_tools import md
         try:
             snap = self[0]
         except IndexError:
@@ -8,6 +8,8 @@ import abc
 import logging
 import itertools
 
+import numpy as np
+
 from openpathsampling.netcdfplus import StorableNamedObject
 import openpathsampling as paths
 
@@ -192,6 +194,310 @@ class EnsembleCache(object):
         return reset
 
 
+def _first_frame_with(volume, frames, value):
+    """
+    Index of the first frame for which a volume has the given value.
+
+    The frames are tested with :meth:`.Volume.evaluate_trajectory` in
+    blocks of growing size (1, 2, 4, ...), so that long trajectories are
+    tested with a few array operations, but not many more frames than
+    necessary are evaluated if the answer is found early.
+
+    Parameters
+    ----------
+    volume : :class:`.Volume`
+        the volume
+    frames : list of :class:`.BaseSnapshot`
+        the frames to test
+    value : bool
+        the value to look for
+
+    Returns
+    -------
+    int or None
+        the index of the first frame with `volume(frame) == value`; None if
+        there is no such frame
+    """
+    start = 0
+    size = 1
+    while start < len(frames):
+        block = volume.evaluate_trajectory(frames[start:start + size])
+        found = np.flatnonzero(block == value)
+        if len(found) > 0:
+            return start + found[0]
+        start += size
+        size *= 2
+    return None
+
+
+# note: streams are not storable either; they only live while a trajectory
+# is generated
+class EnsembleStream(object):
+    """Incremental evaluation of an extension check for a growing trajectory.
+
+    A stream follows a trajectory that grows by one frame at a time, either
+    at its end (``direction > 0``) or at its beginning (``direction < 0``),
+    and answers an extension check, like :meth:`.Ensemble.can_append`, for
+    the current trajectory. This is what the engines use to decide whether
+    to continue a simulation.
+
+    This generic stream keeps the trajectory and calls the check on it,
+    trusting every call after the first one. Ensembles that can do better
+    return specialized streams from :meth:`.Ensemble.stream`, which only
+    keep a small state that is updated in constant time per frame and do
+    not depend on the (shared) caches of the ensembles.
+
+    Parameters
+    ----------
+    check : function(:class:`.Trajectory`, bool) -> bool
+        the check, e.g., ``ensemble.can_append``
+    direction : +1 or -1
+        whether new frames are appended (+1) or prepended (-1)
+    """
+
+    def __init__(self, check, direction=+1):
+        self.check = check
+        self.direction = direction
+        self.trajectory = None
+        self._trusted = False
+
+    def start(self, trajectory):
+        """Start following a trajectory.
+
+        Parameters
+        ----------
+        trajectory : :class:`.Trajectory`
+            the initial trajectory
+        """
+        self.trajectory = paths.Trajectory(trajectory)
+        self._trusted = False
+
+    def extend(self, frame):
+        """Extend the trajectory by a frame.
+
+        Parameters
+        ----------
+        frame : :class:`.BaseSnapshot`
+            the new frame; it is appended if ``direction > 0`` and
+            prepended otherwise
+        """
+        if self.direction > 0:
+            self.trajectory.append(frame)
+        else:
+            self.trajectory.insert(0, frame)
+
+    def can_continue(self):
+        """Result of the check for the current trajectory.
+
+        Returns
+        -------
+        bool
+            True if the trajectory can still be extended
+        """
+        result = self.check(self.trajectory, self._trusted)
+        self._trusted = True
+        return result
+
+    def first_stop(self, frames):
+        """Extend the trajectory by several frames, and find the first
+        frame after which the check fails.
+
+        Parameters
+        ----------
+        frames : list of :class:`.BaseSnapshot`
+            the new frames, in the order in which they are added
+
+        Returns
+        -------
+        int or None
+            the index of the first frame after which :meth:`.can_continue`
+            is False; None if the trajectory can still be extended after
+            all frames. In the first case, the stream may have seen some of
+            the later frames as well.
+        """
+        for idx, frame in enumerate(frames):
+            self.extend(frame)
+            if not self.can_continue():
+                return idx
+        return None
+
+
+class ConstantEnsembleStream(EnsembleStream):
+    """Stream for a check that does not depend on the trajectory.
+
+    Parameters
+    ----------
+    value : bool
+        the result of the check
+    direction : +1 or -1
+        whether new frames are appended (+1) or prepended (-1)
+    """
+
+    def __init__(self, value, direction=+1):
+        super(ConstantEnsembleStream, self).__init__(None, direction)
+        self.value = value
+
+    def start(self, trajectory):
+        pass
+
+    def extend(self, frame):
+        pass
+
+    def can_continue(self):
+        return self.value
+
+
+class AllInVolumeStream(EnsembleStream):
+    """Stream that checks whether all frames are in a volume.
+
+    Frames are only tested when the result is requested, and no frame is
+    tested after the first one outside the volume. Several frames are
+    tested at once with :meth:`.Volume.evaluate_trajectory`.
+
+    Parameters
+    ----------
+    volume : :class:`.Volume`
+        the volume all frames have to be in
+    direction : +1 or -1
+        whether new frames are appended (+1) or prepended (-1)
+    """
+
+    def __init__(self, volume, direction=+1):
+        super(AllInVolumeStream, self).__init__(None, direction)
+        self.volume = volume
+        self._all_in = True
+        self._pending = []
+
+    def start(self, trajectory):
+        self._all_in = True
+        self._pending = trajectory.as_proxies()
+
+    def extend(self, frame):
+        if self._all_in:
+            self._pending.append(frame)
+
+    def can_continue(self):
+        if self._all_in:
+            if _first_frame_with(self.volume, self._pending, False) \
+                    is not None:
+                self._all_in = False
+            self._pending = []
+        return self._all_in
+
+    def first_stop(self, frames):
+        if len(frames) == 0:
+            return None
+        if not self.can_continue():
+            return 0
+        idx = _first_frame_with(self.volume, frames, False)
+        if idx is not None:
+            self._all_in = False
+        return idx
+
+
+class LengthEnsembleStream(EnsembleStream):
+    """Stream for the extension checks of a :class:`.LengthEnsemble`.
+
+    Parameters
+    ----------
+    ensemble : :class:`.LengthEnsemble`
+        the ensemble
+    direction : +1 or -1
+        whether new frames are appended (+1) or prepended (-1)
+    """
+
+    def __init__(self, ensemble, direction=+1):
+        super(LengthEnsembleStream, self).__init__(None, direction)
+        self.ensemble = ensemble
+        self.length = 0
+
+    def start(self, trajectory):
+        self.length = len(trajectory)
+
+    def extend(self, frame):
+        self.length += 1
+
+    def can_continue(self):
+        return self.ensemble._can_extend_length(self.length)
+
+
+class CombinationEnsembleStream(EnsembleStream):
+    """Stream for the logical combination of two streams.
+
+    As for :class:`.EnsembleCombination`, the second stream is only
+    evaluated if the result depends on it. It is still fed all frames, so
+    that it can catch up when it is needed.
+
+    Parameters
+    ----------
+    fnc : function(bool, bool) -> bool
+        the combination function
+    stream1 : :class:`.EnsembleStream`
+        the stream of the first ensemble
+    stream2 : :class:`.EnsembleStream`
+        the stream of the second ensemble
+    direction : +1 or -1
+        whether new frames are appended (+1) or prepended (-1)
+    """
+
+    def __init__(self, fnc, stream1, stream2, direction=+1):
+        super(CombinationEnsembleStream, self).__init__(None, direction)
+        self.fnc = fnc
+        self.stream1 = stream1
+        self.stream2 = stream2
+
+    def start(self, trajectory):
+        self.stream1.start(trajectory)
+        self.stream2.start(trajectory)
+
+    def extend(self, frame):
+        self.stream1.extend(frame)
+        self.stream2.extend(frame)
+
+    def can_continue(self):
+        a = self.stream1.can_continue()
+        res_true = self.fnc(a, True)
+        if res_true == self.fnc(a, False):
+            return res_true
+        else:
+            return self.fnc(a, self.stream2.can_continue())
+
+
+class AlteredEnsembleStream(EnsembleStream):
+    """Stream that feeds an altered trajectory into another stream.
+
+    Used by wrapped ensembles, which check an altered version of the
+    trajectory.
+
+    Parameters
+    ----------
+    stream : :class:`.EnsembleStream`
+        the stream of the wrapped ensemble
+    alter_trajectory : function(:class:`.Trajectory`)
+        returns the altered initial trajectory
+    alter_frame : function(:class:`.BaseSnapshot`)
+        returns the altered new frame
+    direction : +1 or -1
+        whether new frames are appended (+1) or prepended (-1)
+    """
+
+    def __init__(self, stream, alter_trajectory, alter_frame,
+                 direction=+1):
+        super(AlteredEnsembleStream, self).__init__(None, direction)
+        self.stream = stream
+        self.alter_trajectory = alter_trajectory
+        self.alter_frame = alter_frame
+
+    def start(self, trajectory):
+        self.stream.start(self.alter_trajectory(trajectory))
+
+    def extend(self, frame):
+        self.stream.extend(self.alter_frame(frame))
+
+    def can_continue(self):
+        return self.stream.can_continue()
+
+
 class Ensemble(with_metaclass(abc.ABCMeta, StorableNamedObject)):
     """
     Path ensemble object.
@@ -371,6 +677,96 @@ class Ensemble(with_metaclass(abc.ABCMeta, StorableNamedObject)):
         # default behavior is to be the same as can_prepend
         return self.can_prepend(trajectory, trusted)
 
+    _stream_checks = ['can_append', 'can_prepend',
+                      'strict_can_append', 'strict_can_prepend']
+
+    def _overrides(self, check, cls):
+        """True if `check` is implemented differently than in `cls`"""
+        return getattr(type(self), check) is not getattr(cls, check)
+
+    def stream(self, check='can_append', direction=+1):
+        """
+        Return a stream that evaluates an extension check incrementally.
+
+        Engines use this to evaluate the stopping conditions while a
+        trajectory is generated, feeding in one frame at a time. Ensembles
+        that know how to update the result for a new frame in constant time
+        return a specialized :class:`.EnsembleStream`; the default stream
+        calls the check with the whole (trusted) trajectory.
+
+        Parameters
+        ----------
+        check : str
+            name of the check, one of `can_append`, `can_prepend`,
+            `strict_can_append` and `strict_can_prepend`
+        direction : +1 or -1
+            whether the generated trajectory grows at its end (+1) or at its
+            beginning (-1)
+
+        Returns
+        -------
+        :class:`.EnsembleStream`
+            the stream; call `start` with the initial trajectory before
+            using it
+        """
+        return EnsembleStream(getattr(self, check), direction)
+
+    def _slice_checks(self, trajectory):
+        """
+        Tests for the subtrajectories ``trajectory[start:end]``.
+
+        Used to scan a trajectory for subtrajectories in the ensemble. If
+        the ensemble can be compiled (see
+        :mod:`openpathsampling.compiled_ensemble`), every volume is
+        evaluated once for the whole trajectory, and each test is a lookup
+        in the resulting masks. Otherwise, the subtrajectories are sliced
+        and given to the ensemble.
+
+        Parameters
+        ----------
+        trajectory : :class:`openpathsampling.trajectory.Trajectory`
+            the trajectory to be scanned
+
+        Returns
+        -------
+        in_ensemble : function(int, int) -> bool
+            whether ``trajectory[start:end]`` is in the ensemble
+        strict_can_append : function(int, int) -> bool
+            `strict_can_append` for ``trajectory[start:end]``
+        """
+        from openpathsampling.compiled_ensemble import (
+            FrameMasks, compile_ensemble
+        )
+        matcher = compile_ensemble(self, sequences=True)
+        if matcher is not None:
+            masks = FrameMasks(trajectory)
+
+            def in_ensemble(start, end):
+                return matcher.call(masks, start, end - start)
+
+            def strict_can_append(start, end):
+                return matcher.strict_can_append(masks, start, end - start)
+
+            return in_ensemble, strict_can_append
+
+        # successive tests mostly extend the last subtrajectory by one
+        # frame; then the caches of the ensemble can be trusted
+        last = {'length': 0}
+
+        def in_ensemble(start, end):
+            return self(trajectory[start:end], trusted=False)
+
+        def strict_can_append(start, end):
+            tt = trajectory[start:end]
+            trusted = len(tt) == last['length'] + 1
+            last['length'] = len(tt)
+            if trusted:
+                return self.strict_can_append(tt, trusted=True)
+            else:
+                return self.strict_can_append(tt)
+
+        return in_ensemble, strict_can_append
+
     def iter_valid_slices(
             self,
             trajectory,
@@ -418,26 +814,19 @@ class Ensemble(with_metaclass(abc.ABCMeta, StorableNamedObject)):
         old_tt_len = 0
 
         if not reverse:
+            in_ensemble, strict_can_append = self._slice_checks(trajectory)
             start = 0
             end = start + min_length
 
             while start <= length - min_length and end <= length:
                 # print start, end
-                tt = trajectory[start:end]
-
-                if len(tt) != old_tt_len + 1:
-                    can_append_tt = self.strict_can_append(tt)
-                else:
-                    can_append_tt = self.strict_can_append(tt, trusted=True)
-                old_tt_len = len(tt)
-
-                if end < length and can_append_tt:
+                if end < length and strict_can_append(start, end):
                     end += 1
                     if end - start > max_length + 1:
                         start += 1
                         end = start + min_length
                 else:
-                    if end - start <= max_length and self(tt, trusted=False):
+                    if end - start <= max_length and in_ensemble(start, end):
                         yield slice(start, end)
                         pad = min(overlap, end - start - 1)
                         start = end - pad
@@ -447,7 +836,7 @@ class Ensemble(with_metaclass(abc.ABCMeta, StorableNamedObject)):
                             # in already existing ones
                             start = length
                     elif end - start >= min_length + 1 and \
-                            self(tt[0:len(tt) - 1], trusted=False):
+                            in_ensemble(start, end - 1):
                         yield slice(start, end - 1)
                         pad = min(overlap + 1, end - start - 2)
                         start = end - pad
@@ -560,20 +949,13 @@ class Ensemble(with_metaclass(abc.ABCMeta, StorableNamedObject)):
         old_tt_len = 0
 
         if not reverse:
+            _, strict_can_append = self._slice_checks(trajectory)
             start = 0
             end = start + min_length
 
             while start <= length - min_length and end <= length:
                 # print start, end
-                tt = trajectory[start:end]
-
-                if len(tt) != old_tt_len + 1:
-                    can_append_tt = self.strict_can_append(tt)
-                else:
-                    can_append_tt = self.strict_can_append(tt, trusted=True)
-                old_tt_len = len(tt)
-
-                if end < length and can_append_tt:
+                if end < length and strict_can_append(start, end):
                     end += 1
                     if end - start > max_length + 1:
                         start += 1
@@ -1167,6 +1549,9 @@ class EmptyEnsemble(Ensemble):
     def can_prepend(self, trajectory, trusted=False):
         return False
 
+    def stream(self, check='can_append', direction=+1):
+        return ConstantEnsembleStream(False, direction)
+
     def __invert__(self):
         return FullEnsemble()
 
@@ -1203,6 +1588,9 @@ class FullEnsemble(Ensemble):
     def can_prepend(self, trajectory, trusted=False):
         return True
 
+    def stream(self, check='can_append', direction=+1):
+        return ConstantEnsembleStream(True, direction)
+
     def __invert__(self):
         return EmptyEnsemble()
 
@@ -1253,6 +1641,9 @@ class NegatedEnsemble(Ensemble):
         # We cannot guess the result here so keep on running forever
         return True
 
+    def stream(self, check='can_append', direction=+1):
+        return ConstantEnsembleStream(True, direction)
+
     def _str(self):
         return 'not ' + str(self.ensemble)
 
@@ -1379,6 +1770,18 @@ class EnsembleCombination(Ensemble):
             fname="strict_can_prepend"
         )
 
+    def stream(self, check='can_append', direction=+1):
+        if check in self._stream_checks and \
+                not self._overrides(check, EnsembleCombination):
+            return CombinationEnsembleStream(
+                self.fnc,
+                self.ensemble1.stream(check, direction),
+                self.ensemble2.stream(check, direction),
+                direction
+            )
+        else:
+            return super(EnsembleCombination, self).stream(check, direction)
+
     def _str(self):
         # print self.sfnc, self.ensemble1, self.ensemble2,
         # print self.sfnc.format(
@@ -1482,6 +1885,11 @@ class SequentialEnsemble(Ensemble):
         self._cache_strict_can_prepend = EnsembleCache(-1)
         self._cache_check_reverse = EnsembleCache(-1)
 
+        # compiled sub-ensembles can be turned off, too
+        self._use_compiled = True
+        self._matchers = None
+        self._matchers_compiled = False
+
         # sanity checks
         if len(self.min_overlap) != len(self.max_overlap):
             raise ValueError("len(min_overlap) != len(max_overlap)")
@@ -1580,7 +1988,39 @@ class SequentialEnsemble(Ensemble):
                 else:
                     return transitions
 
+    def _compiled_matchers(self):
+        """
+        The sub-ensembles, compiled to work on volume memberships.
+
+        See :mod:`openpathsampling.compiled_ensemble`.
+
+        Returns
+        -------
+        list of :class:`.Matcher` or None
+            the compiled sub-ensembles; None if they cannot be used (some
+            sub-ensemble is opaque, or a subclass changed the matching)
+        """
+        if not self._use_compiled:
+            return None
+        if not self._matchers_compiled:
+            from openpathsampling.compiled_ensemble import compile_sequence
+            if any(self._overrides(name, SequentialEnsemble)
+                   for name in ['transition_frames', '_find_subtraj_final',
+                                '__call__']):
+                self._matchers = None
+            else:
+                self._matchers = compile_sequence(self.ensembles)
+            self._matchers_compiled = True
+        return self._matchers
+
     def __call__(self, trajectory, trusted=None, candidate=False):
+        matchers = self._compiled_matchers()
+        if matchers is not None:
+            from openpathsampling.compiled_ensemble import (
+                FrameMasks, sequence_call
+            )
+            return sequence_call(matchers, FrameMasks(trajectory))
+
         logger.debug("Looking for transitions in trajectory " + str(trajectory))
         transitions = self.transition_frames(trajectory, trusted)
         logger.debug("Found transitions: " + str(transitions))
@@ -1670,7 +2110,7 @@ class SequentialEnsemble(Ensemble):
                          str(subtraj_final) + " / " + str(len(traj)))
         return subtraj_first + 1
 
-    def _generic_can_append(self, trajectory, trusted, strict):
+    def _generic_can_append(self, trajectory, trusted, strict, cache=None):
         # treat this like we're implementing a regular expression parser ...
         # .*ensemble.+ ; but we have to do this for all possible matches
         # There are three tests we consider:
@@ -1683,9 +2123,10 @@ class SequentialEnsemble(Ensemble):
         # (c) loop around to text another subtrajectory (we can't tell)
         # Returning false can only happen if all ensembles have been tested
         # self._check_cache(trajectory, function="can_append")
-        cache = self._cache_can_append
-        if strict:
-            cache = self._cache_strict_can_append
+        if cache is None:
+            cache = self._cache_can_append
+            if strict:
+                cache = self._cache_strict_can_append
 
         if trusted:
             cache.trusted = True
@@ -1861,11 +2302,13 @@ class SequentialEnsemble(Ensemble):
     def strict_can_append(self, trajectory, trusted=False):
         return self._generic_can_append(trajectory, trusted, strict=True)
 
-    def _generic_can_prepend(self, trajectory, trusted, strict):
+    def _generic_can_prepend(self, trajectory, trusted, strict,
+                             cache=None):
         # based on .can_append(); see notes there for algorithm details
-        cache = self._cache_can_prepend
-        if strict:
-            cache = self._cache_strict_can_prepend
+        if cache is None:
+            cache = self._cache_can_prepend
+            if strict:
+                cache = self._cache_strict_can_prepend
         if trusted:
             cache.trusted = True
 
@@ -2031,6 +2474,26 @@ class SequentialEnsemble(Ensemble):
     def strict_can_prepend(self, trajectory, trusted=False):
         return self._generic_can_prepend(trajectory, trusted, strict=True)
 
+    def stream(self, check='can_append', direction=+1):
+        if check in self._stream_checks and \
+                not self._overrides(check, SequentialEnsemble):
+            # the stream uses its own cache, so that it is not reset by
+            # other calls while the trajectory is generated
+            strict = check.startswith('strict')
+            if check.endswith('append'):
+                cache = EnsembleCache(+1)
+                generic_check = self._generic_can_append
+            else:
+                cache = EnsembleCache(-1)
+                generic_check = self._generic_can_prepend
+
+            def cached_check(trajectory, trusted):
+                return generic_check(trajectory, trusted, strict, cache)
+
+            return EnsembleStream(cached_check, direction)
+        else:
+            return super(SequentialEnsemble, self).stream(check, direction)
+
     def _str(self):
         head = "[\n"
         tail = "\n]"
@@ -2066,8 +2529,7 @@ class LengthEnsemble(Ensemble):
             return length >= self.length.start and (
                 self.length.stop is None or length < self.length.stop)
 
-    def can_append(self, trajectory, trusted=False):
-        length = len(trajectory)
+    def _can_extend_length(self, length):
         if type(self.length) is int:
             return_value = (length < self.length)
             logger.debug("LengthEnsemble.can_append: Segment length " +
@@ -2077,9 +2539,19 @@ class LengthEnsemble(Ensemble):
         else:
             return self.length.stop is None or length < self.length.stop - 1
 
+    def can_append(self, trajectory, trusted=False):
+        return self._can_extend_length(len(trajectory))
+
     def can_prepend(self, trajectory, trusted=False):
         return self.can_append(trajectory)
 
+    def stream(self, check='can_append', direction=+1):
+        if check in self._stream_checks and \
+                not self._overrides(check, LengthEnsemble):
+            return LengthEnsembleStream(self, direction)
+        else:
+            return super(LengthEnsemble, self).stream(check, direction)
+
     def _str(self):
         if type(self.length) is int:
             return 'len(x) = {0}'.format(self.length)
@@ -2212,10 +2684,8 @@ class AllInXEnsemble(VolumeEnsemble):
         else:
             logger.debug("Untrusted VolumeEnsemble " + repr(self))
             # logger.debug("Trajectory " + repr(trajectory))
-            for frame in trajectory.as_proxies():
-                if not self._volume(frame):
-                    return False
-            return True
+            frames = trajectory.as_proxies()
+            return _first_frame_with(self._volume, frames, False) is None
 
     def check_reverse(self, trajectory, trusted=False):
         # order in this one only matters if it is trusted
@@ -2228,6 +2698,14 @@ class AllInXEnsemble(VolumeEnsemble):
             # print "Rev UnTrusted"
             return self(trajectory)  # in this case, order wouldn't matter
 
+    def stream(self, check='can_append', direction=+1):
+        if check in self._stream_checks and \
+                not self._overrides(check, AllInXEnsemble):
+            # all checks are the same: are all frames in the volume?
+            return AllInVolumeStream(self._volume, direction)
+        else:
+            return super(AllInXEnsemble, self).stream(check, direction)
+
     def __invert__(self):
         return PartOutXEnsemble(self.volume, self.trusted)
 
@@ -2268,10 +2746,8 @@ class PartInXEnsemble(VolumeEnsemble):
         trajectory : :class:`openpathsampling.trajectory.Trajectory`
             The trajectory to be checked
         """
-        for frame in trajectory.as_proxies():
-            if self._volume(frame):
-                return True
-        return False
+        frames = trajectory.as_proxies()
+        return _first_frame_with(self._volume, frames, True) is not None
 
     def __invert__(self):
         return AllOutXEnsemble(self.volume, self.trusted)
@@ -2294,10 +2770,8 @@ class PartOutXEnsemble(PartInXEnsemble):
         return AllInXEnsemble(self.volume, self.trusted)
 
     def __call__(self, trajectory, trusted=None, candidate=False):
-        for frame in trajectory.as_proxies():
-            if self._volume(frame):
-                return True
-        return False
+        frames = trajectory.as_proxies()
+        return _first_frame_with(self._volume, frames, True) is not None
 
 
 
@@ -2346,6 +2820,14 @@ class WrappedEnsemble(Ensemble):
         return self._new_ensemble.strict_can_prepend(self._alter(trajectory),
                                                      trusted)
 
+    def stream(self, check='can_append', direction=+1):
+        if check in self._stream_checks and \
+                not self._overrides('_alter', WrappedEnsemble) and \
+                not self._overrides(check, WrappedEnsemble):
+            return self._new_ensemble.stream(check, direction)
+        else:
+            return super(WrappedEnsemble, self).stream(check, direction)
+
     def _str(self):
         return str(self._new_ensemble)
 
@@ -2419,6 +2901,20 @@ class SuffixTrajectoryEnsemble(WrappedEnsemble):
     def can_append(self, trajectory, trusted=None):
         raise RuntimeError("SuffixTrajectoryEnsemble.can_append is nonsense.")
 
+    def stream(self, check='can_prepend', direction=+1):
+        if check in ['can_prepend', 'strict_can_prepend'] and direction > 0:
+            # frames are generated in reversed order (backward shooting):
+            # each new frame is prepended, reversed, to the wrapped trajectory
+            return AlteredEnsembleStream(
+                self._new_ensemble.stream(check, -1),
+                lambda traj: traj.reversed + self.add_trajectory,
+                lambda frame: frame.reversed,
+                direction
+            )
+        else:
+            return super(SuffixTrajectoryEnsemble, self).stream(check,
+                                                                direction)
+
     def strict_can_append(self, trajectory, trusted=None):
         # was overridden in WrappedEnsemble: here should raise same error as
         # can_append does
@@ -2464,6 +2960,18 @@ class PrefixTrajectoryEnsemble(WrappedEnsemble):
     def can_prepend(self, trajectory, trusted=None):
         raise RuntimeError("PrefixTrajectoryEnsemble.can_prepend is nonsense.")
 
+    def stream(self, check='can_append', direction=+1):
+        if check in ['can_append', 'strict_can_append'] and direction > 0:
+            return AlteredEnsembleStream(
+                self._new_ensemble.stream(check, +1),
+                lambda traj: self.add_trajectory + traj,
+                lambda frame: frame,
+                direction
+            )
+        else:
+            return super(PrefixTrajectoryEnsemble, self).stream(check,
+                                                                direction)
+
     def strict_can_prepend(self, trajectory, trusted=None):
         # was overridden in WrappedEnsemble: here should raise same error as
         # can_append does
@@ -57,19 +57,42 @@ class MoveAcceptanceAnalysis(SimpleProgress):
             self._accepted[key] += 1 if m.accepted else 0
             self._trials[key] += 1
 
+    def _add_step_index(self, index):
+        counts = collections.Counter(index.change.tolist())
+        trials = collections.Counter()
+        accepted = collections.Counter()
+        for change, n_steps in counts.items():
+            for idx, key in index.change_keys(change):
+                mover = index.change_mover[idx]
+                trials[(mover, key)] += n_steps
+                if index.change_accepted[idx]:
+                    accepted[(mover, key)] += n_steps
+
+        movers = index.storage.pathmovers
+        for (mover_idx, key), n_try in trials.items():
+            mover = movers[int(mover_idx)] if mover_idx >= 0 else None
+            self._trials[(mover, key)] += n_try
+            self._accepted[(mover, key)] += accepted[(mover_idx, key)]
+
     def add_steps(self, steps):
         """Add steps to the internal counters.
 
         Parameters
         ----------
-        steps : list of :class:`.MCStep`
-            the input steps
+        steps : list of :class:`.MCStep` or :class:`.StepIndex`
+            the input steps. A :class:`.StepIndex` is analyzed from its
+            tables without loading the move changes
 
         Returns
         -------
         self : :class:`.MoveAcceptanceAnalysis`
             returns self for possible chaining
         """
+        if isinstance(steps, paths.storage.StepIndex):
+            self._add_step_index(steps)
+            self._n_steps += len(steps)
+            return self
+
         for step in self.progress(steps):
             self._calculate_step_acceptance(step)
         self._n_steps += len(steps)
@@ -771,6 +794,27 @@ class MoveScheme(StorableNamedObject):
                 raise TypeError(msg)
         return movers
 
+    def commuting_movers(self, mover):
+        """
+        Split movers into lists of movers that act on disjoint ensembles.
+
+        Movers in the same list commute, so they can be run concurrently by
+        a :class:`.ConcurrentMover`.
+
+        Parameters
+        ----------
+        mover : PathMover or list of PathMover or string
+            The movers to split. See MoveScheme._select_movers for
+            interpretation.
+
+        Returns
+        -------
+        list of list of PathMover
+            lists of commuting movers
+        """
+        movers = self._select_movers(mover)
+        return paths.ConcurrentMover.commuting_sets(movers)
+
     def n_steps_for_trials(self, mover, n_attempts):
         """
         Return number of MC steps to expect `n_attempts` trials of `mover`.
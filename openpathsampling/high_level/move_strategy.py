@@ -680,6 +680,44 @@ class EnsembleHopStrategy(ReplicaExchangeStrategy):
         return hops
 
 
+class ConcurrentMoveStrategy(MoveStrategy):
+    """
+    Runs the commuting movers of a group concurrently.
+
+    The movers of `from_group` (by default, the shooting movers) are
+    combined into :class:`.ConcurrentMover` instances, one for each set of
+    movers that act on disjoint ensembles. Each MC step that selects such a
+    mover runs all its moves, with the engine propagation in `n_workers`
+    worker processes.
+    """
+    _level = levels.SUPERGROUP
+    def __init__(self, ensembles=None, group="shooting", replace=True,
+                 from_group=None, n_workers=None):
+        super(ConcurrentMoveStrategy, self).__init__(
+            ensembles=ensembles, group=group, replace=replace
+        )
+        self.n_workers = n_workers
+        self.from_group = from_group
+        if self.from_group is None:
+            self.from_group = self.group
+
+    def make_movers(self, scheme):
+        # a KeyError here indicates that there is no existing group of that
+        # name: build scheme.movers[self.from_group] before trying to use it!
+        commuting = scheme.commuting_movers(scheme.movers[self.from_group])
+        movers = []
+        for sub_movers in commuting:
+            if len(sub_movers) == 1:
+                movers.append(sub_movers[0])
+            else:
+                mover = paths.ConcurrentMover(sub_movers,
+                                              n_workers=self.n_workers)
+                mover.named("Concurrent " + self.group.capitalize() + " "
+                            + str(len(movers)))
+                movers.append(mover)
+        return movers
+
+
 class PathReversalStrategy(MoveStrategy):
     """
     Creates PathReversalMovers for the strategy.
@@ -1,6 +1,7 @@
 """
 Tools for integration with miscellaneous non-required packages.
 """
+import sys
 
 def error_if_no(name, package_name, has_package):
     if not has_package:
@@ -26,17 +27,31 @@ def error_if_no_simtk_unit(name):
     return error_if_no(name, "simtk.unit", HAS_SIMTK_UNIT)
 
 # mdtraj ############################################################
-try:
-    import mdtraj as md
-except ImportError:
-    md = None
-    HAS_MDTRAJ = False
-else:
-    HAS_MDTRAJ = True
+# importing mdtraj is slow, so it is only imported when `md` or `HAS_MDTRAJ`
+# are used first
+def _import_mdtraj():
+    try:
+        import mdtraj as md
+    except ImportError:
+        md = None
+    globals().update(md=md, HAS_MDTRAJ=md is not None)
 
 def error_if_no_mdtraj(name):
+    if 'HAS_MDTRAJ' not in globals():
+        _import_mdtraj()
     return error_if_no(name, "mdtraj", HAS_MDTRAJ)
 
+def __getattr__(name):
+    if name in ['md', 'HAS_MDTRAJ']:
+        _import_mdtraj()
+        return globals()[name]
+    raise AttributeError(
+        "module '%s' has no attribute '%s'" % (__name__, name))
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # no module level __getattr__
+    _import_mdtraj()
+
 # openmm ############################################################
 try:
     from simtk import openmm
@@ -48,3 +63,15 @@ else:
 
 def error_if_to_openmm(name):
     return error_if_no(name, "openmm", HAS_OPENMM)
+
+# msgpack ###########################################################
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+    HAS_MSGPACK = False
+else:
+    HAS_MSGPACK = True
+
+def error_if_no_msgpack(name):
+    return error_if_no(name, "msgpack", HAS_MSGPACK)
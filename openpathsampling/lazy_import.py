@@ -0,0 +1,94 @@
+"""
+Deferred imports of the heavy parts of a package namespace
+
+Packages list the names they export lazily together with the module that
+defines them. The module is only imported when the name is first used,
+through the module level ``__getattr__`` of PEP 562. On Python versions
+without it (< 3.7) everything is imported right away, as before.
+
+Example, in a package ``__init__.py``::
+
+    from openpathsampling.lazy_import import lazy_attributes
+    __getattr__, __dir__ = lazy_attributes(__name__, globals(), {
+        'ReplicaNetwork': ('.replica_network', 'ReplicaNetwork'),
+        'tis': ('.tis', None),  # the module itself
+    })
+"""
+import importlib
+import sys
+
+HAS_MODULE_GETATTR = sys.version_info >= (3, 7)
+
+# all lazily exported names as {package: {name: (module, attribute)}}
+_registry = {}
+
+
+def _resolve(package, namespace, name):
+    module_name, attribute = _registry[package][name]
+    module = importlib.import_module(module_name, package)
+    if attribute is None:
+        value = module
+    else:
+        value = getattr(module, attribute)
+    # cache it, so `__getattr__` is only used once per name
+    namespace[name] = value
+    return value
+
+
+def lazy_attributes(package, namespace, attributes):
+    """
+    Export names of a package that are imported on first use
+
+    Parameters
+    ----------
+    package : str
+        the name of the package, usually `__name__`
+    namespace : dict
+        the namespace of the package, usually `globals()`
+    attributes : dict of str: (str, str or None)
+        for each exported name the (relative or absolute) name of the module
+        and the name of the attribute in that module; None exports the
+        module itself
+
+    Returns
+    -------
+    __getattr__ : callable
+        the module level `__getattr__` for the package
+    __dir__ : callable
+        the module level `__dir__` for the package, which includes the lazy
+        names
+    """
+    _registry.setdefault(package, {}).update(attributes)
+
+    def __getattr__(name):
+        if name in _registry[package]:
+            return _resolve(package, namespace, name)
+        raise AttributeError(
+            "module '%s' has no attribute '%s'" % (package, name))
+
+    def __dir__():
+        return sorted(set(namespace) | set(_registry[package]))
+
+    if not HAS_MODULE_GETATTR:  # pragma: no cover
+        for name in attributes:
+            _resolve(package, namespace, name)
+
+    return __getattr__, __dir__
+
+
+def import_lazy_modules():
+    """
+    Import all modules that are exported lazily
+
+    This is needed whenever all classes must be known, e.g. to create
+    objects from their class names when loading from storage.
+    """
+    for package, attributes in list(_registry.items()):
+        namespace = vars(sys.modules[package])
+        for name in list(attributes):
+            if name not in namespace:
+                try:
+                    _resolve(package, namespace, name)
+                except ImportError:
+                    # optional dependencies missing; nothing to register
+                    pass
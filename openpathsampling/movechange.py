@@ -60,6 +60,23 @@ class MoveChange(TreeMixin, StorableObject):
 
         self.details = details
 
+    def to_dict(self):
+        return {
+            'mover': self.mover,
+            'details': self.details,
+            'samples': self.samples,
+            'input_samples': self.input_samples,
+            'subchanges': self.subchanges
+        }
+
+    @classmethod
+    def from_dict(cls, dct):
+        # subclasses have different signatures, but all share the content
+        # of the base class (same as in the MoveChangeStore)
+        obj = cls.__new__(cls)
+        MoveChange.__init__(obj, **dct)
+        return obj
+
     def __getattr__(self, item):
         # try to get attributes from details dict
         try:
@@ -1,8 +1,12 @@
 from .base import StorableNamedObject, StorableObject, create_to_dict
 from .cache import WeakKeyCache, WeakLRUCache, WeakValueCache, MaxCache, \
-    NoCache, Cache, LRUCache, LRUChunkLoadingCache
+    NoCache, Cache, LRUCache, LRUChunkLoadingCache, ByteLRUCache, \
+    CacheStats, CountingCache, estimate_nbytes
+from .codec import Codec, JSONCodec, MsgPackCodec, register_codec, get_codec
 from .dictify import ObjectJSON, StorableObjectJSON, UUIDObjectJSON
 from .netcdfplus import NetCDFPlus
+from .writer import BackgroundWriter
+from .arrays import LazyArray
 
 from .stores import ObjectStore
 from .stores import IndexedObjectStore
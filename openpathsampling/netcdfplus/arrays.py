@@ -0,0 +1,141 @@
+from uuid import UUID
+
+import numpy as np
+
+from .netcdfplus import NetCDFPlus
+
+
+class LazyArray(object):
+    """
+    Read-only array view of a netCDF variable that reads on demand
+
+    Nothing is read when the array is created. Indexing reads only the
+    requested rows and iterating reads the variable in chunks, so even
+    very large files can be analysed without loading them into memory.
+
+    If the variable references stored objects, the objects are not loaded.
+    Instead every reference is translated into the integer index of the
+    object in its store (-1 for None or objects missing in the store).
+    Rows of variable length variables are returned as numpy arrays.
+
+    Parameters
+    ----------
+    variable : netCDF4.Variable
+        the variable, as in `store.variables[name]`
+    store : :class:`openpathsampling.netcdfplus.ObjectStore` or None
+        the store the references in the variable point to. If None, the
+        values are returned as they are stored
+    chunksize : int
+        the number of rows read at once while iterating
+
+    See Also
+    --------
+    from_store
+    """
+
+    def __init__(self, variable, store=None, chunksize=65536):
+        self.variable = variable
+        self.store = store
+        self.chunksize = chunksize
+        self.ragged = hasattr(variable, 'var_vlen')
+        # reads hold the lock of the file, if it has one
+        lock = getattr(variable.group(), 'io_lock', None)
+        self._rows = NetCDFPlus.ValueDelegate(variable, lock=lock)
+
+    @classmethod
+    def from_store(cls, store, name, chunksize=65536):
+        """
+        Create the array for a variable of a store
+
+        References to objects (variable types `obj.<store>` and
+        `lazyobj.<store>`) are translated into indices of `<store>`.
+
+        Parameters
+        ----------
+        store : :class:`openpathsampling.netcdfplus.ObjectStore`
+            the store that has the variable
+        name : str
+            the name of the variable in the store
+        chunksize : int
+            the number of rows read at once while iterating
+
+        Returns
+        -------
+        :class:`LazyArray`
+        """
+        variable = store.variables[name]
+        var_type = getattr(variable, 'var_type', '')
+        target = None
+        if var_type.startswith('obj.') or var_type.startswith('lazyobj.'):
+            target = store.storage._stores[var_type.split('.')[1]]
+
+        return cls(variable, target, chunksize)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def shape(self):
+        return (len(self),) + tuple(self.variable.shape[1:])
+
+    def __repr__(self):
+        return 'LazyArray(%s, shape=%s)' % (self.variable.name, self.shape)
+
+    def _index(self, uuid):
+        if uuid[0] == '-':
+            return -1
+        idx = self.store.index.get(int(UUID(uuid)), -1)
+        return idx if idx >= 0 else -1
+
+    def _convert(self, values):
+        if self.store is None:
+            if self.ragged:
+                return [np.asarray(value) for value in values]
+            return np.asarray(values)
+
+        if self.ragged:
+            return [
+                np.array([
+                    self._index(uuid)
+                    for uuid in NetCDFPlus.to_uuid_chunks(value)
+                ], dtype=np.int64)
+                for value in values
+            ]
+
+        return np.array([self._index(uuid) for uuid in values],
+                        dtype=np.int64)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError('index %d is out of range' % key)
+            return self._convert(self._rows.read_rows([key]))[0]
+        elif isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step > 0 and start < stop:
+                with self._rows.lock:
+                    values = self.variable[start:stop][::step]
+            else:
+                values = self._rows.read_rows(range(start, stop, step))
+            return self._convert(values)
+        else:
+            key = np.asarray(key)
+            if key.dtype == bool:
+                key = np.flatnonzero(key)
+            key = np.where(key < 0, key + len(self), key)
+            return self._convert(self._rows.read_rows(key))
+
+    def __iter__(self):
+        for start in range(0, len(self), self.chunksize):
+            for value in self[start:start + self.chunksize]:
+                yield value
+
+    def __array__(self, dtype=None):
+        values = self[:]
+        if self.ragged:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            return array
+        return np.asarray(values, dtype=dtype)
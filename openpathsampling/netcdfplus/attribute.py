@@ -1,6 +1,6 @@
 from . import chaindict as cd
 from .base import StorableNamedObject, create_to_dict
-from .cache import WeakKeyCache
+from .cache import WeakKeyCache, CacheStats
 from .dictify import ObjectJSON
 from .stores.object import ObjectStore
 
@@ -72,6 +72,7 @@ class PseudoAttribute(cd.Wrap, StorableNamedObject):
         )
         self._store_dict = None
         self._eval_dict = None
+        self._chain_stats = None
         self.stores = []
 
         super(PseudoAttribute, self).__init__(
@@ -97,6 +98,30 @@ class PseudoAttribute(cd.Wrap, StorableNamedObject):
         self.diskcache_enabled = False
         return self
 
+    def with_executor(self, executor=None, chunksize=None):
+        """
+        Evaluate missing values in chunks and possibly in parallel
+
+        Parameters
+        ----------
+        executor : object or None
+            object with a `map(fnc, chunks)` method to evaluate the chunks,
+            e.g. a `concurrent.futures.ThreadPoolExecutor` or an
+            :class:`.AttributeWorkerPool`.
+            If `None` the chunks are evaluated one after the other
+        chunksize : int or None
+            the number of objects evaluated at once. If `None` all missing
+            values are evaluated at once without an executor and in chunks of
+            `Function.default_chunksize` with an executor
+
+        See Also
+        --------
+        :class:`openpathsampling.netcdfplus.chaindict.Function`
+        """
+        self._eval_dict.executor = executor
+        self._eval_dict.chunksize = chunksize
+        return self
+
     def set_cache_store(self, value_store):
         """
         Attach store variables to the collective variables.
@@ -138,6 +163,57 @@ class PseudoAttribute(cd.Wrap, StorableNamedObject):
             self._store_dict = None
 
         self._cache_dict._post = last_cv
+        self._attach_chain_stats()
+
+    def enable_stats(self):
+        """
+        Count hits, misses and time in each layer of the evaluation chain
+
+        See Also
+        --------
+        chain_stats
+        """
+        if self._chain_stats is None:
+            self._chain_stats = {
+                'cache': CacheStats(),
+                'disk': CacheStats(),
+                'eval': CacheStats()
+            }
+        self._attach_chain_stats()
+        return self
+
+    def disable_stats(self):
+        """
+        Stop counting and remove the statistics of the evaluation chain
+        """
+        self._chain_stats = None
+        self._attach_chain_stats()
+        return self
+
+    @property
+    def chain_stats(self):
+        """
+        dict of str: :class:`openpathsampling.netcdfplus.CacheStats` or None :
+        the statistics of the memory cache (`cache`), the stores (`disk`)
+        and the function (`eval`) if enabled by :meth:`enable_stats`. The
+        hits of `disk` are values loaded from storage and the hits of `eval`
+        are evaluations
+        """
+        return self._chain_stats
+
+    def _attach_chain_stats(self):
+        stats = self._chain_stats
+        if stats is None:
+            stats = {'cache': None, 'disk': None, 'eval': None}
+
+        self._cache_dict.stats = stats['cache']
+        layer = self._cache_dict._post
+        while isinstance(layer, cd.StoredDict):
+            layer.stats = stats['disk']
+            layer = layer._post
+
+        if self._eval_dict is not None:
+            self._eval_dict.stats = stats['eval']
 
     # This is important since we subclass from list and lists are not hashable
     # but CVs should be
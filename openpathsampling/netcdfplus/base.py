@@ -43,6 +43,23 @@ class StorableObject(object):
         StorableObject.ACTIVE_LONG += 2
         return StorableObject.ACTIVE_LONG
 
+    @staticmethod
+    def reset_uuid_generator():
+        """
+        Start a new sequence of UUIDs for objects created from now on
+
+        Worker processes that are forked from a running process inherit its
+        UUID sequence and would create objects with clashing UUIDs. They
+        need to call this once before they create any new objects.
+        """
+        StorableObject.INSTANCE_UUID = list(uuid.uuid4().fields[:-1])
+        StorableObject.ACTIVE_LONG = int(uuid.UUID(
+            fields=tuple(
+                StorableObject.INSTANCE_UUID +
+                [StorableObject.CREATION_COUNT]
+            )
+        ))
+
     def reverse_uuid(self):
         return self.__uuid__ ^ 1
 
@@ -1,6 +1,10 @@
 from collections import OrderedDict
+import sys
+import time
 import weakref
 
+import numpy as np
+
 __author__ = 'Jan-Hendrik Prinz'
 
 
@@ -338,6 +342,290 @@ class WeakLRUCache(Cache):
             yield key
 
 
+def _value_nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    elif hasattr(value, '_value') and hasattr(value, 'unit'):
+        # a simtk.unit.Quantity
+        return _value_nbytes(value._value)
+    elif isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(
+            item.nbytes for item in value if isinstance(item, np.ndarray))
+    else:
+        return sys.getsizeof(value)
+
+
+def estimate_nbytes(obj):
+    """
+    Approximate memory used by an object
+
+    This counts the object itself and the attributes it holds. Arrays, also
+    with units, are counted with their full size, but other referenced
+    objects are not followed, since they are usually cached themselves.
+    For snapshots the coordinate and velocity arrays dominate the result.
+
+    Parameters
+    ----------
+    obj : object
+        the object
+
+    Returns
+    -------
+    int
+        the approximate size in bytes
+    """
+    nbytes = _value_nbytes(obj)
+    for value in getattr(obj, '__dict__', {}).values():
+        nbytes += _value_nbytes(value)
+
+    return nbytes
+
+
+class CacheStats(object):
+    """
+    Counts how often a cache was hit, missed and had to evict objects
+
+    The same counters are used to instrument stores and the layers of a
+    :class:`openpathsampling.netcdfplus.chaindict.ChainDict`, which also
+    measure the time spent.
+
+    Attributes
+    ----------
+    hits : int
+        number of requested items that were found
+    misses : int
+        number of requested items that were not found
+    evictions : int
+        number of items that were dropped to stay in the limits
+    time : float
+        the time in seconds spent on the requests, if measured
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.time = 0.0
+
+    @property
+    def hit_rate(self):
+        """
+        float : the fraction of requests that were hits, NaN if there were
+        no requests
+        """
+        requests = self.hits + self.misses
+        return float(self.hits) / requests if requests > 0 else float('nan')
+
+    def reset(self):
+        """
+        Set all counters to zero
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.time = 0.0
+
+    def to_dict(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'time': self.time
+        }
+
+    def __repr__(self):
+        return '%s(hits=%d, misses=%d, evictions=%d, time=%.3fs)' % (
+            self.__class__.__name__, self.hits, self.misses, self.evictions,
+            self.time)
+
+
+class CountingCache(Cache):
+    """
+    Wraps a cache and counts its hits and misses
+
+    The time between a miss and the next time the missing key is set is
+    counted as the time to load it, including the time to load the objects
+    it references.
+
+    Parameters
+    ----------
+    cache : :class:`Cache`
+        the cache to be wrapped
+    stats : :class:`CacheStats` or None
+        the counters to be used. If `None` (default) new ones are created
+    """
+
+    def __init__(self, cache, stats=None):
+        super(CountingCache, self).__init__()
+        self.cache = cache
+        self.stats = CacheStats() if stats is None else stats
+        self._pending = {}
+
+    @property
+    def count(self):
+        return self.cache.count
+
+    @property
+    def size(self):
+        return self.cache.size
+
+    def __str__(self):
+        return 'Counting%s' % self.cache
+
+    def __getitem__(self, item):
+        try:
+            obj = self.cache[item]
+        except KeyError:
+            self.stats.misses += 1
+            self._pending[item] = time.time()
+            raise
+
+        self.stats.hits += 1
+        return obj
+
+    def __setitem__(self, key, value):
+        start = self._pending.pop(key, None)
+        if start is not None:
+            self.stats.time += time.time() - start
+        self.cache[key] = value
+
+    def __getattr__(self, item):
+        # pass on cache specific methods, like `load_max`
+        if item == 'cache':
+            raise AttributeError(item)
+        return getattr(self.cache, item)
+
+    def get_silent(self, item):
+        return self.cache.get_silent(item)
+
+    def __contains__(self, item):
+        return item in self.cache
+
+    def __iter__(self):
+        return iter(self.cache)
+
+    def __reversed__(self):
+        return reversed(self.cache)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def clear(self):
+        self._pending.clear()
+        self.cache.clear()
+
+    def transfer(self, old_cache):
+        self.cache.transfer(old_cache)
+        return self
+
+
+class ByteLRUCache(WeakLRUCache):
+    """
+    Implements a Least Recently Used Cache with a memory budget
+
+    Like :class:`WeakLRUCache`, but the number of strong references is
+    limited by their approximate total size in bytes instead of their
+    count. Objects that are dropped from the LRU part are still kept as weak
+    references. Hits, misses and evictions are counted in `stats`.
+
+    Parameters
+    ----------
+    max_bytes : int
+        the maximal approximate size of all strongly referenced objects
+    nbytes : callable or None
+        function that returns the approximate size of an object in bytes.
+        If `None` (default) :func:`estimate_nbytes` is used
+    weak_type : str
+        either 'value' (default) or 'key', see :class:`WeakLRUCache`
+
+    Attributes
+    ----------
+    nbytes : int
+        the approximate size of all strongly referenced objects
+    stats : :class:`CacheStats`
+        the counters for hits, misses and evictions
+    """
+
+    def __init__(self, max_bytes, nbytes=None, weak_type='value'):
+        super(ByteLRUCache, self).__init__(
+            size_limit=None, weak_type=weak_type)
+        self._max_bytes = max_bytes
+        self.estimate = estimate_nbytes if nbytes is None else nbytes
+        self._sizes = {}
+        self.nbytes = 0
+        self.stats = CacheStats()
+
+    @property
+    def size(self):
+        return -1, -1
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, new_max_bytes):
+        self._max_bytes = new_max_bytes
+        self._check_size_limit()
+
+    def __str__(self):
+        return '%s(%d/%d of %d/%d bytes)' % (
+            self.__class__.__name__,
+            len(self._cache), len(self._weak_cache),
+            self.nbytes, self.max_bytes
+        )
+
+    def clear(self):
+        super(ByteLRUCache, self).clear()
+        self._sizes.clear()
+        self.nbytes = 0
+
+    def _add(self, key, value):
+        size = self.estimate(value)
+        self._cache[key] = value
+        self._sizes[key] = size
+        self.nbytes += size
+        self._check_size_limit()
+
+    def _remove(self, key):
+        self.nbytes -= self._sizes.pop(key)
+        return self._cache.pop(key)
+
+    def __getitem__(self, item):
+        try:
+            obj = self._cache.pop(item)
+            self._cache[item] = obj
+        except KeyError:
+            try:
+                obj = self._weak_cache.pop(item)
+            except KeyError:
+                self.stats.misses += 1
+                raise
+
+            self._add(item, obj)
+
+        self.stats.hits += 1
+        return obj
+
+    def __setitem__(self, key, value, **kwargs):
+        if key in self._cache:
+            self._remove(key)
+        else:
+            self._weak_cache.pop(key, None)
+
+        self._add(key, value)
+
+    def _check_size_limit(self):
+        while self.nbytes > self.max_bytes and len(self._cache) > 0:
+            key = next(iter(self._cache))
+            obj = self._remove(key)
+            self.stats.evictions += 1
+            try:
+                self._weak_cache[key] = obj
+            except TypeError:
+                # object cannot be weakly referenced
+                pass
+
+
 class WeakValueCache(weakref.WeakValueDictionary, Cache):
     """
     Implements a cache that keeps weak references to all elements
@@ -1,4 +1,6 @@
 import collections
+import time
+
 import numpy as np
 
 from .proxy import LoaderProxy
@@ -52,9 +54,14 @@ class ChainDict(object):
     ----------
     _post : ChainDict
         the ChainDict to be called when this instance cannot evaluate given keys
+    stats : :class:`openpathsampling.netcdfplus.cache.CacheStats` or None
+        if set, the number of keys this instance could (hits) and could not
+        (misses) evaluate and the time spent is counted. Default is `None`
 
     """
 
+    stats = None
+
     def __init__(self):
         self._post = None
         self._iterables = (list, tuple, set, frozenset)
@@ -64,7 +71,10 @@ class ChainDict(object):
         # first apply the own _get functions to compute
         # print 'get %d items using %s' % (len(items), self.__class__.__name__)
 
-        results = self._get_list(items)
+        if self.stats is None:
+            results = self._get_list(items)
+        else:
+            results = self._get_list_with_stats(items)
 
         if self._post is not None:
             nones = [obj[0] for obj in zip(items, results) if obj[1] is None]
@@ -82,6 +92,17 @@ class ChainDict(object):
 
     __call__ = __getitem__
 
+    def _get_list_with_stats(self, items):
+        start = time.time()
+        results = self._get_list(items)
+        if not isinstance(results, (list, np.ndarray)):
+            results = list(results)
+        self.stats.time += time.time() - start
+        found = sum(1 for result in results if result is not None)
+        self.stats.hits += found
+        self.stats.misses += len(items) - found
+        return results
+
     def __setitem__(self, key, value):
         self._set_list(key, value)
 
@@ -308,13 +329,29 @@ class Function(ChainDict):
     """
     Uses a regular function to evaluate given keys.
 
-    This works effective like a function called with square brackets
+    This works effective like a function called with square brackets.
+
+    Large requests can be split into chunks of `chunksize` keys, that are
+    evaluated one after the other or, if an `executor` is given, in
+    parallel. The executor can be anything with a `map(fnc, chunks)` method
+    that returns the results of `fnc` for each chunk in order, e.g. a
+    `concurrent.futures.ThreadPoolExecutor` for functions that release the
+    GIL (like MDTraj or numpy) or an :class:`.AttributeWorkerPool` for
+    pure python functions. Stored objects are loaded before they are
+    passed to the executor and only `max_pending_chunks` chunks are handed
+    to it at a time, so the memory needed stays bounded.
     """
+
+    default_chunksize = 1024
+    max_pending_chunks = 16
+
     def __init__(
             self,
             fnc,
             requires_lists=True,
-            scalarize_numpy_singletons=False):
+            scalarize_numpy_singletons=False,
+            chunksize=None,
+            executor=None):
         """
         Parameters
         ----------
@@ -329,12 +366,19 @@ class Function(ChainDict):
             is often useful if you have function that will by default return
             a list of results. In case your function does so, you can
             treat it as returning a scalar.
+        chunksize : int or None
+            if not `None` requests are split into chunks of this many keys
+        executor : object or None
+            if not `None` the chunks are evaluated by `executor.map`. If no
+            `chunksize` is given, `default_chunksize` is used
 
         """
         super(Function, self).__init__()
         self._eval = fnc
         self.requires_lists = requires_lists
         self.scalarize_numpy_singletons = scalarize_numpy_singletons
+        self.chunksize = chunksize
+        self.executor = executor
 
     def _get(self, item):
         if self._eval is None:
@@ -355,6 +399,44 @@ class Function(ChainDict):
         if self._eval is None:
             return [None] * len(items)
 
+        if self.chunksize is None and self.executor is None:
+            return self.evaluate(items)
+
+        chunksize = self.chunksize or self.default_chunksize
+        chunks = [items[start:start + chunksize]
+                  for start in range(0, len(items), chunksize)]
+
+        results = []
+        if self.executor is None:
+            for chunk in chunks:
+                results.extend(self.evaluate(chunk))
+        else:
+            n_pending = self.max_pending_chunks
+            for start in range(0, len(chunks), n_pending):
+                loaded = [
+                    [item.__subject__ if type(item) is LoaderProxy else item
+                     for item in chunk]
+                    for chunk in chunks[start:start + n_pending]
+                ]
+                for result in self.executor.map(self.evaluate, loaded):
+                    results.extend(result)
+
+        return results
+
+    def evaluate(self, items):
+        """
+        Evaluate the function for a list of keys
+
+        Parameters
+        ----------
+        items : list
+            the keys
+
+        Returns
+        -------
+        list or numpy.ndarray
+            the values for the keys
+        """
         if self.requires_lists:
             results = self._eval(items)
 
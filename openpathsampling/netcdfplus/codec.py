@@ -0,0 +1,147 @@
+"""
+Codecs that turn simplified objects into strings or bytes and back
+
+An :class:`ObjectJSON` reduces objects to nested dicts, lists and atomic
+values. A codec serializes these for storage. JSON is always available and
+is what existing files use. The binary msgpack codec needs the optional
+`msgpack` package; it stores numpy arrays as raw buffers instead of base64
+strings, keeps integer dict keys and is smaller and faster to read and
+write.
+
+New codecs can be added with :func:`register_codec`.
+"""
+import ujson
+
+from openpathsampling.integration_tools import (
+    msgpack, error_if_no_msgpack
+)
+
+if int(ujson.__version__.split(".")[0]) <= 2:
+    ujson_kwargs = dict()
+else:
+    ujson_kwargs = {"reject_bytes": False}
+
+
+class Codec(object):
+    """
+    Serializer for simplified objects
+
+    Attributes
+    ----------
+    name : str
+        the name under which the codec is registered. It is saved with
+        each variable, so files are decoded with the codec they were
+        written with
+    binary : bool
+        if True, `dumps` returns bytes, otherwise str. A simplifier puts
+        raw bytes (e.g. of numpy arrays) into the simplified object only for
+        binary codecs
+    """
+
+    name = None
+    binary = False
+
+    def dumps(self, simplified):
+        """
+        Serialize a simplified object
+
+        Parameters
+        ----------
+        simplified : dict, list or atomic value
+            the result of :meth:`ObjectJSON.simplify`
+
+        Returns
+        -------
+        str or bytes
+        """
+        raise NotImplementedError
+
+    def loads(self, data):
+        """
+        Reverse :meth:`dumps`
+
+        Parameters
+        ----------
+        data : str or bytes
+
+        Returns
+        -------
+        dict, list or atomic value
+            the simplified object
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return '%s()' % self.__class__.__name__
+
+
+class JSONCodec(Codec):
+    """JSON strings, using ujson"""
+
+    name = 'json'
+
+    def dumps(self, simplified):
+        return ujson.dumps(simplified, **ujson_kwargs)
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+class MsgPackCodec(Codec):
+    """Binary msgpack; bytes are stored as they are"""
+
+    name = 'msgpack'
+    binary = True
+
+    def dumps(self, simplified):
+        error_if_no_msgpack("MsgPackCodec")
+        return msgpack.packb(simplified, use_bin_type=True)
+
+    def loads(self, data):
+        error_if_no_msgpack("MsgPackCodec")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+_codecs = {}
+
+
+def register_codec(codec):
+    """
+    Make a codec available under its name
+
+    Parameters
+    ----------
+    codec : :class:`Codec`
+    """
+    _codecs[codec.name] = codec
+
+
+def get_codec(codec):
+    """
+    Return the registered codec of a given name
+
+    Parameters
+    ----------
+    codec : str or :class:`Codec` or None
+        the name of the codec. A codec is returned as it is; None is JSON.
+
+    Returns
+    -------
+    :class:`Codec`
+    """
+    if codec is None:
+        return json_codec
+    if isinstance(codec, Codec):
+        return codec
+    try:
+        return _codecs[codec]
+    except KeyError:
+        raise ValueError('Unknown codec `%s`. Known codecs are: %s' % (
+            codec, ', '.join(sorted(_codecs))))
+
+
+json_codec = JSONCodec()
+msgpack_codec = MsgPackCodec()
+
+register_codec(json_codec)
+register_codec(msgpack_codec)
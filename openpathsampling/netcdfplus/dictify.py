@@ -8,17 +8,18 @@ import math
 import abc
 from uuid import UUID
 
-import ujson
-
 import marshal
 import types
 import opcode
 
 from .base import StorableObject
+from .proxy import LoaderProxy
 
 from openpathsampling.tools import word_wrap
+from openpathsampling.lazy_import import import_lazy_modules
 
 from .cache import WeakValueCache
+from .codec import get_codec, json_codec, ujson_kwargs
 
 __author__ = 'Jan-Hendrik Prinz'
 
@@ -48,11 +49,6 @@ else:
     opcode_arg_width = 2
     opcode_no_arg_width = 0
 
-if int(ujson.__version__.split(".")[0]) <= 2:
-    ujson_kwargs = dict()
-else:
-    ujson_kwargs = {"reject_bytes": False}
-
 class ObjectJSON(object):
     """
     A simple implementation of a pickle algorithm to create object that can be
@@ -96,10 +92,23 @@ class ObjectJSON(object):
         self.type_names = {}
         self.type_classes = {}
         self.safemode = False
+        # True while simplifying for a binary codec
+        self._binary = False
 
         self.update_class_list()
 
-    def update_class_list(self):
+    def update_class_list(self, import_lazy=False):
+        """
+        Update the classes that can be created from their names
+
+        Parameters
+        ----------
+        import_lazy : bool
+            if True, modules that are only imported on first use are
+            imported first, so that all their classes are known
+        """
+        if import_lazy:
+            import_lazy_modules()
         self.class_list = StorableObject.objects()
         self.type_names = {
             cls.__name__: cls for cls in self.allowed_storable_atomic_types}
@@ -155,11 +164,15 @@ class ObjectJSON(object):
                         '_units': self.unit_to_dict(obj.unit)
                     }
             elif obj.__class__ is np.ndarray:
-                # this is maybe not the best way to store large numpy arrays!
+                # binary codecs store the raw buffer, JSON needs base64
+                if self._binary:
+                    data = obj.tobytes(order='C')
+                else:
+                    data = base64.b64encode(obj.copy(order='C'))
                 return {
                     '_numpy': self.simplify(obj.shape),
                     '_dtype': str(obj.dtype),
-                    '_data': base64.b64encode(obj.copy(order='C'))
+                    '_data': data
                 }
             elif hasattr(obj, 'to_dict'):
                 # the object knows how to dismantle itself into a json string
@@ -240,8 +253,11 @@ class ObjectJSON(object):
                 return slice(*obj['_slice'])
 
             elif '_numpy' in obj:
+                data = obj['_data']
+                if type(data) is not bytes:
+                    data = decodebytes(data)
                 return np.frombuffer(
-                    decodebytes(obj['_data']),
+                    data,
                     dtype=np.dtype(obj['_dtype'])).reshape(
                         self.build(obj['_numpy'])
                 )
@@ -257,7 +273,7 @@ class ObjectJSON(object):
 
             elif '_cls' in obj and '_dict' in obj:
                 if obj['_cls'] not in self.class_list:
-                    self.update_class_list()
+                    self.update_class_list(import_lazy=True)
                     if obj['_cls'] not in self.class_list:
                         # updating did not help, so there is nothing we can do.
                         return None
@@ -558,37 +574,96 @@ class ObjectJSON(object):
             variable[arg] for code, arg in ObjectJSON._to_opcode(code)
             if code == op and arg is not None]))
 
-    def to_json(self, obj, base_type=''):
-        simplified = self.simplify(obj, base_type)
-        return ujson.dumps(simplified, **ujson_kwargs)
+    def _simplify_for(self, codec, simplify, *args):
+        # nested stores may save with another codec while we simplify
+        binary = self._binary
+        self._binary = codec.binary
+        try:
+            return simplify(*args)
+        finally:
+            self._binary = binary
 
-    def to_json_object(self, obj):
+    def dumps(self, obj, codec=None, base_type=''):
+        """
+        Serialize an object with a codec
+
+        Parameters
+        ----------
+        obj : object
+            the object to be serialized
+        codec : str or :class:`openpathsampling.netcdfplus.codec.Codec`
+            the codec or its name; default (None) is JSON
+        base_type : str
+            the name of the base class the object is stored as
+
+        Returns
+        -------
+        str or bytes
+            bytes if the codec is binary
+        """
+        codec = get_codec(codec)
+        simplified = self._simplify_for(codec, self.simplify, obj, base_type)
+        return codec.dumps(simplified)
+
+    def dumps_object(self, obj, codec=None):
+        """
+        Serialize an object with a codec, including its class
+
+        Like :meth:`dumps`, but storable objects are serialized themselves
+        with :meth:`simplify_object`, even if they could be referenced.
+        """
+        codec = get_codec(codec)
         if hasattr(obj, 'base_cls') \
                 and type(obj) is not type and type(obj) is not abc.ABCMeta:
-            simplified = self.simplify_object(obj)
+            simplified = self._simplify_for(
+                codec, self.simplify_object, obj)
         else:
-            simplified = self.simplify(obj)
+            simplified = self._simplify_for(codec, self.simplify, obj)
         try:
-            json_str = ujson.dumps(simplified, **ujson_kwargs)
+            data = codec.dumps(simplified)
         except TypeError as e:
             err = (
-                'Cannot convert object of type `%s` to json. '
+                'Cannot convert object of type `%s` to %s. '
                 '\n__dict__: %s\n'
                 '\nsimplified: %s\n'
                 '\nError: %s'
             ) % (
                 obj.__class__.__name__,
+                codec.name,
                 obj.__dict__,
                 simplified,
                 str(e)
             )
             raise ValueError(err)
 
-        return json_str
+        return data
+
+    def loads(self, data, codec=None):
+        """
+        Recreate an object serialized by :meth:`dumps`
+
+        Parameters
+        ----------
+        data : str or bytes
+            the serialized object
+        codec : str or :class:`openpathsampling.netcdfplus.codec.Codec`
+            the codec or its name the object was serialized with; default
+            (None) is JSON
+
+        Returns
+        -------
+        object
+        """
+        return self.build(get_codec(codec).loads(data))
+
+    def to_json(self, obj, base_type=''):
+        return self.dumps(obj, json_codec, base_type)
+
+    def to_json_object(self, obj):
+        return self.dumps_object(obj, json_codec)
 
     def from_json(self, json_string):
-        simplified = ujson.loads(json_string)
-        return self.build(simplified)
+        return self.loads(json_string, json_codec)
 
     def unit_to_json(self, unit):
         simple = self.unit_to_dict(unit)
@@ -694,8 +769,14 @@ class CachedUUIDObjectJSON(ObjectJSON):
         super(CachedUUIDObjectJSON, self).__init__(unit_system)
         self.excluded_keys = ['json']
         self.uuid_cache = WeakValueCache()
+        self._building = []
 
     def simplify(self, obj, base_type=''):
+        if type(obj) is LoaderProxy:
+            # objects loaded from a storage are sent in full, since the
+            # other end might not have access to the storage
+            obj = obj.__subject__
+
         if obj.__class__.__module__ != builtin_module:
             if hasattr(obj, 'to_dict') and hasattr(obj, '__uuid__'):
                 # the object knows how to dismantle itself into a json string
@@ -715,12 +796,12 @@ class CachedUUIDObjectJSON(ObjectJSON):
     def build(self, jsn):
         if type(jsn) is dict:
             if '_obj_uuid' in jsn:
-                uuid = UUID(jsn['_obj_uuid'])
+                uuid = int(UUID(jsn['_obj_uuid']))
                 if uuid in self.uuid_cache:
                     return self.uuid_cache[uuid]
                 elif '_cls' in jsn and '_dict' in jsn:
                     if jsn['_cls'] not in self.class_list:
-                        self.update_class_list()
+                        self.update_class_list(import_lazy=True)
                         if jsn['_cls'] not in self.class_list:
                             raise ValueError((
                                  'Cannot create jsn of class `%s`.\n' +
@@ -735,23 +816,29 @@ class CachedUUIDObjectJSON(ObjectJSON):
                     obj = self.class_list[jsn['_cls']].from_dict(attributes)
                     obj.__uuid__ = uuid
                     self.uuid_cache[uuid] = obj
+                    self._building.append(obj)
                     return obj
                 else:
-                    # this should not happen!
-                    raise ('What happend here. JSN `%s`' % jsn)
-                    pass
+                    raise ValueError(
+                        'Object with UUID `%s` is referenced before it was '
+                        'sent.' % jsn['_obj_uuid'])
 
         return super(CachedUUIDObjectJSON, self).build(jsn)
 
-    def to_json(self, obj, base_type=''):
+    def dumps(self, obj, codec=None, base_type=''):
         # we need to clear the cache, since we have no idea, what the other end
         # still knows. We can only cache stuff we are sending this time
         self.uuid_cache.clear()
-        return super(CachedUUIDObjectJSON, self).to_json(obj, base_type)
-
-    # def from_json(self, json_string):
-    #     # here we keep the cache. It could happen that an object is sent in
-    #     # full, but we still have it and so we do not have to rebuild it which
-    #     # saves some time
-    #     simplified = ujson.loads(json_string)
-    #     return self.build(simplified)
+        return super(CachedUUIDObjectJSON, self).dumps(obj, codec, base_type)
+
+    def loads(self, data, codec=None):
+        # here we keep the cache. It could happen that an object is sent in
+        # full, but we still have it and so we do not have to rebuild it which
+        # saves some time. While building, we keep all new objects alive,
+        # since the weak cache might otherwise lose objects that are only
+        # referenced by UUID later in the same string
+        self._building = []
+        try:
+            return super(CachedUUIDObjectJSON, self).loads(data, codec)
+        finally:
+            self._building = []
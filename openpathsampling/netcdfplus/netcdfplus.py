@@ -8,11 +8,14 @@ import os.path
 from collections import OrderedDict
 from uuid import UUID
 
+
 import netCDF4
 import numpy as np
+from .codec import get_codec, json_codec
 from .dictify import UUIDObjectJSON
 from .stores import NamedObjectStore, ObjectStore, PseudoAttributeStore
 from .proxy import LoaderProxy
+from .writer import BackgroundWriter, IOLock
 
 import sys
 if sys.version_info > (3, ):
@@ -92,12 +95,29 @@ class NetCDFPlus(netCDF4.Dataset):
             on the variable
         store : openpathsampling.netcdfplus.ObjectStore
             a reference to an object store used for convenience in some cases
+        buffer_size : int
+            if larger than zero, writes to single (integer) indices are
+            collected and written in contiguous slabs once `buffer_size`
+            rows have been collected, or when :meth:`flush` is called.
+            Every read flushes the buffer first.
+        lock : :class:`.IOLock`
+            held while the variable is read or written, usually the
+            :attr:`NetCDFPlus.io_lock` of the file
 
         """
 
-        def __init__(self, variable, getter=None, setter=None, store=None):
+        def __init__(self, variable, getter=None, setter=None, store=None,
+                     pending=None, lock=None):
             self.variable = variable
             self.store = store
+            self.buffer_size = 0
+            self._buffer = {}
+            if pending is None:
+                pending = set()
+            self._pending = pending
+            if lock is None:
+                lock = IOLock()
+            self.lock = lock
 
             if setter is None:
                 # None should not be used
@@ -117,12 +137,106 @@ class NetCDFPlus(netCDF4.Dataset):
                 self.support_simtk_unit = False
 
         def __setitem__(self, key, value):
-            self.variable[key] = self.setter(value)
+            value = self.setter(value)
+            with self.lock:
+                if self.buffer_size > 0 and \
+                        isinstance(key, (int, np.integer)) and key >= 0:
+                    self._buffer[int(key)] = value
+                    self._pending.add(self)
+                    if len(self._buffer) >= self.buffer_size:
+                        self.flush()
+                else:
+                    self.flush()
+                    self.variable[key] = value
 
         def __getitem__(self, key):
-            # print(self.variable[key])
-            # print(type(self.variable[key]))
-            return self.getter(self.variable[key])
+            with self.lock:
+                self.flush()
+                value = self.variable[key]
+            return self.getter(value)
+
+        def read_rows(self, indices):
+            """
+            Read the raw values of several rows in as few reads as possible
+
+            The indices are sorted and runs of consecutive indices are read
+            as one slab each. The values are not converted by the getter.
+
+            Parameters
+            ----------
+            indices : iterable of int
+                the rows to be read, in any order and possibly repeated
+
+            Returns
+            -------
+            numpy.ndarray
+                the values of the rows in the order of `indices`
+            """
+            indices = np.asarray(indices, dtype=np.int64)
+            if len(indices) == 0:
+                return np.zeros((0,) + self.variable.shape[1:],
+                                dtype=self.variable.dtype)
+
+            rows, positions = np.unique(indices, return_inverse=True)
+            starts = np.flatnonzero(np.diff(rows) != 1) + 1
+            with self.lock:
+                self.flush()
+                slabs = [
+                    np.asarray(self.variable[run[0]:run[-1] + 1])
+                    for run in np.split(rows, starts)
+                ]
+            return np.concatenate(slabs)[positions]
+
+        def flush(self):
+            """
+            Write all buffered rows to the variable
+
+            Consecutive rows are written as one slab, but slabs do not
+            cross the chunk boundaries of the variable.
+            """
+            if not self._buffer:
+                return
+
+            with self.lock:
+                self._flush()
+
+        def _flush(self):
+            buffer = self._buffer
+            self._buffer = {}
+            self._pending.discard(self)
+
+            chunking = self.variable.chunking()
+            if chunking == 'contiguous' or chunking is None:
+                chunk = 0
+            else:
+                chunk = chunking[0]
+
+            indices = sorted(buffer)
+            first = 0
+            for pos in range(1, len(indices) + 1):
+                if pos == len(indices) \
+                        or indices[pos] != indices[pos - 1] + 1 \
+                        or (chunk and indices[pos] % chunk == 0):
+                    self._write_slab(
+                        indices[first],
+                        [buffer[idx] for idx in indices[first:pos]]
+                    )
+                    first = pos
+
+        def _write_slab(self, first, values):
+            data = None
+            if len(values) > 1 and isinstance(self.variable.dtype, np.dtype):
+                try:
+                    data = np.array(values)
+                except (ValueError, TypeError):
+                    pass
+
+            if data is not None and data.dtype != object and \
+                    data.shape[1:] == self.variable.shape[1:]:
+                self.variable[first:first + len(values)] = data
+            else:
+                for idx, value in enumerate(values, first):
+                    self.variable[idx] = value
 
         def __getattr__(self, item):
             return getattr(self.variable, item)
@@ -134,7 +248,9 @@ class NetCDFPlus(netCDF4.Dataset):
             return repr(self.variable)
 
         def __len__(self):
-            return len(self.variable)
+            with self.lock:
+                self.flush()
+                return len(self.variable)
 
     @property
     def objects(self):
@@ -178,7 +294,7 @@ class NetCDFPlus(netCDF4.Dataset):
             return self._obj_store[obj.__class__]
 
     def update_storable_classes(self):
-        self.simplifier.update_class_list()
+        self.simplifier.update_class_list(import_lazy=True)
 
     def _create_storages(self):
         """
@@ -189,7 +305,7 @@ class NetCDFPlus(netCDF4.Dataset):
         # todo: add CVStore, rename to attribute
         pass
 
-    def __init__(self, filename, mode=None, fallback=None):
+    def __init__(self, filename, mode=None, fallback=None, codec=None):
         """
         Create a storage for complex objects in a netCDF file
 
@@ -206,6 +322,11 @@ class NetCDFPlus(netCDF4.Dataset):
             in this storage. By default you will not try to resave objects
             that could be found in the fallback. Note that the fall back does
             only work if `use_uuid` is enabled
+        codec : str or :class:`openpathsampling.netcdfplus.codec.Codec`
+            the codec used to serialize objects in new json variables, e.g.
+            `msgpack` for the binary msgpack format. Existing variables are
+            always read with the codec they were written with. If None, the
+            codec of the file is used, which is `json` for new files
 
         Notes
         -----
@@ -260,11 +381,16 @@ class NetCDFPlus(netCDF4.Dataset):
 
         self._setup_class()
 
+        if codec is None and 'codec' in self.ncattrs():
+            codec = self.getncattr('codec')
+        self.codec = get_codec(codec)
+
         if mode == 'w':
             logger.info("Setup netCDF file and create variables")
 
             self.setncattr('format', 'netcdf+')
             self.setncattr('ncplus_version', self._netcdfplus_version_)
+            self.setncattr('codec', self.codec.name)
 
             self.write_meta()
 
@@ -444,6 +570,10 @@ class NetCDFPlus(netCDF4.Dataset):
         self._storages_base_cls = {}
         self.vars = dict()
         self.units = dict()
+        self._write_buffer_size = 0
+        self._pending_buffers = set()
+        self._io_lock = IOLock()
+        self._writer = None
 
     def create_store(self, name, store, register_attr=True):
         """
@@ -541,6 +671,144 @@ class NetCDFPlus(netCDF4.Dataset):
     def __repr__(self):
         return "Storage @ '" + self.filename + "'"
 
+    def set_write_buffer(self, n_rows):
+        """
+        Collect new rows of all variables and write them in slabs
+
+        With a write buffer, writing a value to a variable only keeps it in
+        memory. The collected rows of a variable are written as contiguous
+        slabs aligned to the chunks of the variable once `n_rows` of them
+        have been collected, on any read from the variable, and on
+        :meth:`flush_buffers`, :meth:`sync` and :meth:`close`.
+
+        Rows that are still buffered are lost if the process dies. After
+        :meth:`sync` (e.g. every `save_frequency` steps of a path
+        simulator, see :meth:`.PathSimulator.sync_storage`), the file
+        holds everything that was saved so far.
+
+        Parameters
+        ----------
+        n_rows : int
+            the maximal number of buffered rows per variable; 0 disables
+            the buffer
+        """
+        self.flush_buffers()
+        self._write_buffer_size = n_rows
+        for delegate in self.vars.values():
+            delegate.buffer_size = n_rows
+
+    def flush_buffers(self):
+        """
+        Write all rows collected by the write buffer to the file
+
+        See :meth:`set_write_buffer`.
+        """
+        for delegate in list(self._pending_buffers):
+            delegate.flush()
+
+    @property
+    def io_lock(self):
+        """
+        :class:`.IOLock` : lock for access to the file from several threads
+
+        It is held by the background writer while it saves, and by every
+        read or write of a variable, by :meth:`save` and by the loading and
+        saving of objects in the stores, so the main thread can keep using
+        the storage while the writer runs.
+        """
+        return self._io_lock
+
+    def start_background_writer(self, max_queue=8):
+        """
+        Save objects and sync the file in a separate thread
+
+        After this, :meth:`save_in_background` and
+        :meth:`sync_in_background` return as soon as the job is queued.
+        The queue holds at most `max_queue` jobs; if it is full, they block
+        until the writer has caught up. :meth:`sync` and :meth:`close`
+        wait for all queued jobs.
+
+        All access to the file through the stores holds :attr:`io_lock`,
+        so the storage can still be used from other threads. Code that
+        accesses the netCDF variables directly (``store.variables``) while
+        the writer runs has to hold :attr:`io_lock`, too.
+
+        Parameters
+        ----------
+        max_queue : int
+            the maximal number of queued jobs
+        """
+        if self._writer is None:
+            self._writer = BackgroundWriter(self._io_lock, max_queue)
+
+    def stop_background_writer(self):
+        """
+        Finish all queued jobs and stop the background writer
+        """
+        if self._writer is not None:
+            writer = self._writer
+            self._writer = None
+            writer.stop()
+
+    @property
+    def has_background_writer(self):
+        """bool : True if a background writer is running"""
+        return self._writer is not None
+
+    def save_in_background(self, obj):
+        """
+        Save an object with the background writer
+
+        Without a running background writer, this is the same as
+        :meth:`save`.
+
+        Parameters
+        ----------
+        obj : :class:`StorableObject`
+            the object to store; it is referenced until it has been saved
+        """
+        if self._writer is None:
+            self.save(obj)
+        else:
+            self._writer.submit(self.save, obj)
+
+    def sync_in_background(self):
+        """
+        Write all buffers to disk with the background writer
+
+        Without a running background writer, this is the same as
+        :meth:`sync`.
+        """
+        if self._writer is None:
+            self.sync()
+        else:
+            self._writer.submit(self._sync_file)
+
+    def wait_for_writer(self):
+        """
+        Wait until the background writer has finished all queued jobs
+        """
+        if self._writer is not None:
+            self._writer.wait()
+
+    def _sync_file(self):
+        with self._io_lock:
+            self.flush_buffers()
+            super(NetCDFPlus, self).sync()
+
+    def sync(self):
+        # a sync from inside a save (e.g. when new stores are created)
+        # holds the lock already, so the writer cannot make progress
+        if not self._io_lock.is_owned():
+            self.wait_for_writer()
+        self._sync_file()
+
+    def close(self):
+        self.stop_background_writer()
+        if self.isopen():
+            self.flush_buffers()
+        super(NetCDFPlus, self).close()
+
     def __getattr__(self, item):
         try:
             return self.__dict__[item]
@@ -640,7 +908,8 @@ class NetCDFPlus(netCDF4.Dataset):
             # storages also we assume that if a class has no base_cls
             store = self.find_store(obj)
             store_idx = self.stores.index[store.__uuid__]
-            return store, store_idx, store.save(obj, idx)
+            with self._io_lock:
+                return store, store_idx, store.save(obj, idx)
 
         # Could not save this object.
         raise RuntimeWarning("Objects of type '%s' cannot be stored!" %
@@ -713,12 +982,14 @@ class NetCDFPlus(netCDF4.Dataset):
         Returns
         -------
         str
-            the JSON string (usually in unicode) from the storage
+            the JSON string (usually in unicode) from the storage. None if
+            the object is stored with another codec
         """
         if hasattr(obj, 'base_cls'):
             store = self._objects[obj.base_cls]
 
-            if store.json:
+            if store.json and \
+                    not hasattr(store.variables['json'], 'codec'):
                 return store.variables['json'][store.idx(obj)]
 
         return None
@@ -835,7 +1106,7 @@ class NetCDFPlus(netCDF4.Dataset):
 
         return nc_type
 
-    def create_type_delegate(self, var_type):
+    def create_type_delegate(self, var_type, codec=None):
         """
         Create a variable value delegator for var_type
 
@@ -846,6 +1117,9 @@ class NetCDFPlus(netCDF4.Dataset):
         ----------
         var_type : str
             the variable type
+        codec : str or None
+            the name of the codec of `json` and `jsonobj` variables; None
+            is JSON
 
         Returns
         -------
@@ -895,13 +1169,20 @@ class NetCDFPlus(netCDF4.Dataset):
         elif var_type.startswith('numpy.'):
             pass
 
-        elif var_type == 'jsonobj':
-            setter = lambda v: self.simplifier.to_json_object(v)
-            getter = lambda v: self.simplifier.from_json(v)
+        elif var_type == 'jsonobj' or var_type == 'json':
+            codec = get_codec(codec)
+            if var_type == 'jsonobj':
+                dumps = lambda v: self.simplifier.dumps_object(v, codec)
+            else:
+                dumps = lambda v: self.simplifier.dumps(v, codec)
 
-        elif var_type == 'json':
-            setter = lambda v: self.simplifier.to_json(v)
-            getter = lambda v: self.simplifier.from_json(v)
+            if codec.binary:
+                # stored as variable length arrays of bytes
+                setter = lambda v: np.frombuffer(dumps(v), dtype=np.uint8)
+                getter = lambda v: self.simplifier.loads(v.tobytes(), codec)
+            else:
+                setter = dumps
+                getter = lambda v: self.simplifier.loads(v, codec)
 
         elif var_type.startswith('obj.'):
             getter = lambda v: [
@@ -969,7 +1250,8 @@ class NetCDFPlus(netCDF4.Dataset):
             if not hasattr(var, 'var_type'):
                 return
 
-            getter, setter, store = self.create_type_delegate(var.var_type)
+            getter, setter, store = self.create_type_delegate(
+                var.var_type, getattr(var, 'codec', None))
 
             to_uuid_chunks = NetCDFPlus.to_uuid_chunks
             # to_uuid_chunks34 = NetCDFPlus.to_uuid_chunks34
@@ -1032,7 +1314,10 @@ class NetCDFPlus(netCDF4.Dataset):
                     else:
                         getter = _get2(lambda v: v)
 
-            delegate = NetCDFPlus.ValueDelegate(var, getter, setter, store)
+            delegate = NetCDFPlus.ValueDelegate(
+                var, getter, setter, store, pending=self._pending_buffers,
+                lock=self._io_lock)
+            delegate.buffer_size = self._write_buffer_size
 
             # this is a trick to speed up the s/getter. If we do not need
             # to _cast_ because of python objects of units we can copy
@@ -1124,6 +1409,13 @@ class NetCDFPlus(netCDF4.Dataset):
 
         nc_type = self.var_type_to_nc_type(var_type)
 
+        codec = None
+        if var_type in ['json', 'jsonobj'] and self.codec is not json_codec:
+            codec = self.codec
+            if codec.binary:
+                variable_length = True
+                nc_type = np.uint8
+
         for dim_name, size in new_dimensions.items():
             ncfile.create_dimension(dim_name, size)
 
@@ -1156,6 +1448,9 @@ class NetCDFPlus(netCDF4.Dataset):
 
         setattr(ncvar, 'var_type', var_type)
 
+        if codec is not None:
+            setattr(ncvar, 'codec', codec.name)
+
         if self.support_simtk_unit and simtk_unit is not None:
 
             import simtk.unit as u
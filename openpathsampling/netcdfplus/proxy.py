@@ -93,7 +93,8 @@ class LoaderProxy(object):
         Call the loader and get the referenced object
         """
         try:
-            return self._store.load(self.__uuid__)
+            with self._store.storage.io_lock:
+                return self._store.load(self.__uuid__)
         except KeyError:
             if type(self.__uuid__) is int:
                 raise RuntimeWarning(
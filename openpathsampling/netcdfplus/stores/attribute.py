@@ -1,6 +1,7 @@
 from .named import UniqueNamedObjectStore
 from openpathsampling.netcdfplus.attribute import PseudoAttribute
 from openpathsampling.netcdfplus.stores.value import ValueStore
+from openpathsampling.netcdfplus.writer import io_locked
 
 
 class PseudoAttributeStore(UniqueNamedObjectStore):
@@ -188,6 +189,7 @@ class PseudoAttributeStore(UniqueNamedObjectStore):
                  'for the cache cannot be attached.' +
                  'Save your CV first and retry.') % self.storage)
 
+    @io_locked
     def cache_all(self):
         """
         Fill the caches of all CVs
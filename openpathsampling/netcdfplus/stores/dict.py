@@ -1,4 +1,5 @@
 from .named import NamedObjectStore
+from openpathsampling.netcdfplus.writer import io_locked
 
 from future.utils import iterkeys
 
@@ -18,6 +19,7 @@ class DictStore(NamedObjectStore):
     def to_dict(self):
         return {}
 
+    @io_locked
     def load(self, idx):
         """
         Returns an object from the storage.
@@ -99,6 +101,7 @@ class DictStore(NamedObjectStore):
     def restore(self):
         self.update_name_cache()
 
+    @io_locked
     def save(self, obj, idx=None):
         """
         Saves an object to the storage.
@@ -142,7 +145,7 @@ class DictStore(NamedObjectStore):
             (str(obj.__class__), idx, n_idx))
         self._save(obj, n_idx)
 
-        self.storage.variables[self.prefix + '_name'][n_idx] = idx
+        self.variables['name'][n_idx] = idx
         self._update_name_in_cache(idx, n_idx)
 
         return n_idx
@@ -169,6 +172,7 @@ class DictStore(NamedObjectStore):
 
 class ImmutableDictStore(DictStore):
 
+    @io_locked
     def save(self, obj, idx=None):
         """
         Saves an object to the storage.
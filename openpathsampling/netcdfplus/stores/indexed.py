@@ -1,4 +1,5 @@
-from .object import ObjectStore
+from .object import ObjectStore, HashedList
+from openpathsampling.netcdfplus.writer import io_locked
 
 import logging
 
@@ -18,6 +19,7 @@ class IndexedObjectStore(ObjectStore):
     # LOAD/SAVE DECORATORS FOR CACHE HANDLING
     # ==========================================================================
 
+    @io_locked
     def load(self, idx):
         """
         Returns an object from the storage.
@@ -55,9 +57,10 @@ class IndexedObjectStore(ObjectStore):
 
         return obj
 
-    # def create_uuid_index(self):
-    #     return dict()
+    def create_uuid_index(self):
+        return HashedList()
 
+    @io_locked
     def save(self, obj, idx=None):
         """
         Saves an object to the storage.
@@ -1,6 +1,7 @@
 from openpathsampling.netcdfplus.base import StorableNamedObject
 
 from .object import ObjectStore
+from openpathsampling.netcdfplus.writer import io_locked
 
 import logging
 
@@ -75,7 +76,7 @@ class NamedObjectStore(ObjectStore):
         """
         if not self._names_loaded:
             for idx, name in enumerate(
-                    self.storage.variables[self.prefix + "_name"][:]):
+                    self.variables['name'][:]):
                 self._update_name_in_cache(name, idx)
 
             self._names_loaded = True
@@ -90,6 +91,7 @@ class NamedObjectStore(ObjectStore):
                 if idx not in self._name_idx[name]:
                     self._name_idx[name].add(idx)
 
+    @io_locked
     def cache_all(self):
         """Load all samples as fast as possible into the cache
 
@@ -121,12 +123,13 @@ class NamedObjectStore(ObjectStore):
             the index where the object was stored
         name : str
             the name of the object if it exists
-        json : str
-            json string the represents a serialized version of the stored object
+        json : str or numpy.ndarray
+            the serialized object as read from the json variable, a string
+            or, for binary codecs, an array of bytes
         """
 
         if idx not in self.cache:
-            obj = self.simplifier.from_json(json)
+            obj = self.vars['json'].getter(json)
 
             self._get_id(idx, obj)
 
@@ -182,6 +185,7 @@ class NamedObjectStore(ObjectStore):
     # LOAD/SAVE DECORATORS FOR CACHE HANDLING
     # ==========================================================================
 
+    @io_locked
     def load(self, idx):
         """
         Returns an object from the storage.
@@ -281,7 +285,7 @@ class NamedObjectStore(ObjectStore):
             self._get_id(n_idx, obj)
 
             setattr(obj, '_name',
-                    self.storage.variables[self.prefix + '_name'][n_idx])
+                    self.variables['name'][n_idx])
             # make sure that you cannot change the name of loaded objects
             obj.fix_name()
 
@@ -305,6 +309,7 @@ class NamedObjectStore(ObjectStore):
 
         return obj
 
+    @io_locked
     def save(self, obj, idx=None):
         """
         Saves an object to the storage.
@@ -357,7 +362,7 @@ class NamedObjectStore(ObjectStore):
             raise
 
         n_idx = self.index[obj.__uuid__]
-        self.storage.variables[self.prefix + '_name'][n_idx] = name
+        self.variables['name'][n_idx] = name
         self._update_name_in_cache(name, n_idx)
 
         return reference
@@ -422,6 +427,7 @@ class UniqueNamedObjectStore(NamedObjectStore):
 
         return name in self.name_idx or name in self._free_name
 
+    @io_locked
     def save(self, obj, idx=None):
         """
         Saves an object to the storage.
@@ -1,14 +1,18 @@
+import binascii
 import logging
 # from uuid import UUID
 from weakref import WeakValueDictionary
 
 from openpathsampling.netcdfplus.base import StorableNamedObject, StorableObject
 from openpathsampling.netcdfplus.cache import MaxCache, Cache, NoCache, \
-    WeakLRUCache
+    WeakLRUCache, CacheStats, CountingCache
 from openpathsampling.netcdfplus.proxy import LoaderProxy
+from openpathsampling.netcdfplus.writer import io_locked
 
 from future.utils import iteritems
 
+import numpy as np
+
 import sys
 if sys.version_info > (3, ):
     long = int
@@ -61,6 +65,269 @@ class HashedList(dict):
         return self._list
 
 
+class CompactHashedList(object):
+    """
+    Compact index of UUIDs and their positions in a store
+
+    Works like :class:`HashedList`, but keeps the UUIDs as pairs of
+    `uint64` in numpy arrays ordered by position and finds them with an open
+    addressing hash table of `int32` positions (linear probing, at most 3/4
+    full). This needs about 25-35 bytes per entry instead of a few hundred
+    for a dict of python ints, and a complete index can be built vectorized
+    from the `uuid` variable of a store (see :meth:`extend_strings`).
+    """
+
+    _EMPTY = -1
+    _DELETED = -2
+    _MASK64 = (1 << 64) - 1
+    _GOLDEN = 0x9E3779B97F4A7C15
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._hi = np.zeros(16, dtype=np.uint64)
+        self._lo = np.zeros(16, dtype=np.uint64)
+        self._n = 0
+        self._bits = 4
+        self._table = np.full(1 << self._bits, self._EMPTY, dtype=np.int32)
+        self._n_slots_used = 0
+        self._removed = set()
+        self._marks = {}
+
+    # keys that share an entry in the table; all bits for unique UUIDs
+    _lo_key_mask = _MASK64
+
+    def _split(self, key):
+        key = int(key)
+        return key >> 64, key & self._MASK64
+
+    def _slot(self, hi, lo):
+        h = (((lo & self._lo_key_mask) ^ hi) * self._GOLDEN) & self._MASK64
+        return h >> (64 - self._bits)
+
+    def _slots(self, hi, lo):
+        # same as `_slot` for arrays, numpy wraps around on overflow
+        h = ((lo & np.uint64(self._lo_key_mask)) ^ hi) * \
+            np.uint64(self._GOLDEN)
+        return (h >> np.uint64(64 - self._bits)).astype(np.int64)
+
+    def _find(self, key):
+        """Position of a key or -1"""
+        hi, lo = self._split(key)
+        lo &= self._lo_key_mask
+        table = self._table
+        mask = len(table) - 1
+        slot = self._slot(hi, lo)
+        while True:
+            pos = int(table[slot])
+            if pos == self._EMPTY:
+                return -1
+            if pos >= 0 and int(self._hi[pos]) == hi and \
+                    int(self._lo[pos]) & self._lo_key_mask == lo:
+                return pos
+            slot = (slot + 1) & mask
+
+    def _insert(self, positions):
+        """Add positions to the hash table"""
+        positions = np.asarray(positions, dtype=np.int64)
+        if 4 * (self._n_slots_used + len(positions)) > 3 * len(self._table):
+            self._rebuild(len(positions))
+
+        self._n_slots_used += len(positions)
+        table = self._table
+        mask = len(table) - 1
+        slots = self._slots(self._hi[positions], self._lo[positions])
+        while len(positions) > 0:
+            free = table[slots] == self._EMPTY
+            # of several positions that want the same free slot the first
+            # one gets it, all others try the next slot
+            _, first = np.unique(slots[free], return_index=True)
+            placed = np.zeros(len(positions), dtype=bool)
+            placed[np.flatnonzero(free)[first]] = True
+            table[slots[placed]] = positions[placed]
+            positions = positions[~placed]
+            slots = (slots[~placed] + 1) & mask
+
+    def _rebuild(self, n_new):
+        """Resize the hash table to hold `n_new` more entries"""
+        live = np.setdiff1d(
+            np.arange(self._n), np.fromiter(self._removed, dtype=np.int64))
+        bits = 4
+        while 4 * (len(live) + n_new) > 3 * (1 << bits):
+            bits += 1
+        self._bits = bits
+        self._table = np.full(1 << bits, self._EMPTY, dtype=np.int32)
+        self._n_slots_used = 0
+        self._insert(live)
+
+    def _grow(self, n_new):
+        size = self._n + n_new
+        if size > len(self._hi):
+            capacity = max(size, 2 * len(self._hi))
+            for name in ['_hi', '_lo']:
+                old = getattr(self, name)
+                new = np.zeros(capacity, dtype=np.uint64)
+                new[:self._n] = old[:self._n]
+                setattr(self, name, new)
+
+    def _add(self, hi, lo):
+        start = self._n
+        self._grow(len(hi))
+        self._hi[start:start + len(hi)] = hi
+        self._lo[start:start + len(hi)] = lo
+        self._insert(np.arange(start, start + len(hi)))
+        self._n += len(hi)
+
+    def __len__(self):
+        return self._n
+
+    def _mark_key(self, key):
+        return key
+
+    def append(self, key):
+        self._marks.pop(self._mark_key(key), None)
+        hi, lo = self._split(key)
+        self._add([hi], [lo])
+
+    def extend(self, t):
+        t = [int(key) for key in t]
+        for key in t:
+            self._marks.pop(self._mark_key(key), None)
+        self._add(
+            np.array([key >> 64 for key in t], dtype=np.uint64),
+            np.array([key & self._MASK64 for key in t], dtype=np.uint64))
+
+    def extend_strings(self, uuids):
+        """
+        Add UUIDs given as strings, like in the `uuid` variable of a store
+
+        Parameters
+        ----------
+        uuids : iterable of str
+            the UUIDs in their string representation
+        """
+        hexs = [uuid.replace('-', '') for uuid in uuids]
+        if any(len(h) != 32 for h in hexs):
+            # some entries are empty or invalid, use the slow way
+            self.extend([int(h, 16) for h in hexs])
+            return
+
+        raw = binascii.unhexlify(''.join(hexs))
+        pairs = np.frombuffer(raw, dtype='>u8').reshape(-1, 2)
+        self._add(pairs[:, 0].astype(np.uint64),
+                  pairs[:, 1].astype(np.uint64))
+
+    def _value(self, key, pos):
+        return pos
+
+    def __getitem__(self, key):
+        pos = self._find(key)
+        if pos >= 0:
+            return self._value(key, pos)
+        mark_key = self._mark_key(key)
+        try:
+            return self._marks[mark_key] ^ (key ^ mark_key)
+        except KeyError:
+            raise KeyError(key)
+
+    def get(self, key, d=None):
+        try:
+            return self[key]
+        except KeyError:
+            return d
+
+    def __contains__(self, key):
+        return self._mark_key(key) in self._marks or self._find(key) >= 0
+
+    def __setitem__(self, key, value):
+        if value == self._n:
+            self.append(key)
+            return
+        if not 0 <= value < self._n:
+            raise IndexError(value)
+
+        pos = self._find(key)
+        if pos == value:
+            return
+        if pos >= 0:
+            self._remove(pos)
+        if value not in self._removed:
+            self._remove(value)
+
+        hi, lo = self._split(key)
+        self._hi[value] = hi
+        self._lo[value] = lo
+        self._insert([value])
+        self._removed.discard(value)
+
+    def __delitem__(self, key):
+        if self._mark_key(key) in self._marks:
+            del self._marks[self._mark_key(key)]
+            return
+
+        pos = self._find(key)
+        if pos < 0:
+            raise KeyError(key)
+        self._remove(pos)
+        if pos == self._n - 1:
+            # usually the last saved object, which failed to save
+            self._n -= 1
+            self._removed.discard(pos)
+
+    def _remove(self, pos):
+        table = self._table
+        mask = len(table) - 1
+        slot = self._slot(int(self._hi[pos]),
+                          int(self._lo[pos]) & self._lo_key_mask)
+        while True:
+            found = int(table[slot])
+            if found == pos:
+                table[slot] = self._DELETED
+                break
+            if found == self._EMPTY:
+                break
+            slot = (slot + 1) & mask
+        self._removed.add(pos)
+
+    def index(self, key):
+        if not 0 <= key < self._n:
+            raise IndexError(key)
+        return (int(self._hi[key]) << 64) | int(self._lo[key])
+
+    def mark(self, key):
+        if key not in self:
+            self._marks[self._mark_key(key)] = -2
+
+    def unmark(self, key):
+        self._marks.pop(self._mark_key(key), None)
+
+    def keys(self):
+        return iter(self.list + list(self._marks))
+
+    __iter__ = keys
+
+    def items(self):
+        for pos, key in enumerate(self.list):
+            yield key, self._value(key, pos)
+        for key, value in self._marks.items():
+            yield key, value
+
+    def values(self):
+        for key, value in self.items():
+            yield value
+
+    @property
+    def list(self):
+        return [(hi << 64) | lo for hi, lo in zip(
+            self._hi[:self._n].tolist(), self._lo[:self._n].tolist())]
+
+    @property
+    def nbytes(self):
+        """int : the memory used by the arrays of the index"""
+        return self._hi.nbytes + self._lo.nbytes + self._table.nbytes
+
+
 class ObjectStore(StorableNamedObject):
     """
     Base Class for storing complex objects in a netCDF4 file. It holds a
@@ -78,6 +345,9 @@ class ObjectStore(StorableNamedObject):
         or string for named objects. This is only used for cached access
         if caching is not `False`. Must be of type
         :obj:`openpathsampling.netcdfplus.base.StorableObject` or subclassed.
+    stats : :py:class:`openpathsampling.netcdfplus.cache.CacheStats` or None
+        the counters of cache hits, misses and loading time if enabled by
+        `enable_stats`
 
     """
     _restore_non_initial_attr = False
@@ -105,6 +375,22 @@ class ObjectStore(StorableNamedObject):
         def __contains__(self, item):
             return (self.prefix + item) in self.dct
 
+    class VariableDelegator(DictDelegator):
+        """Access to the netCDF variables of a store
+
+        Buffered rows of a variable are written before it is returned.
+        """
+        def __init__(self, store, dct):
+            super(ObjectStore.VariableDelegator, self).__init__(store, dct)
+            self.vars = store.storage.vars
+
+        def __getitem__(self, item):
+            name = self.prefix + item
+            delegate = self.vars.get(name)
+            if delegate is not None:
+                delegate.flush()
+            return self.dct[name]
+
     def prefix_delegate(self, dct):
         return ObjectStore.DictDelegator(self, dct)
 
@@ -167,6 +453,7 @@ class ObjectStore(StorableNamedObject):
         self.content_class = content_class
         self.prefix = None
         self.cache = NoCache()
+        self.stats = None
         self._free = set()
         self._cached_all = False
         self.nestable = nestable
@@ -230,21 +517,25 @@ class ObjectStore(StorableNamedObject):
         self._storage = storage
         self.prefix = prefix
 
-        self.variables = self.prefix_delegate(self.storage.variables)
+        self.variables = ObjectStore.VariableDelegator(
+            self, self.storage.variables)
         self.units = self.prefix_delegate(self.storage.units)
         self.vars = self.prefix_delegate(self.storage.vars)
 
         self.index = self.create_uuid_index()
 
     def create_uuid_index(self):
-        return HashedList()
+        return CompactHashedList()
 
     def restore(self):
         self.load_indices()
 
     def load_indices(self):
         self.index.clear()
-        self.index.extend(self.vars['uuid'][:])
+        if hasattr(self.index, 'extend_strings'):
+            self.index.extend_strings(self.variables['uuid'][:])
+        else:
+            self.index.extend(self.vars['uuid'][:])
 
     @property
     def storage(self):
@@ -309,7 +600,29 @@ class ObjectStore(StorableNamedObject):
             caching = WeakLRUCache(caching)
 
         if isinstance(caching, Cache):
-            self.cache = caching.transfer(self.cache)
+            if self.stats is None:
+                self.cache = caching.transfer(self.cache)
+            else:
+                self.cache = CountingCache(
+                    caching.transfer(self.cache.cache), self.stats)
+
+    def enable_stats(self):
+        """
+        Count the hits and misses of the cache and the time to load objects
+
+        The counters are available as `stats`.
+        """
+        if self.stats is None:
+            self.stats = CacheStats()
+            self.cache = CountingCache(self.cache, self.stats)
+
+    def disable_stats(self):
+        """
+        Stop counting and remove the statistics of this store
+        """
+        if self.stats is not None:
+            self.cache = self.cache.cache
+            self.stats = None
 
     def idx(self, obj):
         """
@@ -334,9 +647,10 @@ class ObjectStore(StorableNamedObject):
         Add iteration over all elements in the storage
         """
         # we want to iterator in the order object were saved!
-        for uuid in self.index._list:
+        for uuid in self.index.list:
             yield self.load(uuid)
 
+    @io_locked
     def __len__(self):
         """
         Return the number of stored objects
@@ -347,6 +661,7 @@ class ObjectStore(StorableNamedObject):
             number of stored objects
 
         """
+        self.storage.flush_buffers()
         return len(self.storage.dimensions[self.prefix])
 
     def write(self, variable, idx, obj, attribute=None):
@@ -450,6 +765,7 @@ class ObjectStore(StorableNamedObject):
         self.cache.clear()
         self._cached_all = False
 
+    @io_locked
     def cache_all(self):
         """Load all samples as fast as possible into the cache"""
         if not self._cached_all:
@@ -489,6 +805,7 @@ class ObjectStore(StorableNamedObject):
         """
         return self.load(0)
 
+    @io_locked
     def free(self):
         """
         Return the number of the next free index for this store
@@ -700,6 +1017,7 @@ class ObjectStore(StorableNamedObject):
     # LOAD/SAVE DECORATORS FOR CACHE HANDLING
     # ==========================================================================
 
+    @io_locked
     def load(self, idx):
         """
         Returns an object from the storage.
@@ -824,6 +1142,7 @@ class ObjectStore(StorableNamedObject):
 
         self.index.unmark(obj.__uuid__)
 
+    @io_locked
     def save(self, obj, idx=None):
         """
         Saves an object to the storage.
@@ -926,12 +1245,13 @@ class ObjectStore(StorableNamedObject):
         ----------
         idx : int
             the index where the object was stored
-        json : str
-            json string the represents a serialized version of the stored object
+        json : str or numpy.ndarray
+            the serialized object as read from the json variable, a string
+            or, for binary codecs, an array of bytes
         """
 
         if idx not in self.cache:
-            obj = self.simplifier.from_json(json)
+            obj = self.vars['json'].getter(json)
 
             self._get_id(idx, obj)
 
@@ -2,6 +2,7 @@ import logging
 
 from .object import ObjectStore
 from openpathsampling.netcdfplus.cache import LRUChunkLoadingCache
+from openpathsampling.netcdfplus.writer import io_locked
 
 logger = logging.getLogger(__name__)
 init_log = logging.getLogger('openpathsampling.initialization')
@@ -46,6 +47,7 @@ class ValueStore(ObjectStore):
         super(ValueStore, self).register(storage, prefix)
         self.object_pos = self.storage._objects[self.key_class].pos
 
+    @io_locked
     def __len__(self):
         return len(self.variables['value'])
 
@@ -53,6 +55,7 @@ class ValueStore(ObjectStore):
     # LOAD/SAVE DECORATORS FOR CACHE HANDLING
     # ==========================================================================
 
+    @io_locked
     def load(self, idx):
         pos = self.object_pos(idx)
         if pos is None:
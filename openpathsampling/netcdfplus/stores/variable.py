@@ -1,6 +1,7 @@
 from openpathsampling.netcdfplus.base import StorableObject
 
 from .object import ObjectStore
+from openpathsampling.netcdfplus.writer import io_locked
 
 import logging
 
@@ -68,6 +69,7 @@ class VariableStore(ObjectStore):
         self.cache_all()
         return self
 
+    @io_locked
     def cache_all(self, part=None):
         """Load all samples as fast as possible into the cache
 
@@ -0,0 +1,173 @@
+import atexit
+import functools
+import logging
+import threading
+import weakref
+
+try:
+    import queue
+except ImportError:  # pragma: no cover
+    import Queue as queue
+
+logger = logging.getLogger(__name__)
+
+# writers whose thread is running; their queues are drained at exit
+_running_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _stop_running_writers():
+    for writer in list(_running_writers):
+        try:
+            writer.stop()
+        except Exception as error:
+            logger.error('Background storage job failed at exit: %s', error)
+
+
+class IOLock(object):
+    """
+    Reentrant lock that knows whether the current thread holds it
+
+    Used as a context manager, like :class:`threading.RLock`.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @property
+    def depth(self):
+        """int : how often the current thread has acquired the lock"""
+        return getattr(self._local, 'depth', 0)
+
+    def is_owned(self):
+        """bool : True if the current thread holds the lock"""
+        return self.depth > 0
+
+    def acquire(self, blocking=True):
+        acquired = self._lock.acquire(blocking)
+        if acquired:
+            self._local.depth = self.depth + 1
+        return acquired
+
+    def release(self):
+        self._local.depth = self.depth - 1
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+def io_locked(fnc):
+    """
+    Decorator for store methods that access the file
+
+    The method holds the :attr:`NetCDFPlus.io_lock` of the storage of the
+    store, so it does not run at the same time as the background writer.
+    """
+    @functools.wraps(fnc)
+    def locked(self, *args, **kwargs):
+        with self.storage.io_lock:
+            return fnc(self, *args, **kwargs)
+
+    return locked
+
+
+class BackgroundWriter(object):
+    """
+    Thread that runs storage jobs in the order they were submitted
+
+    Jobs are kept in a bounded queue. If the queue is full, :meth:`submit`
+    blocks until the thread has caught up, so a fast producer cannot pile
+    up an arbitrary number of unwritten objects. Every job holds a
+    reference to its arguments until it has been run.
+
+    If a job fails, all later jobs are skipped, and the exception is
+    raised in the submitting thread by the next call to :meth:`submit`,
+    :meth:`wait` or :meth:`stop`.
+
+    Jobs that are still queued at interpreter exit are run before the
+    interpreter shuts down.
+
+    Parameters
+    ----------
+    lock : :class:`IOLock`
+        lock held while a job runs; other threads that access the same
+        file have to hold it, too
+    max_queue : int
+        the maximal number of jobs waiting in the queue
+    """
+
+    def __init__(self, lock, max_queue=8):
+        self.lock = lock
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.error = None
+        self.thread = threading.Thread(target=self._run,
+                                       name='netcdfplus-writer')
+        # daemon, so a forgotten writer does not block the exit; the queue
+        # is drained by an exit handler instead
+        self.thread.daemon = True
+        self.thread.start()
+        _running_writers.add(self)
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                if self.error is None:
+                    fnc, args = job
+                    with self.lock:
+                        fnc(*args)
+            except Exception as error:
+                logger.error('Background storage job failed: %s', error)
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error = self.error
+            self.error = None
+            raise error
+
+    def submit(self, fnc, *args):
+        """
+        Run ``fnc(*args)`` in the background
+
+        Parameters
+        ----------
+        fnc : callable
+            the job
+        args
+            the arguments of the job
+        """
+        self._raise_error()
+        self.queue.put((fnc, args))
+
+    def wait(self):
+        """
+        Wait until all submitted jobs have been run
+
+        Called from a job itself (e.g. a store that syncs while it is
+        saved) this returns immediately.
+        """
+        if threading.current_thread() is self.thread:
+            return
+        self.queue.join()
+        self._raise_error()
+
+    def stop(self):
+        """
+        Run all submitted jobs and end the thread
+        """
+        _running_writers.discard(self)
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self._raise_error()
@@ -1,7 +1,5 @@
 import numpy as np
 import pandas as pd
-import scipy
-import matplotlib.pyplot as plt
 import math
 from .lookup_function import LookupFunction, VoxelLookupFunction
 import collections
@@ -699,6 +697,7 @@ class HistogramPlotter2D(object):
         PolyCollection :
             return value of plt.pcolormesh
         """
+        import matplotlib.pyplot as plt
         if normed is None:
             normed = self.normed
 
@@ -738,6 +737,7 @@ class HistogramPlotter2D(object):
             list to plot; paths.Trajectory allowed if the histogram can
             convert it to CVs.
         """
+        import matplotlib.pyplot as plt
         x, y = list(zip(*self.histogram.map_to_float_bins(trajectory)))
         px = np.asarray(x) - self.xrange_[0]
         py = np.asarray(y) - self.yrange_[0]
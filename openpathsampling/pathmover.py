@@ -1979,6 +1979,169 @@ class ConditionalSequentialMover(SequentialMover):
             movechanges, mover=self)
 
 
+class ConcurrentMover(SequentialMover):
+    """
+    Performs commuting moves concurrently in worker processes.
+
+    All movers act on disjoint sets of ensembles (see
+    :meth:`.ConcurrentMover.commute`) and hence on different replicas. The
+    result does not depend on the order of the moves, so all of them start
+    from the same sample set and their engine propagation can run at the
+    same time. Their samples are applied in the order of the movers list,
+    and the random number generators are seeded for each move from numbers
+    drawn in that order, so that the Markov chain is the same for any
+    number of workers. Moves run in this process restore the state of the
+    random number generators afterwards.
+
+    The worker processes are started by the first move and kept for all
+    following moves. They are shut down by :meth:`.close` (see also
+    :meth:`.PathSampling.close_worker_pools`) or at exit.
+
+    For example, this would be used to shoot in all interface ensembles of
+    a RETIS simulation at once.
+    """
+
+    _pool = None
+
+    def __init__(self, movers, n_workers=None):
+        """
+        Parameters
+        ----------
+        movers : list of openpathsampling.PathMover
+            the list of commuting pathmovers
+        n_workers : int or None
+            number of worker processes; if None or 1, the moves are run one
+            after another in this process
+        """
+        if not self.commute(movers):
+            raise ValueError(
+                'Movers of a ConcurrentMover must act on disjoint ensembles')
+        super(ConcurrentMover, self).__init__(movers)
+        self.n_workers = n_workers
+        self._pool = None
+
+    def to_dict(self):
+        return {
+            'movers': self.movers,
+            'n_workers': self.n_workers
+        }
+
+    @classmethod
+    def from_dict(cls, dct):
+        return cls(movers=dct['movers'], n_workers=dct.get('n_workers'))
+
+    @staticmethod
+    def commute(movers):
+        """
+        Check whether movers act on disjoint sets of ensembles
+
+        Parameters
+        ----------
+        movers : list of openpathsampling.PathMover
+            the movers to be checked
+
+        Returns
+        -------
+        bool
+            True if no ensemble is used by more than one mover
+        """
+        used = set()
+        for mover in movers:
+            inp, out = mover.ensemble_signature_set
+            ensembles = inp | out
+            if ensembles & used:
+                return False
+            used |= ensembles
+        return True
+
+    @staticmethod
+    def commuting_sets(movers):
+        """
+        Split movers into lists of movers that commute
+
+        Movers are added to the first list they commute with, so movers on
+        disjoint ensembles all end up in the first list.
+
+        Parameters
+        ----------
+        movers : list of openpathsampling.PathMover
+            the movers to be split
+
+        Returns
+        -------
+        list of list of openpathsampling.PathMover
+            lists of commuting movers, in the original order
+        """
+        sets = []
+        for mover in movers:
+            for commuting in sets:
+                if ConcurrentMover.commute(commuting + [mover]):
+                    commuting.append(mover)
+                    break
+            else:
+                sets.append([mover])
+        return sets
+
+    def _generate_in_out(self):
+        return InOutSet(sum([sub.in_out for sub in self.submovers], InOutSet()))
+
+    def sub_replica_state(self, replica_states):
+        return [replica_states] * len(self.submovers)
+
+    def close(self):
+        """
+        Shut down the worker processes, if they are running
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def __del__(self):
+        self.close()
+
+    def move(self, sample_set):
+        logger.debug("Starting concurrent move")
+        # imported here: the pathsimulators import this module
+        from openpathsampling.pathsimulators.parallel import (
+            WorkerPool, seeded_random
+        )
+
+        # one seed per mover
+        seeds = [int(seed) for seed in
+                 np.random.randint(2**31 - 1, size=len(self.movers))]
+
+        if self.n_workers is not None and self.n_workers > 1:
+            if self._pool is None:
+                self._pool = WorkerPool(self.movers, self.n_workers)
+                self._pool.start()
+
+            sample_set_json = self._pool.to_worker_json(sample_set)
+            tasks = [(idx, sample_set_json, seed)
+                     for idx, seed in enumerate(seeds)]
+            movechanges = list(self._pool.imap(_run_concurrent_task, tasks))
+        else:
+            movechanges = []
+            for mover, seed in zip(self.movers, seeds):
+                logger.debug("Starting concurrent move step " + str(mover))
+                with seeded_random(seed):
+                    movechanges.append(mover.move(sample_set))
+
+        # the samples are applied in the order of the movers
+        return paths.SequentialMoveChange(movechanges, mover=self)
+
+
+def _run_concurrent_task(task):
+    """Run a submover of a ConcurrentMover inside a worker process"""
+    from openpathsampling.pathsimulators.parallel import (
+        worker_setup, from_main_json, to_main_json, seed_random
+    )
+    idx, sample_set_json, seed = task
+    mover = worker_setup()[idx]
+    sample_set = from_main_json(sample_set_json)
+    seed_random(seed)
+    return to_main_json(mover.move(sample_set))
+
+
 # class ReplicaIDChangeMover(PathMover):
 #     """
 #     Changes the replica ID for a path.
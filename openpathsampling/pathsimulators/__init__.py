@@ -2,6 +2,7 @@ from .path_simulator import PathSimulator, MCStep
 from .bootstrap_init_conds import FullBootstrapping, Bootstrapping
 from .direct_md import DirectSimulation
 from .path_sampling import PathSampling
+from .multi_walker import MultiWalkerPathSampling
 from .shoot_snapshots import (
     ShootFromSnapshotsSimulation, CommittorSimulation
 )
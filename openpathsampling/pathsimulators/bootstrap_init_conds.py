@@ -195,7 +195,7 @@ class Bootstrapping(PathSimulator):
                     cv(self.storage.snapshots[n_samples:n_len])
                     n_samples = n_len
 
-                self.storage.steps.save(mcstep)
+                self.storage.save_in_background(mcstep)
 
             self.sample_set = new_sampleset
 
@@ -208,7 +208,7 @@ class Bootstrapping(PathSimulator):
                 self.sample_set.sanity_check()
                 self.sync_storage()
 
-        self.sync_storage()
+        self.sync_storage(block=True)
 
         paths.tools.refresh_output(
             ("DONE! Completed Bootstrapping cycle step %d"
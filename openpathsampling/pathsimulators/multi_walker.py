@@ -0,0 +1,277 @@
+import time
+import logging
+
+import numpy as np
+
+import openpathsampling as paths
+from openpathsampling.netcdfplus import LazyArray, ObjectStore
+from .path_simulator import PathSimulator
+from .path_sampling import PathSampling
+from .parallel import (
+    WorkerPool, seeded_random, from_main_json, to_main_json, worker_setup
+)
+from ..ops_logging import initialization_logging
+
+
+logger = logging.getLogger(__name__)
+init_log = logging.getLogger('openpathsampling.initialization')
+
+class _NullStream(object):
+    """Output stream that discards everything; the walkers are silent"""
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+_null_stream = _NullStream()
+
+
+class MultiWalkerPathSampling(PathSimulator):
+    """
+    Several independent path sampling Markov chains, run in parallel.
+
+    Each walker is a :class:`.PathSampling` simulation with its own
+    :class:`.SampleSet`, all using the same move scheme. The walkers are
+    advanced in rounds of ``steps_per_round`` MC steps; during a round,
+    every walker runs in a separate worker process (if ``n_workers > 1``).
+    All steps are saved into one storage by this process, walker after
+    walker. The walker that generated a step is ``step.simulation``; see
+    :meth:`.walker_id` and :meth:`.walker_steps`, which select the steps of
+    a walker in a storage from the stored simulation indices.
+
+    Since all walkers sample the same path ensembles with the same movers,
+    analysis tools like :class:`.StandardTISAnalysis` can pool all steps in
+    the storage, e.g., ``analysis.calculate(storage.steps)``.
+
+    Parameters
+    ----------
+    storage : :class:`.Storage`
+        the storage where all results should be stored in
+    move_scheme : :class:`.MoveScheme`
+        the move scheme used by all walkers
+    sample_sets : list of :class:`.SampleSet`
+        the initial sample set for each walker
+    n_workers : int or None
+        number of worker processes; if None or 1, the walkers are run one
+        after another in this process
+    seed : int or None
+        if given, the random number generators are seeded for every MC step
+        of every walker, so that results do not depend on `n_workers` or
+        `steps_per_round`
+    steps_per_round : int
+        number of MC steps each walker runs before its results are saved;
+        default is 10
+
+    Attributes
+    ----------
+    walkers : list of :class:`.PathSampling`
+        the simulations for the individual walkers
+    """
+
+    calc_name = "MultiWalkerPathSampling"
+
+    def __init__(self, storage, move_scheme=None, sample_sets=None,
+                 n_workers=None, seed=None, steps_per_round=10):
+        super(MultiWalkerPathSampling, self).__init__(storage)
+        self.move_scheme = move_scheme
+        self.n_workers = n_workers
+        self.seed = seed
+        self.steps_per_round = steps_per_round
+
+        if sample_sets is None:
+            sample_sets = []
+
+        self.walkers = []
+        for walker_id, sample_set in enumerate(sample_sets):
+            walker = PathSampling(
+                storage=None,
+                move_scheme=move_scheme,
+                sample_set=sample_set
+            ).named('walker %d' % walker_id)
+            walker.output_stream = _null_stream
+            walker.allow_refresh = False
+            self.walkers.append(walker)
+        self._walker_ids = self._index_walkers(self.walkers)
+
+        initialization_logging(init_log, self,
+                               ['move_scheme', 'n_workers', 'seed',
+                                'steps_per_round'])
+
+        if self.storage is not None and self.walkers:
+            template_trajectory = self.walkers[0].sample_set[0].trajectory
+            self.storage.save(template_trajectory)
+            for walker in self.walkers:
+                self.storage.save_in_background(walker.current_step)
+            self.sync_storage()
+
+    def to_dict(self):
+        return {
+            'move_scheme': self.move_scheme,
+            'walkers': self.walkers,
+            'seed': self.seed,
+            'steps_per_round': self.steps_per_round
+        }
+
+    @classmethod
+    def from_dict(cls, dct):
+        obj = cls.__new__(cls)
+        # user must manually set a storage!
+        PathSimulator.__init__(obj, storage=None)
+        obj.move_scheme = dct['move_scheme']
+        obj.walkers = dct['walkers']
+        obj._walker_ids = cls._index_walkers(obj.walkers)
+        obj.seed = dct['seed']
+        obj.n_workers = None
+        obj.steps_per_round = dct.get('steps_per_round', 10)
+        return obj
+
+    @staticmethod
+    def _index_walkers(walkers):
+        return {walker.__uuid__: walker_id
+                for walker_id, walker in enumerate(walkers)}
+
+    def walker_id(self, step):
+        """Number of the walker that generated a given step.
+
+        Parameters
+        ----------
+        step : :class:`.MCStep`
+            the step
+
+        Returns
+        -------
+        int or None
+            the walker id; None if the step was not generated by a walker
+            of this simulation
+        """
+        simulation = step.simulation
+        if simulation is None:
+            return None
+        return self._walker_ids.get(simulation.__uuid__)
+
+    def walker_steps(self, steps, walker_id):
+        """Select the steps of a single walker.
+
+        Parameters
+        ----------
+        steps : iterable of :class:`.MCStep`
+            steps to select from, e.g., ``storage.steps``. For a store, the
+            steps are selected by the stored index of their simulation and
+            only the selected steps are loaded
+        walker_id : int
+            the walker
+
+        Returns
+        -------
+        list of :class:`.MCStep`
+            the steps of this walker, in the order given
+        """
+        walker = self.walkers[walker_id]
+        if isinstance(steps, ObjectStore):
+            simulations = steps.storage.pathsimulators
+            if walker not in simulations:
+                return []
+            selected = np.flatnonzero(
+                LazyArray.from_store(steps, 'simulation')[:]
+                == simulations.idx(walker))
+            return [steps[int(idx)] for idx in selected]
+
+        return [step for step in steps
+                if self.walker_id(step) == walker_id]
+
+    def run(self, n_steps):
+        """Run every walker for a number of MC steps.
+
+        Parameters
+        ----------
+        n_steps : int
+            number of MC steps per walker
+        """
+        initial_time = time.time()
+        n_done = 0
+        if self.n_workers is not None and self.n_workers > 1:
+            pool = WorkerPool([walker._mover for walker in self.walkers],
+                              self.n_workers)
+            with pool:
+                while n_done < n_steps:
+                    n_round = min(self.steps_per_round, n_steps - n_done)
+                    tasks = [
+                        (walker_id, pool.to_worker_json(walker.sample_set),
+                         walker.step, n_round, self.seed)
+                        for walker_id, walker in enumerate(self.walkers)
+                    ]
+                    results = pool.imap(_run_walker_task, tasks)
+                    for walker, steps in zip(self.walkers, results):
+                        self._save_walker_steps(walker, steps)
+                    n_done += n_round
+                    self._finish_round(n_done, n_steps, initial_time)
+        else:
+            while n_done < n_steps:
+                n_round = min(self.steps_per_round, n_steps - n_done)
+                for walker_id, walker in enumerate(self.walkers):
+                    steps = _advance_walker(walker, walker_id, n_round,
+                                            self.seed)
+                    self._save_walker_steps(walker, steps)
+                n_done += n_round
+                self._finish_round(n_done, n_steps, initial_time)
+
+        self.sync_storage(block=True)
+        paths.tools.refresh_output(
+            "DONE! Completed " + str(self.step) + " Monte Carlo cycles "
+            "for each of " + str(len(self.walkers)) + " walkers.\n",
+            refresh=False,
+            output_stream=self.output_stream
+        )
+
+    def _save_walker_steps(self, walker, steps):
+        for mcstep in steps:
+            if self.storage is not None:
+                self.storage.save_in_background(mcstep)
+
+        if steps:
+            last = steps[-1]
+            walker.step = last.mccycle
+            walker.sample_set = last.active
+            walker._current_step = last
+
+    def _finish_round(self, n_done, n_steps, initial_time):
+        if self.walkers:
+            self.step = self.walkers[0].step
+        self.sync_storage()
+        paths.tools.refresh_output(
+            "Working on Monte Carlo cycle number " + str(self.step)
+            + " of " + str(len(self.walkers)) + " walkers\n"
+            + paths.tools.progress_string(n_done, n_steps,
+                                          time.time() - initial_time),
+            refresh=self.allow_refresh,
+            output_stream=self.output_stream
+        )
+
+
+def _advance_walker(walker, walker_id, n_steps, seed):
+    """Run a walker for some steps and return the generated MC steps"""
+    steps = []
+    for _ in range(n_steps):
+        if seed is not None:
+            with seeded_random(seed, walker_id, walker.step + 1):
+                walker.run(1)
+        else:
+            walker.run(1)
+        steps.append(walker.current_step)
+    return steps
+
+
+def _run_walker_task(task):
+    """Run a walker for some steps inside a worker process"""
+    walker_id, sample_set_json, first_step, n_steps, seed = task
+    mover = worker_setup()[walker_id]
+    walker = mover.pathsimulator
+    # keep the mover of the main process, so that the steps reference it
+    walker._mover = mover
+    walker.output_stream = _null_stream
+    walker.allow_refresh = False
+    walker.sample_set = from_main_json(sample_set_json)
+    walker.step = first_step
+    return to_main_json(_advance_walker(walker, walker_id, n_steps, seed))
@@ -0,0 +1,324 @@
+"""
+Tools to run independent parts of a simulation in worker processes.
+
+Objects are sent between the processes as JSON strings created with
+:class:`.CachedUUIDObjectJSON`, so that they keep their UUIDs. The setup
+shared by all tasks (engine, movers, ensembles, ...) is sent once when a
+worker starts. Objects in results that are part of the setup are only sent
+as references and are mapped back to the original objects in the main
+process.
+"""
+import atexit
+import logging
+import random
+import weakref
+from contextlib import contextmanager
+
+import numpy as np
+import ujson
+
+from openpathsampling.netcdfplus import StorableObject
+from openpathsampling.netcdfplus.dictify import (
+    CachedUUIDObjectJSON, ujson_kwargs
+)
+
+logger = logging.getLogger(__name__)
+
+# the setup and its objects, as known inside a worker process
+_worker_setup = None
+_worker_known = {}
+# objects received with the task that is currently run in a worker
+_task_known = {}
+# pools with running worker processes, shut down at exit
+_running_pools = weakref.WeakSet()
+
+
+@atexit.register
+def _close_running_pools():
+    for pool in list(_running_pools):
+        pool.close()
+
+
+def seed_random(seed, *keys):
+    """Seed the random number generators for one independent task.
+
+    The generators of `random` and `numpy.random` are seeded from the
+    combination of a global seed and the keys identifying the task, so that
+    the result of a task does not depend on which process runs it.
+
+    Parameters
+    ----------
+    seed : int or None
+        global seed; if None, the generators are seeded from system entropy
+    keys : int
+        (non-negative) integers identifying the task
+    """
+    if seed is None:
+        np.random.seed()
+        random.seed()
+    else:
+        state = [seed] + list(keys)
+        np.random.seed(state)
+        random.seed(hash(tuple(state)))
+
+
+@contextmanager
+def seeded_random(seed, *keys):
+    """Seed the random number generators only for the enclosed code.
+
+    Like :func:`.seed_random`, but the previous states of the generators of
+    `random` and `numpy.random` are restored afterwards, so that code run in
+    this process behaves like code run in a worker, without reseeding the
+    generators of the caller.
+
+    Parameters
+    ----------
+    seed : int or None
+        global seed; see :func:`.seed_random`
+    keys : int
+        (non-negative) integers identifying the task
+    """
+    np_state = np.random.get_state()
+    state = random.getstate()
+    seed_random(seed, *keys)
+    try:
+        yield
+    finally:
+        np.random.set_state(np_state)
+        random.setstate(state)
+
+
+def initialize_worker(setup_json):
+    """Initializer for worker processes; rebuilds the shared setup.
+
+    Parameters
+    ----------
+    setup_json : str
+        the setup as created by :attr:`.WorkerPool.setup_json`
+    """
+    global _worker_setup, _worker_known
+    StorableObject.reset_uuid_generator()
+    decoder = CachedUUIDObjectJSON()
+    _worker_setup = decoder.from_json(setup_json)
+    _worker_known = dict(decoder.uuid_cache.items())
+
+
+def worker_setup():
+    """The setup object of the current worker process"""
+    return _worker_setup
+
+
+def from_main_json(json_string):
+    """Decode an object inside a worker that was sent by the main process.
+
+    Objects that are part of the setup are mapped to the worker's copies.
+    The objects of the task are remembered, so that results of the task can
+    refer to them.
+
+    Parameters
+    ----------
+    json_string : str
+        string created by :meth:`.WorkerPool.to_worker_json`
+
+    Returns
+    -------
+    object
+        the decoded object
+    """
+    global _task_known
+    decoder = CachedUUIDObjectJSON()
+    decoder.uuid_cache.update(_worker_known)
+    obj = decoder.from_json(json_string)
+    _task_known = dict(decoder.uuid_cache.items())
+    return obj
+
+
+def to_main_json(obj):
+    """Encode a result inside a worker to be sent to the main process.
+
+    Objects that are part of the setup or of the current task are only sent
+    as references.
+
+    Parameters
+    ----------
+    obj : object
+        the object to be encoded
+
+    Returns
+    -------
+    str
+        the JSON string
+    """
+    encoder = CachedUUIDObjectJSON()
+    encoder.uuid_cache.update(_worker_known)
+    encoder.uuid_cache.update(_task_known)
+    return ujson.dumps(encoder.simplify(obj), **ujson_kwargs)
+
+
+class WorkerPool(object):
+    """Process pool whose workers share a common setup object.
+
+    Parameters
+    ----------
+    setup : object
+        object (usually a :class:`.PathSimulator`) that all tasks need; it
+        is rebuilt once in every worker and can be accessed there with
+        :func:`.worker_setup`
+    n_workers : int
+        number of worker processes
+    """
+    def __init__(self, setup, n_workers):
+        self.n_workers = n_workers
+        self.setup = setup
+        encoder = CachedUUIDObjectJSON()
+        self.setup_json = encoder.to_json(setup)
+        self._known = dict(encoder.uuid_cache.items())
+        self._decoder = CachedUUIDObjectJSON()
+        self._decoder.uuid_cache = encoder.uuid_cache
+        self._sent = {}
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def is_running(self):
+        """bool : whether the worker processes have been started"""
+        return self._executor is not None
+
+    def start(self):
+        """Start the worker processes"""
+        from concurrent.futures import ProcessPoolExecutor
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=initialize_worker,
+            initargs=(self.setup_json,)
+        )
+        _running_pools.add(self)
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        _running_pools.discard(self)
+
+    def to_worker_json(self, obj):
+        """Encode an object to be sent to a worker as part of a task.
+
+        Objects that are part of the setup are only sent as references.
+        Results of the task that refer to the sent objects are mapped back
+        to them by :meth:`.imap`.
+
+        Parameters
+        ----------
+        obj : object
+            the object to be encoded
+
+        Returns
+        -------
+        str
+            the JSON string, to be decoded with :func:`.from_main_json`
+        """
+        encoder = CachedUUIDObjectJSON()
+        encoder.uuid_cache.update(self._known)
+        json_string = ujson.dumps(encoder.simplify(obj), **ujson_kwargs)
+        # keep the sent objects alive until the results are decoded
+        for uuid, sent in encoder.uuid_cache.items():
+            if uuid not in self._known:
+                self._sent[uuid] = sent
+                self._decoder.uuid_cache[uuid] = sent
+        return json_string
+
+    def imap(self, fnc, tasks):
+        """Run the tasks in the workers and yield the results in order.
+
+        Parameters
+        ----------
+        fnc : function(task) -> str
+            module level function that runs a task and returns the result
+            encoded by :func:`.to_main_json`
+        tasks : iterable
+            the (picklable) tasks
+
+        Yields
+        ------
+        object
+            the decoded results, in the order of the tasks
+        """
+        for result in self._executor.map(fnc, tasks):
+            yield self._decoder.from_json(result)
+        self._sent = {}
+
+
+def evaluate_attribute(json_string):
+    """Task for worker processes: evaluate the setup attribute for objects.
+
+    Parameters
+    ----------
+    json_string : str
+        the list of objects encoded by :meth:`.WorkerPool.to_worker_json`
+
+    Returns
+    -------
+    str
+        the values encoded by :func:`.to_main_json`
+    """
+    items = from_main_json(json_string)
+    values = worker_setup()._eval_dict.evaluate(items)
+    # numpy scalars are sent as 0-d arrays, which the JSON encoder supports
+    return to_main_json([
+        np.asarray(value) if isinstance(value, np.generic) else value
+        for value in values
+    ])
+
+
+class AttributeWorkerPool(WorkerPool):
+    """Process pool that evaluates a CV (or other pseudo attribute).
+
+    Use it as the executor of the attribute, so that missing values are
+    evaluated in the worker processes, e.g.
+
+    >>> pool = AttributeWorkerPool(cv, n_workers=4)
+    >>> with pool:
+    ...     values = cv.with_executor(pool, chunksize=1000)(trajectory)
+
+    Only the values are computed in the workers; they are cached and stored
+    in the main process as usual.
+
+    Parameters
+    ----------
+    attribute : :class:`.PseudoAttribute`
+        the attribute to be evaluated; it is sent to every worker once
+    n_workers : int
+        number of worker processes
+    """
+    def __init__(self, attribute, n_workers):
+        super(AttributeWorkerPool, self).__init__(attribute, n_workers)
+
+    def map(self, fnc, chunks):
+        """Evaluate the attribute for each chunk in the workers.
+
+        Parameters
+        ----------
+        fnc : function
+            the evaluation in the main process; not used, since the workers
+            evaluate their copy of the attribute
+        chunks : iterable of list
+            the lists of objects to evaluate
+
+        Returns
+        -------
+        list
+            the values for each chunk
+        """
+        tasks = [self.to_worker_json(list(chunk)) for chunk in chunks]
+        return [
+            [value[()] if isinstance(value, np.ndarray) and value.ndim == 0
+             else value for value in values]
+            for values in self.imap(evaluate_attribute, tasks)
+        ]
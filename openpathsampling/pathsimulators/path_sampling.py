@@ -110,7 +110,7 @@ class PathSampling(PathSimulator):
 
         """
         if self.storage is not None and self._current_step is not None:
-            self.storage.steps.save(self._current_step)
+            self.storage.save_in_background(self._current_step)
 
     @classmethod
     def from_step(cls, storage, step, initialize=True):
@@ -229,6 +229,18 @@ class PathSampling(PathSimulator):
 
         self.output_stream = original_output_stream
 
+    def close_worker_pools(self):
+        """Shut down the worker processes of all concurrent movers.
+
+        The worker processes are kept between calls of :meth:`.run` and are
+        shut down at exit otherwise. A later run starts them again.
+        """
+        if self.root_mover is None:
+            return
+        for mover in self.root_mover:
+            if isinstance(mover, paths.ConcurrentMover):
+                mover.close()
+
     def run(self, n_steps):
         mcstep = None
 
@@ -287,6 +299,8 @@ class PathSampling(PathSimulator):
 
             self._current_step = mcstep
             self.save_current_step()
+            if self.storage is not None:
+                self.storage.log_stats(self.step)
 
             # if self.storage is not None:
             #     # I think this is done automatically when saving snapshots
@@ -303,7 +317,7 @@ class PathSampling(PathSimulator):
 
             self.sample_set = new_sampleset
 
-        self.sync_storage()
+        self.sync_storage(block=True)
 
         if self.live_visualizer is not None and mcstep is not None:
             self.live_visualizer.draw_ipynb(mcstep)
@@ -85,12 +85,22 @@ class PathSimulator(with_metaclass(abc.ABCMeta, StorableNamedObject)):
         self.output_stream = sys.stdout  # user can change to file handler
         self.allow_refresh = True
 
-    def sync_storage(self):
+    def sync_storage(self, block=False):
         """
         Will sync all collective variables and the storage to disk
+
+        If the storage has a background writer (see
+        :meth:`.Storage.start_background_writer`), writing to disk is
+        queued and, unless `block` is True, this does not wait for it.
+
+        Parameters
+        ----------
+        block : bool
+            if True, wait until everything is written; simulators use this
+            at the end of a run
         """
         if self.storage is not None:
-            self.storage.sync_all()
+            self.storage.sync_all(block=block)
 
     @abc.abstractmethod
     def run(self, n_steps):
@@ -116,7 +126,7 @@ class PathSimulator(with_metaclass(abc.ABCMeta, StorableNamedObject)):
         )
 
         if self.storage is not None:
-            self.storage.steps.save(mcstep)
+            self.storage.save_in_background(mcstep)
             self.storage.sync_all()
 
 
@@ -3,6 +3,7 @@ import openpathsampling as paths
 
 logger = logging.getLogger(__name__)
 from .path_simulator import PathSimulator, MCStep
+from .parallel import WorkerPool, seeded_random, to_main_json, worker_setup
 
 class ShootFromSnapshotsSimulation(PathSimulator):
     """
@@ -38,8 +39,6 @@ class ShootFromSnapshotsSimulation(PathSimulator):
                  backward_ensemble, randomizer, initial_snapshots):
         super(ShootFromSnapshotsSimulation, self).__init__(storage)
         self.engine = engine
-        # FIXME: this next line seems weird; but tests fail without it
-        paths.EngineMover.default_engine = engine
         try:
             initial_snapshots = list(initial_snapshots)
         except TypeError:
@@ -56,11 +55,13 @@ class ShootFromSnapshotsSimulation(PathSimulator):
 
         self.forward_mover = paths.ForwardExtendMover(
             ensemble=self.starting_ensemble,
-            target_ensemble=self.forward_ensemble
+            target_ensemble=self.forward_ensemble,
+            engine=self.engine
         )
         self.backward_mover = paths.BackwardExtendMover(
             ensemble=self.starting_ensemble,
-            target_ensemble=self.backward_ensemble
+            target_ensemble=self.backward_ensemble,
+            engine=self.engine
         )
 
         # subclasses will often override this
@@ -94,7 +95,8 @@ class ShootFromSnapshotsSimulation(PathSimulator):
         return obj
 
 
-    def run(self, n_per_snapshot, as_chain=False):
+    def run(self, n_per_snapshot, as_chain=False, n_workers=None,
+            seed=None):
         """Run the simulation.
 
         Parameters
@@ -107,54 +109,130 @@ class ShootFromSnapshotsSimulation(PathSimulator):
             input to the modifier is the previous (modified) snapshot.
             Useful for modifications that can't cover the whole range from a
             given snapshot.
+        n_workers : int or None
+            if larger than 1, the shots are run in a pool of this many
+            worker processes. Each worker builds its own copy of the
+            simulation (including the engine); the steps are still saved
+            by this process, in the same order as in a serial run. With
+            `as_chain`, all shots from one snapshot run in the same worker.
+        seed : int or None
+            if given, the random number generators are seeded separately
+            for every shot, so that the results are reproducible and do not
+            depend on `n_workers`
         """
         self.step = 0
-        snap_num = 0
         self.output_stream.write("\n")
-        for snapshot in self.initial_snapshots:
-            start_snap = snapshot
-            # do what we need to get the snapshot set up
-            for step in range(n_per_snapshot):
-                paths.tools.refresh_output(
-                    "Working on snapshot %d / %d; shot %d / %d\n" % (
-                        snap_num+1, len(self.initial_snapshots),
-                        step+1, n_per_snapshot
-                    ),
-                    output_stream=self.output_stream,
-                    refresh=self.allow_refresh
-                )
-
-                if as_chain:
-                    start_snap = self.randomizer(start_snap)
-                else:
-                    start_snap = self.randomizer(snapshot)
-
-                sample_set = paths.SampleSet([
-                    paths.Sample(replica=0,
-                                 trajectory=paths.Trajectory([start_snap]),
-                                 ensemble=self.starting_ensemble)
-                ])
-                sample_set.sanity_check()
-                new_pmc = self.mover.move(sample_set)
-                samples = new_pmc.results
-                new_sample_set = sample_set.apply_samples(samples)
-
-                mcstep = MCStep(
-                    simulation=self,
-                    mccycle=self.step,
-                    previous=sample_set,
-                    active=new_sample_set,
-                    change=new_pmc
-                )
-
-                if self.storage is not None:
-                    self.storage.steps.save(mcstep)
-                    if self.step % self.save_frequency == 0:
-                        self.sync_storage()
-
-                self.step += 1
-            snap_num += 1
+        if n_workers is not None and n_workers > 1:
+            results = self._iter_parallel_shots(n_per_snapshot, as_chain,
+                                                n_workers, seed)
+        else:
+            results = self._iter_serial_shots(n_per_snapshot, as_chain,
+                                              seed)
 
+        for snap_num, shot, sample_set, new_pmc in results:
+            paths.tools.refresh_output(
+                "Working on snapshot %d / %d; shot %d / %d\n" % (
+                    snap_num+1, len(self.initial_snapshots),
+                    shot+1, n_per_snapshot
+                ),
+                output_stream=self.output_stream,
+                refresh=self.allow_refresh
+            )
+
+            samples = new_pmc.results
+            new_sample_set = sample_set.apply_samples(samples)
+
+            mcstep = MCStep(
+                simulation=self,
+                mccycle=self.step,
+                previous=sample_set,
+                active=new_sample_set,
+                change=new_pmc
+            )
+
+            if self.storage is not None:
+                self.storage.save_in_background(mcstep)
+                if self.step % self.save_frequency == 0:
+                    self.sync_storage()
+
+            self.step += 1
+
+        self.sync_storage(block=True)
+
+    def _shoot_from_snapshot(self, snap_num, shots, as_chain, seed):
+        """Run the given shots from one of the initial snapshots.
+
+        Yields
+        ------
+        tuple
+            (snap_num, shot, initial :class:`.SampleSet`,
+            :class:`.MoveChange`) for each shot
+        """
+        snapshot = self.initial_snapshots[snap_num]
+        start_snap = snapshot
+        for shot in shots:
+            if seed is not None:
+                with seeded_random(seed, snap_num, shot):
+                    start_snap, sample_set, new_pmc = self._shoot(
+                        snapshot, start_snap, as_chain)
+            else:
+                start_snap, sample_set, new_pmc = self._shoot(
+                    snapshot, start_snap, as_chain)
+            yield snap_num, shot, sample_set, new_pmc
+
+    def _shoot(self, snapshot, start_snap, as_chain):
+        """Run a single shot.
+
+        Returns
+        -------
+        tuple
+            (modified snapshot, initial :class:`.SampleSet`,
+            :class:`.MoveChange`)
+        """
+        if as_chain:
+            start_snap = self.randomizer(start_snap)
+        else:
+            start_snap = self.randomizer(snapshot)
+
+        sample_set = paths.SampleSet([
+            paths.Sample(replica=0,
+                         trajectory=paths.Trajectory([start_snap]),
+                         ensemble=self.starting_ensemble)
+        ])
+        sample_set.sanity_check()
+        new_pmc = self.mover.move(sample_set)
+        return start_snap, sample_set, new_pmc
+
+    def _iter_serial_shots(self, n_per_snapshot, as_chain, seed):
+        for snap_num in range(len(self.initial_snapshots)):
+            for result in self._shoot_from_snapshot(
+                    snap_num, range(n_per_snapshot), as_chain, seed):
+                yield result
+
+    def _iter_parallel_shots(self, n_per_snapshot, as_chain, n_workers,
+                             seed):
+        if as_chain:
+            # a chain depends on the previous shot, so it stays together
+            tasks = [(snap_num, list(range(n_per_snapshot)), True, seed)
+                     for snap_num in range(len(self.initial_snapshots))]
+        else:
+            tasks = [(snap_num, [shot], False, seed)
+                     for snap_num in range(len(self.initial_snapshots))
+                     for shot in range(n_per_snapshot)]
+
+        with WorkerPool(self, n_workers) as pool:
+            for results in pool.imap(_run_shooting_task, tasks):
+                for result in results:
+                    yield result
+
+
+def _run_shooting_task(task):
+    """Run a list of shots inside a worker process"""
+    snap_num, shots, as_chain, seed = task
+    simulation = worker_setup()
+    results = list(simulation._shoot_from_snapshot(snap_num, shots,
+                                                   as_chain, seed))
+    return to_main_json(results)
 
 
 class CommittorSimulation(ShootFromSnapshotsSimulation):
@@ -3,13 +3,35 @@ import logging
 
 import numpy as np
 
-from openpathsampling.netcdfplus import StorableNamedObject
+from openpathsampling.netcdfplus import StorableNamedObject, LRUCache
 
 logger = logging.getLogger(__name__)
 init_log = logging.getLogger('openpathsampling.initialization')
 
 
 class ShootingPointSelector(StorableNamedObject):
+    """
+    Base class for the selection of shooting points
+
+    Subclasses define the unnormalized proposal probability of a frame with
+    :meth:`f`. Selectors that can compute it for all frames at once should
+    also override :meth:`_biases`, which returns a numpy array for a whole
+    trajectory. Picking uses the cumulative sum of these biases, which is
+    kept for the last few trajectories, so that the acceptance of a
+    shooting move does not evaluate the biases of the old trajectory again.
+    Setting a public attribute (a parameter of :meth:`f`) clears the kept
+    biases.
+    """
+
+    # number of trajectories for which the cumulative biases are kept
+    bias_cache_size = 4
+
+    def __setattr__(self, key, value):
+        # the biases depend on the parameters of the selector
+        if not key.startswith('_'):
+            self.__dict__.pop('_bias_cache', None)
+        super(ShootingPointSelector, self).__setattr__(key, value)
+
     def f(self, snapshot, trajectory):
         """
         Returns the unnormalized proposal probability of a snapshot
@@ -35,10 +57,36 @@ class ShootingPointSelector(StorableNamedObject):
 
     def _biases(self, trajectory):
         """
-        Returns a list of unnormalized proposal probabilities for all
+        Returns a numpy array of unnormalized proposal probabilities for all
         snapshots in trajectory
         """
-        return [self.f(s, trajectory) for s in trajectory]
+        return np.array([self.f(s, trajectory) for s in trajectory],
+                        dtype=float)
+
+    def _cumulative_biases(self, trajectory):
+        """
+        Returns the cumulative sum of the biases of all snapshots in
+        trajectory
+
+        The result is cached by the UUID and the length of the trajectory.
+        """
+        uuid = getattr(trajectory, '__uuid__', None)
+        if uuid is None:
+            return np.cumsum(self._biases(trajectory))
+
+        try:
+            cache = self._bias_cache
+        except AttributeError:
+            cache = LRUCache(self.bias_cache_size)
+            self._bias_cache = cache
+
+        key = (uuid, len(trajectory))
+        try:
+            return cache[key]
+        except KeyError:
+            cumulative = np.cumsum(self._biases(trajectory))
+            cache[key] = cumulative
+            return cumulative
 
     def sum_bias(self, trajectory):
         """
@@ -55,8 +103,10 @@ class ShootingPointSelector(StorableNamedObject):
         only for the non-symmetric proposal of different snapshots is given
         by `probability(old_trajectory) / probability(new_trajectory)`
         """
-
-        return sum(self._biases(trajectory))
+        cumulative = self._cumulative_biases(trajectory)
+        if len(cumulative) == 0:
+            return 0.0
+        return float(cumulative[-1])
 
     def pick(self, trajectory):
         """
@@ -64,21 +114,13 @@ class ShootingPointSelector(StorableNamedObject):
 
         Notes
         -----
-        The native implementation is very slow. Simple picking algorithm
+        This evaluates the biases of all frames. Simple picking algorithms
         should override this function.
         """
-
-        prob_list = self._biases(trajectory)
-        sum_bias = sum(prob_list)
-
-        rand = np.random.random() * sum_bias
-        idx = 0
-        prob = prob_list[0]
-        while prob <= rand and idx < len(prob_list):
-            idx += 1
-            prob += prob_list[idx]
-
-        return idx
+        cumulative = self._cumulative_biases(trajectory)
+        rand = np.random.random() * cumulative[-1]
+        idx = int(np.searchsorted(cumulative, rand, side='right'))
+        return min(idx, len(cumulative) - 1)
 
 
 class GaussianBiasSelector(ShootingPointSelector):
@@ -119,6 +161,10 @@ class GaussianBiasSelector(ShootingPointSelector):
         l_s = self.collectivevariable(snapshot)
         return math.exp(-self.alpha * (l_s - self.l_0) ** 2)
 
+    def _biases(self, trajectory):
+        l_s = np.asarray(self.collectivevariable(trajectory), dtype=float)
+        return np.exp(-self.alpha * (l_s - self.l_0) ** 2)
+
 
 class UniformSelector(ShootingPointSelector):
     """
@@ -6,5 +6,7 @@ from .stores import (
     SnapshotWrapperStore)
 
 from .storage import Storage, AnalysisStorage
+from .arrays import AnalysisArrays
+from .step_index import StepIndex
 
 from .util import join_md_storage, split_md_storage
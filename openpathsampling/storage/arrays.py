@@ -0,0 +1,122 @@
+import numpy as np
+
+from openpathsampling.netcdfplus import LazyArray
+
+
+def _array_property(store_name, var_name, doc):
+    def fget(self):
+        return LazyArray.from_store(getattr(self.storage, store_name),
+                                    var_name)
+
+    return property(fget, doc=doc)
+
+
+class AnalysisArrays(object):
+    """
+    Index tables of a storage as lazily read numpy arrays
+
+    All arrays are read from the file on demand and contain integer indices
+    into the respective stores instead of objects, so analysis can be done
+    on arrays and objects only need to be loaded for the few entries that
+    are actually of interest, e.g. ``storage.samples[idx]``.
+
+    Parameters
+    ----------
+    storage : :class:`openpathsampling.storage.Storage`
+        the storage to read from
+
+    Examples
+    --------
+    >>> arrays = storage.arrays
+    >>> replica_0 = arrays.sample_replica[:] == 0
+    >>> trajectories = arrays.sample_trajectory[replica_0]
+    >>> snapshots = arrays.trajectory_snapshots[trajectories[-1]]
+    >>> values = arrays.cv_values(cv, snapshots)
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    trajectory_snapshots = _array_property(
+        'trajectories', 'snapshots',
+        """LazyArray : the snapshot indices of each trajectory""")
+
+    sample_trajectory = _array_property(
+        'samples', 'trajectory',
+        """LazyArray : the trajectory index of each sample""")
+
+    sample_ensemble = _array_property(
+        'samples', 'ensemble',
+        """LazyArray : the ensemble index of each sample""")
+
+    sample_replica = _array_property(
+        'samples', 'replica',
+        """LazyArray : the replica of each sample""")
+
+    sample_bias = _array_property(
+        'samples', 'bias',
+        """LazyArray : the bias of each sample""")
+
+    sample_parent = _array_property(
+        'samples', 'parent',
+        """LazyArray : the index of the parent of each sample""")
+
+    sampleset_samples = _array_property(
+        'samplesets', 'samples',
+        """LazyArray : the sample indices of each sample set""")
+
+    step_mccycle = _array_property(
+        'steps', 'mccycle',
+        """LazyArray : the Monte Carlo cycle of each step""")
+
+    step_active = _array_property(
+        'steps', 'active',
+        """LazyArray : the index of the active sample set of each step""")
+
+    step_previous = _array_property(
+        'steps', 'previous',
+        """LazyArray : the index of the previous sample set of each step""")
+
+    step_change = _array_property(
+        'steps', 'change',
+        """LazyArray : the index of the move change of each step""")
+
+    def cv_values(self, cv, snapshot_indices):
+        """
+        Read the stored values of a CV for many snapshots
+
+        Parameters
+        ----------
+        cv : :class:`openpathsampling.CollectiveVariable`
+            a CV with a store in this storage
+        snapshot_indices : iterable of int
+            the indices of the snapshots in `storage.snapshots`, e.g. a
+            row of :attr:`trajectory_snapshots`
+
+        Returns
+        -------
+        numpy.ndarray
+            the values in the order of `snapshot_indices`
+
+        Raises
+        ------
+        KeyError
+            if the CV is not stored or there is no value for one of the
+            snapshots
+        """
+        cv_store = self.storage.snapshots.attribute_list[cv]
+        positions = np.asarray(list(snapshot_indices), dtype=np.int64)
+        if cv_store.time_reversible:
+            positions //= 2
+
+        if cv_store.allow_incomplete:
+            rows = np.array([cv_store.index.get(pos, -1)
+                             for pos in positions.tolist()], dtype=np.int64)
+        else:
+            rows = np.where(positions < len(cv_store), positions, -1)
+
+        if np.any(rows < 0):
+            raise KeyError('%s has no stored value for some snapshots' %
+                           cv.name)
+
+        return cv_store.vars['value'].read_rows(rows)
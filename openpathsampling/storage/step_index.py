@@ -0,0 +1,420 @@
+import logging
+import os
+
+import numpy as np
+
+import openpathsampling as paths
+from openpathsampling.movechange import (
+    MoveChange, EmptyMoveChange, SampleMoveChange, AcceptedSampleMoveChange,
+    SequentialMoveChange, PartialAcceptanceSequentialMoveChange,
+    ConditionalSequentialMoveChange, SubMoveChange, KeepLastSampleMoveChange
+)
+from openpathsampling.netcdfplus import LazyArray, NetCDFPlus
+
+logger = logging.getLogger(__name__)
+
+
+def _no_results(flags, subchanges, n_samples):
+    return False
+
+
+def _own_samples(flags, subchanges, n_samples):
+    return n_samples > 0
+
+
+def _any_subchange(flags, subchanges, n_samples):
+    return any(flags[sub] for sub in subchanges)
+
+
+def _first_subchange(flags, subchanges, n_samples):
+    return len(subchanges) > 0 and flags[subchanges[0]]
+
+
+def _all_subchanges(flags, subchanges, n_samples):
+    return len(subchanges) > 0 and all(flags[sub] for sub in subchanges)
+
+
+def _single_subchange(flags, subchanges, n_samples):
+    return len(subchanges) == 1 and flags[subchanges[0]]
+
+
+# `MoveChange.accepted` is `len(change.results) > 0`. For the common
+# implementations of `_get_results` this only depends on the acceptance of
+# the subchanges and the number of samples, so it can be decided without
+# loading the changes. All other changes are loaded.
+_acceptance_rules = {
+    MoveChange._get_results: _no_results,
+    EmptyMoveChange._get_results: _no_results,
+    SampleMoveChange._get_results: _no_results,
+    AcceptedSampleMoveChange._get_results: _own_samples,
+    SequentialMoveChange._get_results: _any_subchange,
+    PartialAcceptanceSequentialMoveChange._get_results: _first_subchange,
+    ConditionalSequentialMoveChange._get_results: _all_subchanges,
+    SubMoveChange._get_results: _single_subchange,
+    KeepLastSampleMoveChange._get_results: _single_subchange,
+}
+
+
+class StepIndex(object):
+    """
+    Flat tables of the steps of a storage for fast analysis
+
+    The tables are built from the index variables of the file, without
+    loading the steps, sample sets or move change trees. They contain
+    store indices; the objects can be loaded from the storage when needed,
+    e.g. ``storage.trajectories[idx]``.
+
+    Several analysis tools accept a StepIndex instead of a list of steps,
+    e.g. :func:`.steps_to_weighted_trajectories`,
+    :class:`.MoveAcceptanceAnalysis`, :class:`.ReplicaNetwork` and
+    :class:`.ChannelAnalysis`. It assumes that each sample set has at most
+    one sample per ensemble and per replica, which is true for sample sets
+    generated by path sampling.
+
+    Slicing a StepIndex gives a StepIndex for the selected steps; an integer
+    index loads the :class:`.MCStep`.
+
+    Attributes
+    ----------
+    storage : :class:`openpathsampling.storage.Storage`
+        the storage the indices refer to
+    steps : numpy.ndarray, shape=(n_steps,)
+        the index of each step in `storage.steps`
+    mccycle : numpy.ndarray, shape=(n_steps,)
+        the Monte Carlo cycle of each step
+    change : numpy.ndarray, shape=(n_steps,)
+        the index of the move change of each step
+    active : numpy.ndarray, shape=(n_steps,)
+        the index of the active sample set of each step
+    accepted : numpy.ndarray, shape=(n_steps,)
+        True if the move of the step was accepted
+    canonical_mover : numpy.ndarray, shape=(n_steps,)
+        the index of the mover of the canonical move change of each step
+        (see :attr:`.MoveChange.canonical`), -1 for None
+    ensembles : numpy.ndarray, shape=(n_ensembles,)
+        the index of the ensemble of each column in the ensemble tables
+    ensemble_sample : numpy.ndarray, shape=(n_steps, n_ensembles)
+        the index of the active sample in each ensemble, -1 if there is none
+    ensemble_trajectory : numpy.ndarray, shape=(n_steps, n_ensembles)
+        the index of the active trajectory in each ensemble
+    ensemble_replica : numpy.ndarray, shape=(n_steps, n_ensembles)
+        the replica of the active sample in each ensemble
+    replicas : numpy.ndarray, shape=(n_replicas,)
+        the replica of each column in the replica tables
+    replica_ensemble : numpy.ndarray, shape=(n_steps, n_replicas)
+        the index of the ensemble of each replica, -1 if there is none
+    replica_trajectory : numpy.ndarray, shape=(n_steps, n_replicas)
+        the index of the trajectory of each replica
+    change_mover : numpy.ndarray, shape=(n_changes,)
+        the index of the mover of each move change, -1 for None
+    change_accepted : numpy.ndarray, shape=(n_changes,)
+        True if the move change was accepted
+    change_subchanges : list of numpy.ndarray
+        the indices of the subchanges of each move change
+    """
+
+    _step_tables = [
+        'steps', 'mccycle', 'change', 'active', 'accepted',
+        'canonical_mover', 'ensemble_sample', 'ensemble_trajectory',
+        'ensemble_replica', 'replica_ensemble', 'replica_trajectory'
+    ]
+
+    _other_tables = [
+        'ensembles', 'replicas', 'change_mover', 'change_accepted'
+    ]
+
+    def __init__(self, storage, tables):
+        self.storage = storage
+        for name in self._step_tables + self._other_tables:
+            setattr(self, name, tables[name])
+        self.change_subchanges = tables['change_subchanges']
+        self._keys = {}
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            tables = self._tables()
+            for name in self._step_tables:
+                tables[name] = tables[name][item]
+            return StepIndex(self.storage, tables)
+        else:
+            return self.storage.steps[int(self.steps[item])]
+
+    def _tables(self):
+        tables = {name: getattr(self, name)
+                  for name in self._step_tables + self._other_tables}
+        tables['change_subchanges'] = self.change_subchanges
+        return tables
+
+    @staticmethod
+    def cache_filename(storage):
+        """
+        The name of the file that :meth:`from_storage` caches the tables in
+
+        Parameters
+        ----------
+        storage : :class:`openpathsampling.storage.Storage`
+
+        Returns
+        -------
+        str
+        """
+        return storage.filename + '.steps.npz'
+
+    @classmethod
+    def from_storage(cls, storage, cache=False):
+        """
+        Build the tables for all steps in a storage
+
+        Parameters
+        ----------
+        storage : :class:`openpathsampling.storage.Storage`
+            the storage
+        cache : bool
+            if True, the tables are saved next to the storage file (see
+            :meth:`cache_filename`) and loaded from there next time, as long
+            as the steps in the storage have not changed. Default is False.
+
+        Returns
+        -------
+        :class:`StepIndex`
+        """
+        filename = cls.cache_filename(storage)
+        signature = cls._signature(storage)
+        if cache and os.path.isfile(filename):
+            with np.load(filename) as data:
+                if np.array_equal(data['signature'], signature):
+                    return cls(storage, cls._unpack(data))
+
+        index = cls(storage, cls._build(storage))
+
+        if cache:
+            try:
+                with open(filename, 'wb') as cache_file:
+                    np.savez(cache_file, signature=signature, **index._pack())
+            except IOError as error:
+                logger.warning('Could not cache step index: %s', error)
+
+        return index
+
+    @staticmethod
+    def _signature(storage):
+        # identifies the steps in a file by their number and the uuids of the
+        # first and last step, so a rewritten file is not mistaken for the
+        # cached one
+        uuids = storage.steps.variables['uuid']
+        ends = [uuids[0], uuids[-1]] if len(uuids) > 0 else []
+        return np.array([str(len(storage.steps)),
+                         str(len(storage.movechanges))] + list(ends))
+
+    def _pack(self):
+        tables = self._tables()
+        subchanges = tables.pop('change_subchanges')
+        lengths = [len(sub) for sub in subchanges]
+        tables['change_subchanges_offsets'] = np.cumsum([0] + lengths)
+        tables['change_subchanges_flat'] = np.concatenate(
+            [np.zeros(0, dtype=np.int64)] + list(subchanges))
+        return tables
+
+    @classmethod
+    def _unpack(cls, data):
+        tables = {name: data[name]
+                  for name in cls._step_tables + cls._other_tables}
+        offsets = data['change_subchanges_offsets']
+        flat = data['change_subchanges_flat']
+        tables['change_subchanges'] = [
+            flat[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)
+        ]
+        return tables
+
+    @staticmethod
+    def _build(storage):
+        arrays = storage.arrays
+        tables = {
+            'steps': np.arange(len(storage.steps)),
+            'mccycle': arrays.step_mccycle[:],
+            'change': arrays.step_change[:],
+            'active': arrays.step_active[:]
+        }
+
+        # move changes
+        changes = storage.movechanges
+        mover = LazyArray.from_store(changes, 'mover')[:]
+        subchanges = LazyArray.from_store(changes, 'subchanges')[:]
+        n_samples = [len(NetCDFPlus.to_uuid_chunks(value))
+                     for value in changes.variables['samples'][:]]
+        rules = [
+            _acceptance_rules.get(changes.class_list[name]._get_results)
+            for name in changes.variables['cls'][:]
+        ]
+
+        accepted = {}
+
+        def is_accepted(idx):
+            if idx not in accepted:
+                rule = rules[idx]
+                if rule is None:
+                    accepted[idx] = changes[idx].accepted
+                else:
+                    for sub in subchanges[idx]:
+                        is_accepted(sub)
+                    accepted[idx] = rule(accepted, subchanges[idx],
+                                         n_samples[idx])
+            return accepted[idx]
+
+        tables['change_mover'] = mover
+        tables['change_accepted'] = np.array(
+            [is_accepted(idx) for idx in range(len(mover))], dtype=bool)
+        tables['change_subchanges'] = subchanges
+
+        # the canonical mover (see MoveChange.canonical)
+        is_canonical = {
+            idx: storage.pathmovers[int(idx)].is_canonical is True
+            for idx in np.unique(mover) if idx >= 0
+        }
+
+        def canonical(idx):
+            while len(subchanges[idx]) == 1:
+                if mover[idx] >= 0 and is_canonical[mover[idx]]:
+                    break
+                idx = subchanges[idx][0]
+            return mover[idx]
+
+        tables['accepted'] = tables['change_accepted'][tables['change']]
+        tables['canonical_mover'] = np.array(
+            [canonical(idx) for idx in tables['change']], dtype=np.int64)
+
+        # active samples by ensemble and by replica
+        sample_ensemble = arrays.sample_ensemble[:]
+        sample_replica = arrays.sample_replica[:]
+        sample_trajectory = arrays.sample_trajectory[:]
+        sets, set_rows = np.unique(tables['active'], return_inverse=True)
+        samples = [arrays.sampleset_samples[int(idx)] for idx in sets]
+        used = np.concatenate([np.zeros(0, dtype=np.int64)] + samples)
+        ensembles = np.unique(sample_ensemble[used])
+        replicas = np.unique(sample_replica[used])
+
+        by_ensemble = np.full((len(sets), len(ensembles)), -1, np.int64)
+        by_replica = np.full((len(sets), len(replicas)), -1, np.int64)
+        for row, set_samples in enumerate(samples):
+            by_ensemble[row, np.searchsorted(
+                ensembles, sample_ensemble[set_samples])] = set_samples
+            by_replica[row, np.searchsorted(
+                replicas, sample_replica[set_samples])] = set_samples
+
+        def lookup(table, samples):
+            return np.where(samples >= 0, table[samples], -1)
+
+        step_ensemble = by_ensemble[set_rows]
+        step_replica = by_replica[set_rows]
+        tables.update({
+            'ensembles': ensembles,
+            'replicas': replicas,
+            'ensemble_sample': step_ensemble,
+            'ensemble_trajectory': lookup(sample_trajectory, step_ensemble),
+            'ensemble_replica': lookup(sample_replica, step_ensemble),
+            'replica_ensemble': lookup(sample_ensemble, step_replica),
+            'replica_trajectory': lookup(sample_trajectory, step_replica)
+        })
+        return tables
+
+    def ensemble_column(self, ensemble):
+        """
+        The column of an ensemble in the ensemble tables
+
+        Parameters
+        ----------
+        ensemble : :class:`.Ensemble`
+
+        Returns
+        -------
+        int
+
+        Raises
+        ------
+        KeyError
+            if the ensemble has never been active
+        """
+        idx = self.storage.ensembles.index[ensemble.__uuid__]
+        column = np.searchsorted(self.ensembles, idx)
+        if column == len(self.ensembles) or self.ensembles[column] != idx:
+            raise KeyError(ensemble)
+        return int(column)
+
+    def replica_column(self, replica):
+        """
+        The column of a replica in the replica tables
+
+        Parameters
+        ----------
+        replica : int
+
+        Returns
+        -------
+        int
+
+        Raises
+        ------
+        KeyError
+            if the replica has never been active
+        """
+        column = np.searchsorted(self.replicas, replica)
+        if column == len(self.replicas) or self.replicas[column] != replica:
+            raise KeyError(replica)
+        return int(column)
+
+    def change_keys(self, change):
+        """
+        All move changes in the tree of a move change with their keys
+
+        The keys are the same as ``str(root.key(change))`` for the loaded
+        :class:`.MoveChange` objects.
+
+        Parameters
+        ----------
+        change : int
+            the index of the root move change
+
+        Returns
+        -------
+        list of (int, str)
+            the index and key of each move change in pre-order
+        """
+        changes = []
+        shape = self._tree_shape(change, changes)
+        if shape not in self._keys:
+            keylist = self._keylist(shape)
+            movers = self.storage.pathmovers
+            self._keys[shape] = [
+                str(self._map_key(key, lambda idx: movers[int(idx)]
+                                  if idx >= 0 else None))
+                for key, _ in keylist
+            ]
+        return list(zip(changes, self._keys[shape]))
+
+    def _tree_shape(self, change, changes):
+        changes.append(change)
+        return (int(self.change_mover[change]),) + tuple(
+            self._tree_shape(sub, changes)
+            for sub in self.change_subchanges[change]
+        )
+
+    @classmethod
+    def _keylist(cls, shape):
+        # same as TreeMixin.keylist, on nested tuples of mover indices
+        path = [shape[0]]
+        result = [(path, shape)]
+        mp = []
+        for sub in shape[1:]:
+            subtree = cls._keylist(sub)
+            result.extend([(path + mp + [m[0]], m[1]) for m in subtree])
+            mp.extend([subtree[-1][0]])
+        return result
+
+    @classmethod
+    def _map_key(cls, key, fnc):
+        if isinstance(key, list):
+            return [cls._map_key(part, fnc) for part in key]
+        return fnc(key)
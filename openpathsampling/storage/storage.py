@@ -4,19 +4,24 @@ Created on 06.07.2014
 @author: JDC Chodera, JH Prinz
 """
 
+import json
 import logging
 import time
 
 import openpathsampling as paths
 from openpathsampling.netcdfplus import NetCDFPlus, WeakLRUCache, ObjectStore, \
-    ImmutableDictStore, NamedObjectStore, PseudoAttributeStore
+    ImmutableDictStore, NamedObjectStore, PseudoAttributeStore, ByteLRUCache, \
+    CountingCache
 
 from .stores import SnapshotWrapperStore
+from .arrays import AnalysisArrays
+from .step_index import StepIndex
 
 import openpathsampling.engines as peng
 
 logger = logging.getLogger(__name__)
 init_log = logging.getLogger('openpathsampling.initialization')
+stats_logger = logging.getLogger('openpathsampling.storage.stats')
 
 
 # ==============================================================================
@@ -41,6 +46,10 @@ class Storage(NetCDFPlus):
     template : :class:`openpathsampling.Snapshot`
         a Snapshot instance that contains a reference to a Topology, the
         number of atoms and used units
+    codec : str, default: None
+        the codec used to serialize objects, `json` or the smaller and
+        faster binary `msgpack` (requires the msgpack package). None uses
+        the codec of an existing file and `json` for new files.
     """
 
     @property
@@ -55,13 +64,16 @@ class Storage(NetCDFPlus):
             filename,
             mode=None,
             template=None,
-            fallback=None):
+            fallback=None,
+            codec=None):
 
         self._template = template
+        self._last_stats = None
         super(Storage, self).__init__(
             filename,
             mode,
-            fallback=fallback)
+            fallback=fallback,
+            codec=codec)
 
     def _create_simplifier(self):
         super(Storage, self)._create_simplifier()
@@ -121,6 +133,30 @@ class Storage(NetCDFPlus):
     def tags(self):
         return self.tag
 
+    @property
+    def arrays(self):
+        """
+        :class:`openpathsampling.storage.AnalysisArrays` : the index
+        tables of the file as lazily read arrays
+        """
+        return AnalysisArrays(self)
+
+    def step_index(self, cache=False):
+        """
+        Flat tables of all steps for analysis without loading the steps
+
+        Parameters
+        ----------
+        cache : bool
+            if True, the tables are cached in a file next to the storage
+            (see :meth:`.StepIndex.cache_filename`). Default is False.
+
+        Returns
+        -------
+        :class:`openpathsampling.storage.StepIndex`
+        """
+        return StepIndex.from_storage(self, cache=cache)
+
     def write_meta(self):
         self.setncattr('storage_format', 'openpathsampling')
         self.setncattr('storage_version', paths.version.version)
@@ -149,15 +185,26 @@ class Storage(NetCDFPlus):
         else:
             self.cvs = self.attributes
 
-    def sync_all(self):
+    def sync_all(self, block=True):
         """
         Convenience function to use ``self.cvs`` and ``self`` at once.
 
         Under most circumstances, you want to sync ``self.cvs`` and ``self`` at
         the same time. This just makes it easier to do that.
+
+        Parameters
+        ----------
+        block : bool
+            if False and a background writer is running (see
+            :meth:`.start_background_writer`), writing the file to disk is
+            left to the writer and this returns right away
         """
-        self.cvs.sync_all()
-        self.sync()
+        with self.io_lock:
+            self.cvs.sync_all()
+        if block:
+            self.sync()
+        else:
+            self.sync_in_background()
 
     def set_caching_mode(self, mode='default'):
         r"""
@@ -196,6 +243,178 @@ class Storage(NetCDFPlus):
                 store = getattr(self, store_name)
                 store.set_caching(caching)
 
+    # relative shares of the memory budget in `set_cache_budget`
+    cache_budget_shares = {
+        'snapshots': 2,
+        'statics': 4,
+        'kinetics': 4,
+        'trajectories': 1,
+        'samples': 1,
+        'samplesets': 1,
+        'movechanges': 1,
+        'details': 1,
+        'steps': 1
+    }
+
+    def set_cache_budget(self, max_bytes, mode='default', shares=None):
+        """
+        Limit the caches of the large stores by their memory
+
+        All stores are set to the cache sizes of a caching mode first. Then
+        the caches of the stores with a share are replaced by
+        :class:`openpathsampling.netcdfplus.ByteLRUCache` objects that split
+        the memory budget. Their hits, misses and evictions can be checked
+        with :meth:`cache_stats`.
+
+        Parameters
+        ----------
+        max_bytes : int
+            the approximate total memory in bytes for all stores with a share
+        mode : str
+            the caching mode for all other stores, see
+            :meth:`set_caching_mode`
+        shares : dict of str: float or None
+            the relative share of the budget for each store name. If `None`
+            (default) :attr:`cache_budget_shares` is used
+        """
+        self.set_caching_mode(mode)
+
+        if shares is None:
+            shares = self.cache_budget_shares
+
+        shares = {store_name: share for store_name, share in shares.items()
+                  if hasattr(self, store_name)}
+        total = float(sum(shares.values()))
+        for store_name, share in shares.items():
+            store = getattr(self, store_name)
+            store.set_caching(ByteLRUCache(int(max_bytes * share / total)))
+
+    def cache_stats(self):
+        """
+        The statistics of all caches that count them
+
+        Returns
+        -------
+        dict of str: :class:`openpathsampling.netcdfplus.CacheStats`
+            the statistics for each store name
+        """
+        caches = {}
+        for store in self.objects.values():
+            cache = store.cache
+            if isinstance(cache, CountingCache):
+                cache = cache.cache
+            if hasattr(cache, 'stats'):
+                caches[store.name] = cache.stats
+
+        return caches
+
+    def enable_stats(self):
+        """
+        Count cache hits, loads from disk, CV evaluations and their time
+
+        All stores count the hits and misses of their cache and the time to
+        load objects (see :meth:`ObjectStore.enable_stats`). All CVs in
+        the storage count the values found in memory, loaded from disk and
+        evaluated (see :meth:`PseudoAttribute.enable_stats`). CVs added
+        later need to be enabled separately.
+
+        The counts are reported by :meth:`stats` and :meth:`stats_report`
+        and logged after each MC step (see :meth:`log_stats`).
+        """
+        for store in self.objects.values():
+            store.enable_stats()
+        for cv in self.cvs:
+            cv.enable_stats()
+        self._last_stats = self.stats()
+
+    def disable_stats(self):
+        """
+        Stop counting and remove the statistics of stores and CVs
+        """
+        for store in self.objects.values():
+            store.disable_stats()
+        for cv in self.cvs:
+            cv.disable_stats()
+        self._last_stats = None
+
+    def stats(self):
+        """
+        The current counts of all stores and CVs with enabled statistics
+
+        Returns
+        -------
+        dict
+            `stores` contains a dict of counts (hits, misses, evictions and
+            time) for each store name and `cvs` a dict with the counts of
+            the `cache`, `disk` and `eval` layers for each CV name
+        """
+        return {
+            'stores': {
+                store.name: store.stats.to_dict()
+                for store in self.objects.values()
+                if store.stats is not None
+            },
+            'cvs': {
+                cv.name: {layer: stats.to_dict()
+                          for layer, stats in cv.chain_stats.items()}
+                for cv in self.cvs
+                if cv.chain_stats is not None
+            }
+        }
+
+    def stats_report(self):
+        """
+        A table of the counts of all stores and CVs
+
+        Returns
+        -------
+        str
+            the report
+        """
+        stats = self.stats()
+        lines = ['%-24s %10s %10s %9s %10s' % (
+            'store', 'hits', 'misses', 'hit rate', 'load [s]')]
+        for name, counts in sorted(stats['stores'].items()):
+            requests = counts['hits'] + counts['misses']
+            if requests == 0:
+                continue
+            lines.append('%-24s %10d %10d %8.1f%% %10.3f' % (
+                name, counts['hits'], counts['misses'],
+                100.0 * counts['hits'] / requests, counts['time']))
+
+        lines.append('')
+        lines.append('%-24s %10s %10s %10s %10s' % (
+            'cv', 'memory', 'disk', 'evaluated', 'eval [s]'))
+        for name, layers in sorted(stats['cvs'].items()):
+            lines.append('%-24s %10d %10d %10d %10.3f' % (
+                name, layers['cache']['hits'], layers['disk']['hits'],
+                layers['eval']['hits'], layers['eval']['time']))
+
+        return '\n'.join(lines)
+
+    def log_stats(self, mccycle=None):
+        """
+        Log the counts since the last call, if statistics are enabled
+
+        The counts are logged as JSON to the `openpathsampling.storage.stats`
+        logger at level INFO and are also passed as `stats` in the `extra`
+        of the log record.
+
+        Parameters
+        ----------
+        mccycle : int or None
+            the MC cycle to be included in the record
+        """
+        if self._last_stats is None:
+            return
+
+        current = self.stats()
+        delta = _stats_difference(current, self._last_stats)
+        delta['mccycle'] = mccycle
+        self._last_stats = current
+        stats_logger.info(json.dumps(delta, sort_keys=True),
+                          extra={'stats': delta})
+
     def check_version(self):
         super(Storage, self).check_version()
         try:
@@ -468,13 +687,25 @@ class Storage(NetCDFPlus):
         }
 
 
+def _stats_difference(current, last):
+    # difference of nested dicts of counts, missing entries count as zero
+    if isinstance(current, dict):
+        last = last or {}
+        return {
+            key: _stats_difference(value, last.get(key))
+            for key, value in current.items()
+        }
+    else:
+        return current - (last or 0)
+
+
 class AnalysisStorage(Storage):
     """
     Open a storage in read-only and do caching useful for analysis.
 
     """
 
-    def __init__(self, filename, caching_mode='analysis'):
+    def __init__(self, filename, caching_mode='analysis', lazy=False):
         """
         Open a storage in read-only and do caching useful for analysis.
 
@@ -488,6 +719,10 @@ class AnalysisStorage(Storage):
             size system and lots of memory you might want to try `unlimited`
             which will not load all objects but keep every object you load.
             This is fastest but might crash for large storages.
+        lazy : bool
+            if True, nothing is loaded in advance. Use :attr:`arrays` to
+            analyse the index tables of the file and load only the objects
+            you need. This is meant for files too large to be cached.
 
         """
         super(AnalysisStorage, self).__init__(
@@ -498,7 +733,8 @@ class AnalysisStorage(Storage):
         self.set_caching_mode(caching_mode)
 
         # Let's go caching
-        AnalysisStorage.cache_for_analysis(self)
+        if not lazy:
+            AnalysisStorage.cache_for_analysis(self)
 
     @staticmethod
     def cache_for_analysis(storage):
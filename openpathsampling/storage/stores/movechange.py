@@ -2,6 +2,7 @@ from openpathsampling.movechange import MoveChange
 from openpathsampling.netcdfplus import StorableObject, ObjectStore
 
 from uuid import UUID
+from openpathsampling.netcdfplus.writer import io_locked
 
 
 class MoveChangeStore(ObjectStore):
@@ -62,6 +63,7 @@ class MoveChangeStore(ObjectStore):
                              dimensions='...',
                              chunksizes=(10240,))
 
+    @io_locked
     def cache_all(self):
         """Load all samples as fast as possible into the cache
 
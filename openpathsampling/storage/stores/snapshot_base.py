@@ -4,6 +4,7 @@ from uuid import UUID
 
 import openpathsampling.engines as peng
 from openpathsampling.netcdfplus import IndexedObjectStore
+from openpathsampling.netcdfplus.writer import io_locked
 
 logger = logging.getLogger(__name__)
 init_log = logging.getLogger('openpathsampling.initialization')
@@ -79,6 +80,7 @@ class BaseSnapshotStore(IndexedObjectStore):
             'descriptor': self.descriptor,
         }
 
+    @io_locked
     def load(self, idx):
         pos = idx // 2
 
@@ -121,6 +123,7 @@ class BaseSnapshotStore(IndexedObjectStore):
         self._get(st_idx, obj)
         return obj
 
+    @io_locked
     def save(self, obj, idx=None):
         pos = idx // 2
 
@@ -209,5 +212,7 @@ class BaseSnapshotStore(IndexedObjectStore):
         except KeyError:
             return None
 
+    @io_locked
     def __len__(self):
+        self.storage.flush_buffers()
         return len(self.storage.dimensions[self.prefix]) * 2
@@ -1,4 +1,5 @@
 import logging
+from uuid import UUID
 
 from .snapshot_base import BaseSnapshotStore
 
@@ -29,6 +30,84 @@ class FeatureSnapshotStore(BaseSnapshotStore):
         [setattr(snapshot, attr, self.vars[attr][idx])
          for attr in self.storables]
 
+    def feature_block_variable(self, feature):
+        """
+        Find the numeric variable that holds a feature
+
+        Parameters
+        ----------
+        feature : str
+            the name of the feature. It is either stored in this store
+            directly or in a container object referenced by one of its
+            storables (like `coordinates` in `statics`)
+
+        Returns
+        -------
+        str or None
+            the name of the storable that references the container or None
+            if the feature is stored directly
+        :class:`openpathsampling.netcdfplus.ObjectStore`
+            the store that has the variable
+
+        Raises
+        ------
+        KeyError
+            if there is no numeric variable for the feature
+        """
+        if feature in self.storables:
+            candidates = [(None, self)]
+        else:
+            candidates = []
+            for attr in self.storables:
+                var_type = getattr(self.variables[attr], 'var_type', '')
+                if var_type.startswith('lazyobj.'):
+                    store = self.storage._stores[var_type.split('.')[1]]
+                    candidates.append((attr, store))
+
+        for attr, store in candidates:
+            if feature in store.variables:
+                var_type = getattr(store.variables[feature], 'var_type', '')
+                if var_type.startswith('numpy.') \
+                        or var_type in ['int', 'float', 'bool']:
+                    return attr, store
+
+        raise KeyError(feature)
+
+    def load_feature_block(self, feature, positions):
+        """
+        Load the values of a feature for several snapshots at once
+
+        Parameters
+        ----------
+        feature : str
+            the name of the feature, see :meth:`feature_block_variable`
+        positions : iterable of int
+            the positions (index // 2) of the snapshots
+
+        Returns
+        -------
+        numpy.ndarray
+            the raw values, one row per position
+        callable
+            the function that turns raw values into feature values (adds
+            units, if the feature has any)
+
+        Raises
+        ------
+        KeyError
+            if the feature is not stored or a snapshot is not in the store
+        """
+        attr, store = self.feature_block_variable(feature)
+        rows = [self.index[pos] for pos in positions]
+        if attr is not None:
+            uuids = self.vars[attr].read_rows(rows)
+            if any(uuid[0] == '-' for uuid in uuids):
+                raise KeyError(feature)
+            rows = [store.index[int(UUID(uuid))] for uuid in uuids]
+
+        var = store.vars[feature]
+        return var.read_rows(rows), var.getter
+
     def initialize(self):
         super(FeatureSnapshotStore, self).initialize()
 
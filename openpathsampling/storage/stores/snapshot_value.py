@@ -2,6 +2,7 @@ import logging
 
 import openpathsampling.engines as peng
 from openpathsampling.netcdfplus import ValueStore
+from openpathsampling.netcdfplus.writer import io_locked
 
 logger = logging.getLogger(__name__)
 init_log = logging.getLogger('openpathsampling.initialization')
@@ -33,6 +34,7 @@ class SnapshotValueStore(ValueStore):
             'chunksize': self.chunksize
         }
 
+    @io_locked
     def __len__(self):
         return len(self.variables['value'])
 
@@ -40,6 +42,7 @@ class SnapshotValueStore(ValueStore):
     # LOAD/SAVE DECORATORS FOR CACHE HANDLING
     # ==========================================================================
 
+    @io_locked
     def load(self, idx):
         pos = self.object_pos(idx)
 
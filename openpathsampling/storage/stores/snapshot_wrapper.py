@@ -1,9 +1,13 @@
 import logging
 from uuid import UUID
 
+import numpy as np
+
 import openpathsampling.engines as peng
 from openpathsampling.netcdfplus import ObjectStore, \
     NetCDFPlus, LoaderProxy
+from openpathsampling.netcdfplus.stores.object import CompactHashedList
+from openpathsampling.netcdfplus.writer import io_locked
 
 from .snapshot_feature import FeatureSnapshotStore
 from .snapshot_value import SnapshotValueStore
@@ -78,6 +82,36 @@ class ReversalHashedList(dict):
         return self._list
 
 
+class CompactReversalHashedList(CompactHashedList):
+    """
+    Compact index of snapshot UUIDs that pairs each snapshot with its reversal
+
+    Like :class:`ReversalHashedList` only one UUID per pair of snapshot and
+    reversed snapshot is stored. The hash ignores the last bit of the UUID,
+    so both are found in the same entry and index `2 * pos` is used for the
+    stored UUID and `2 * pos + 1` for its partner.
+    """
+
+    _lo_key_mask = CompactHashedList._MASK64 & ~1
+
+    def _mark_key(self, key):
+        return key & ~1
+
+    def _value(self, key, pos):
+        return 2 * pos ^ ((int(self._lo[pos]) ^ key) & 1)
+
+    def __len__(self):
+        return 2 * self._n
+
+    def __setitem__(self, key, value):
+        super(CompactReversalHashedList, self).__setitem__(
+            key ^ (value & 1), value // 2)
+
+    def index(self, key):
+        return super(CompactReversalHashedList, self).index(key // 2) ^ \
+            (key & 1)
+
+
 class SnapshotWrapperStore(ObjectStore):
     """
     A Store to store arbitrary snapshots
@@ -114,6 +148,7 @@ class SnapshotWrapperStore(ObjectStore):
 
         self._treat_missing_snapshot_type = value
 
+    @io_locked
     def load(self, idx):
         """
         Returns an object from the storage.
@@ -224,7 +259,84 @@ class SnapshotWrapperStore(ObjectStore):
             snap = store[int(idx)]
             return snap
 
+    def load_feature_block(self, feature, indices):
+        """
+        Load a feature of many stored snapshots with a few slab reads
+
+        Runs of consecutive snapshots are read at once, which is much faster
+        than loading the snapshots one by one. Features that change sign
+        under time reversal (like velocities) are negated for reversed
+        snapshots.
+
+        Parameters
+        ----------
+        feature : str
+            the name of the feature, e.g. `coordinates`
+        indices : iterable of int
+            the indices of the snapshots in this store, as returned by
+            :meth:`idx`
+
+        Returns
+        -------
+        numpy.ndarray, shape=(n_frames, ...)
+            the values of the feature, in the order of `indices`
+
+        Raises
+        ------
+        KeyError
+            if a snapshot is not in this file or its store does not have
+            a numeric variable for the feature
+        """
+        for store in self.store_snapshot_list:
+            try:
+                store.feature_block_variable(feature)
+                break
+            except KeyError:
+                pass
+        else:
+            raise KeyError(feature)
+
+        indices = np.asarray(list(indices), dtype=np.int64)
+        positions = indices // 2
+        with self.storage.io_lock:
+            store_idxs = self.vars['store'].read_rows(positions)
+            if np.any(store_idxs < 0):
+                raise KeyError(feature)
+
+            parts = [
+                (store_idx, store_idxs == store_idx)
+                for store_idx in np.unique(store_idxs)
+            ]
+            loaded = [
+                self.store_snapshot_list[store_idx].load_feature_block(
+                    feature, positions[selected])
+                for store_idx, selected in parts
+            ]
+
+        block = None
+        getter = None
+        for (store_idx, selected), (values, getter) in zip(parts, loaded):
+            store = self.store_snapshot_list[store_idx]
+            features = store.snapshot_class.__features__
+            reversed_ = (indices[selected] & 1).astype(bool)
+            if feature in features.minus:
+                values[reversed_] = -values[reversed_]
+            elif feature in features.flip:
+                values[reversed_] = ~values[reversed_]
+
+            if block is None:
+                block = np.zeros((len(indices),) + values.shape[1:],
+                                 dtype=values.dtype)
+            block[selected] = values
+
+        if block is None:
+            return np.zeros((0,))
+
+        return getter(block)
+
+    @io_locked
     def __len__(self):
+        self.storage.flush_buffers()
         return len(self.storage.dimensions[self.prefix]) * 2
 
     def initialize(self):
@@ -239,6 +351,7 @@ class SnapshotWrapperStore(ObjectStore):
             'obj.stores',
             'snapshottype')
 
+    @io_locked
     def free(self):
         idx = len(self)
         while idx in self._free:
@@ -320,6 +433,7 @@ class SnapshotWrapperStore(ObjectStore):
         self.only_mention = current_mention
         return ref
 
+    @io_locked
     def save(self, obj, idx=None):
         n_idx = self.index.get(obj.__uuid__)
 
@@ -438,15 +552,20 @@ class SnapshotWrapperStore(ObjectStore):
                         cv_store.vars['value'][n_idx] = value
                         cv_store.cache[n_idx] = value
 
-    def complete_cv(self, cv):
+    def complete_cv(self, cv, chunksize=4096):
         """
         Compute all missing values of a CV and store them
 
+        The stored snapshots are processed in chunks: the CV is evaluated
+        once for all missing snapshots (and their reversed counterparts,
+        if the CV is not time reversible) of a chunk, and the new values
+        are written with single slice assignments.
 
         Parameters
         ----------
         cv : :obj:`openpathsampling.CollectiveVariable`
-
+        chunksize : int
+            the number of stored snapshots to process at once
 
         """
         if cv not in self.attribute_list:
@@ -456,69 +575,84 @@ class SnapshotWrapperStore(ObjectStore):
 
         if cv_store.allow_incomplete:
             # for complete this does not make sense
-
-            # TODO: Make better looping over this to not have
-            # to load all the indices at once
-            # can be problematic for 10M+ stored snapshots
-            indices = self.vars['uuid'][:]
-
-            for pos, idx in enumerate(indices):
-                if not cv_store.time_reversible:
-                    pos *= 2
-
-                proxy = None
-
+            n_snapshots = len(self.vars['uuid'])
+
+            for start in range(0, n_snapshots, chunksize):
+                stop = min(start + chunksize, n_snapshots)
+                self._complete_cv_chunk(cv, cv_store, start, stop)
+
+    def _complete_cv_chunk(self, cv, cv_store, start, stop):
+        # positions in the cv store that are missing and their snapshots
+        missing = []
+        indices = self.vars['uuid'][start:stop]
+        for pos, idx in enumerate(indices, start):
+            proxy = None
+            if cv_store.time_reversible:
                 if pos not in cv_store.index:
-                    # this value is not stored to go ahead
-
                     proxy = self.storage.snapshots[idx]
+                    missing.append((pos, proxy))
+            else:
+                pos *= 2
+                if pos not in cv_store.index:
+                    proxy = self.storage.snapshots[idx]
+                    missing.append((pos, proxy))
 
-                    # get from cache first, this is fastest
-                    value = cv._cache_dict._get(proxy)
-
-                    if value is None:
-                        # not in cache so compute it if possible
-                        if cv._eval_dict:
-                            value = cv._eval_dict([proxy])[0]
-                        else:
-                            value = None
+                pos += 1
+                if pos not in cv_store.index:
+                    if proxy is None:
+                        proxy = self.storage.snapshots[idx]
 
-                    if value is not None:
-                        n_idx = cv_store.free()
+                    if proxy._reversed is not None:
+                        proxy = proxy._reversed
+                    else:
+                        proxy = proxy.reversed
 
-                        cv_store.vars['value'][n_idx] = value
-                        cv_store.vars['index'][n_idx] = pos
-                        cv_store.index[pos] = n_idx
-                        cv_store.cache[n_idx] = value
+                    missing.append((pos, proxy))
 
-                if not cv_store.time_reversible:
-                    pos += 1
-                    if pos not in cv_store.index:
-                        if proxy is None:
-                            proxy = self.storage.snapshots[idx]
+        if not missing:
+            return
 
-                        if proxy._reversed is not None:
-                            proxy = proxy._reversed
-                        else:
-                            proxy = proxy.reversed
+        # get from cache first, this is fastest
+        values = [cv._cache_dict._get(proxy) for _, proxy in missing]
+
+        # not in cache so compute all of them at once if possible
+        to_eval = [num for num, value in enumerate(values) if value is None]
+        if to_eval and cv._eval_dict:
+            evaluated = cv._eval_dict([missing[num][1] for num in to_eval])
+            for num, value in zip(to_eval, evaluated):
+                values[num] = value
+
+        found = [
+            (pos, value)
+            for (pos, _), value in zip(missing, values) if value is not None
+        ]
+        if not found:
+            return
 
-                        # get from cache first, this is fastest
-                        value = cv._cache_dict._get(proxy)
+        first = cv_store.free()
+        last = first + len(found)
+        positions = [pos for pos, _ in found]
+        values = [value for _, value in found]
 
-                        if value is None:
-                            # not in cache so compute it if possible
-                            if cv._eval_dict:
-                                value = cv._eval_dict([proxy])[0]
-                            else:
-                                value = None
+        self._write_values(cv_store, first, values)
+        cv_store.vars['index'][first:last] = positions
 
-                        if value is not None:
-                            n_idx = cv_store.free()
+        for n_idx, (pos, value) in enumerate(found, first):
+            cv_store.index[pos] = n_idx
+            cv_store.cache[n_idx] = value
 
-                            cv_store.vars['value'][n_idx] = value
-                            cv_store.vars['index'][n_idx] = pos
-                            cv_store.index[pos] = n_idx
-                            cv_store.cache[n_idx] = value
+    @staticmethod
+    def _write_values(cv_store, first, values):
+        variable = cv_store.variables['value']
+        var_type = variable.var_type
+        if (var_type in ['int', 'float', 'bool']
+                or var_type.startswith('numpy.')) \
+                and not hasattr(variable, 'unit'):
+            # numerical values can be written at once
+            cv_store.vars['value'][first:first + len(values)] = values
+        else:
+            for n_idx, value in enumerate(values, first):
+                cv_store.vars['value'][n_idx] = value
 
     def sync_cv(self, cv):
         """
@@ -708,7 +842,7 @@ class SnapshotWrapperStore(ObjectStore):
         return store
 
     def create_uuid_index(self):
-        return ReversalHashedList()
+        return CompactReversalHashedList()
 
     def _get_id(self, idx, obj):
         uuid = self.index.index(int(idx))
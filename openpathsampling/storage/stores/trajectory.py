@@ -1,5 +1,6 @@
 from openpathsampling.engines.trajectory import Trajectory
 from openpathsampling.netcdfplus import ObjectStore, LoaderProxy
+from openpathsampling.netcdfplus.writer import io_locked
 
 
 class TrajectoryStore(ObjectStore):
@@ -41,6 +42,7 @@ class TrajectoryStore(ObjectStore):
         trajectory = Trajectory(self.vars['snapshots'][idx])
         return trajectory
 
+    @io_locked
     def cache_all(self):
         """Load all samples as fast as possible into the cache
 
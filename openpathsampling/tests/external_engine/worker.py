@@ -0,0 +1,52 @@
+"""
+worker.py
+
+Trivial 1D resident "engine" to be used for tests of the worker mode of an
+external engine. Same dynamics as engine.c, but it keeps running between
+trajectories and talks through stdin/stdout (see ExternalEngine).
+
+Usage: python worker.py <delay time (ms)>
+"""
+import select
+import sys
+import time
+
+
+def reply(message):
+    sys.stdout.write(message + "\n")
+    sys.stdout.flush()
+
+
+def run_trajectory(position, velocity, delay):
+    while True:
+        ready, _, _ = select.select([sys.stdin], [], [], 0)
+        if ready:
+            command = sys.stdin.readline().split()
+            if command and command[0] == "stop":
+                reply("stopped")
+                return True
+            # quit or closed stdin
+            return False
+        position += velocity
+        reply("frame {:f} {:f}".format(position, velocity))
+        time.sleep(delay)
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("Requires one argument: delay time (ms)")
+        sys.exit(1)
+    delay = int(argv[1]) / 1000.0
+    for line in iter(sys.stdin.readline, ""):
+        command = line.split()
+        if not command or command[0] == "quit":
+            break
+        elif command[0] == "start":
+            reply("started")
+            position, velocity = float(command[1]), float(command[2])
+            if not run_trajectory(position, velocity, delay):
+                break
+
+
+if __name__ == "__main__":
+    main(sys.argv)
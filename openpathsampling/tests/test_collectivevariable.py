@@ -372,3 +372,90 @@ class TestFunctionCV(object):
 
             if os.path.isfile(fname):
                 os.remove(fname)
+
+
+class TestCompleteCV(object):
+    def setup(self):
+        self.fname = data_filename("cv_complete_test.nc")
+        if os.path.isfile(self.fname):
+            os.remove(self.fname)
+        self.traj = make_1d_traj(coordinates=[float(i) for i in range(10)],
+                                 velocities=[1.0] * 10)
+
+    def teardown(self):
+        if os.path.isfile(self.fname):
+            os.remove(self.fname)
+
+    def _check_complete(self, cv, n_values, chunksize):
+        storage = paths.Storage(self.fname, "w")
+        storage.trajectories.save(self.traj)
+        storage.save(cv)
+        store = storage.cvs.cache_store(cv)
+        assert len(store.vars['value']) == 0
+
+        storage.snapshots.complete_cv(cv, chunksize=chunksize)
+        assert len(store.vars['value']) == n_values
+
+        # positions in the store are unique and values match the CV
+        positions = store.variables['index'][:].tolist()
+        assert len(set(positions)) == n_values
+        for pos in positions:
+            if store.time_reversible:
+                snap = storage.snapshots[pos * 2]
+            else:
+                snap = storage.snapshots[pos]
+            assert store[snap] == cv(snap)
+
+        # nothing left to do
+        storage.snapshots.complete_cv(cv, chunksize=chunksize)
+        assert len(store.vars['value']) == n_values
+        storage.close()
+
+    def test_complete_cv_time_reversible(self):
+        cv = paths.FunctionCV(
+            'x', lambda snap: snap.coordinates[0][0],
+            cv_time_reversible=True
+        ).with_diskcache(allow_incomplete=True)
+        self._check_complete(cv, 10, chunksize=3)
+
+    def test_complete_cv_not_time_reversible(self):
+        cv = paths.FunctionCV(
+            'xv', lambda snap: snap.coordinates[0][0] + snap.velocities[0][0],
+            cv_time_reversible=False
+        ).with_diskcache(allow_incomplete=True)
+        self._check_complete(cv, 20, chunksize=4)
+
+
+class TestChunkedEvaluation(object):
+    def setup(self):
+        self.traj = make_1d_traj(coordinates=[float(i) for i in range(10)])
+        self.calls = []
+
+        def f(snapshots):
+            self.calls.append(len(snapshots))
+            return [snap.coordinates[0][0] for snap in snapshots]
+
+        self.cv = paths.FunctionCV('x', f, cv_requires_lists=True)
+
+    def test_chunks(self):
+        values = self.cv.with_executor(chunksize=4)(self.traj)
+        assert values == [float(i) for i in range(10)]
+        assert self.calls == [4, 4, 2]
+
+    def test_thread_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            values = self.cv.with_executor(executor, chunksize=3)(self.traj)
+        assert values == [float(i) for i in range(10)]
+        assert sorted(self.calls) == [1, 3, 3, 3]
+        # values are cached as usual
+        assert self.cv(self.traj[5]) == 5.0
+        assert len(self.calls) == 4
+
+    def test_worker_pool(self):
+        from openpathsampling.pathsimulators.parallel import \
+            AttributeWorkerPool
+        cv = paths.FunctionCV('x2', lambda snap: 2.0 * snap.coordinates[0][0])
+        with AttributeWorkerPool(cv, n_workers=2) as pool:
+            values = cv.with_executor(pool, chunksize=4)(self.traj)
+        assert values == [2.0 * i for i in range(10)]
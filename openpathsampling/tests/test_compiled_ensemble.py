@@ -0,0 +1,150 @@
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+from nose.tools import (assert_equal, assert_true, assert_false,
+                        assert_is_none, assert_is_not_none)
+from .test_helpers import make_1d_traj
+
+import itertools
+
+import openpathsampling as paths
+from openpathsampling.ensemble import *
+from openpathsampling.compiled_ensemble import (
+    FrameMasks, compile_ensemble, compile_sequence, transition_frames
+)
+
+import logging
+logging.getLogger('openpathsampling.initialization').setLevel(logging.CRITICAL)
+logging.getLogger('openpathsampling.ensemble').setLevel(logging.CRITICAL)
+
+
+def all_trajectories(values, max_length):
+    for length in range(0, max_length + 1):
+        for coords in itertools.product(values, repeat=length):
+            yield make_1d_traj(coordinates=list(coords))
+
+
+class TestCompiledSequentialEnsemble(object):
+    def setup(self):
+        op = paths.FunctionCV("Id", lambda snap: snap.coordinates[0][0])
+        self.stateA = paths.CVDefinedVolume(op, -0.5, 0.5).named("A")
+        self.stateB = paths.CVDefinedVolume(op, 2.5, 3.5).named("B")
+        self.interface = paths.CVDefinedVolume(op, -0.5, 1.5).named("I")
+        # one value in each region
+        self.values = [0.0, 1.0, 2.0, 3.0]
+
+        inA = AllInXEnsemble(self.stateA)
+        outA = AllOutXEnsemble(self.stateA)
+        length1 = LengthEnsemble(1)
+        self.ensembles = [
+            SequentialEnsemble([inA & length1, outA, inA & length1]),
+            SequentialEnsemble([inA, outA, inA]),
+            SequentialEnsemble([
+                SingleFrameEnsemble(inA),
+                OptionalEnsemble(AllInXEnsemble(self.interface
+                                                - self.stateA)),
+                outA,
+                SingleFrameEnsemble(inA)
+            ]),
+            SequentialEnsemble([
+                inA & length1,
+                outA & PartOutXEnsemble(self.interface),
+                inA & length1
+            ]),
+            SequentialEnsemble([
+                LengthEnsemble(slice(1, 3)),
+                PartInXEnsemble(self.stateB)
+            ]),
+            SequentialEnsemble([
+                OptionalEnsemble(inA),
+                (outA | LengthEnsemble(2)) & PartOutXEnsemble(self.stateB),
+                EmptyEnsemble() | inA
+            ]),
+            paths.TISEnsemble(self.stateA, self.stateB, self.interface),
+            paths.MinusInterfaceEnsemble(self.stateA, self.interface),
+        ]
+
+    def _sequential(self, ensemble):
+        if isinstance(ensemble, SequentialEnsemble):
+            return ensemble
+        # TIS and minus: Sequential & something
+        return ensemble.ensemble.ensemble1
+
+    def test_compile(self):
+        for ensemble in self.ensembles:
+            seq = self._sequential(ensemble)
+            assert_is_not_none(seq._compiled_matchers())
+
+    def test_opaque(self):
+        seq = SequentialEnsemble([
+            AllInXEnsemble(self.stateA),
+            SequentialEnsemble([AllOutXEnsemble(self.stateA)])
+        ])
+        assert_is_none(seq._compiled_matchers())
+        assert_is_none(compile_ensemble(
+            PrefixTrajectoryEnsemble(AllInXEnsemble(self.stateA),
+                                     make_1d_traj([0.0]))
+        ))
+
+    def test_compiled_call(self):
+        for ensemble in self.ensembles:
+            seq = self._sequential(ensemble)
+            for traj in all_trajectories(self.values, 5):
+                seq._use_compiled = True
+                compiled = ensemble(traj)
+                seq._use_compiled = False
+                expected = ensemble(traj)
+                assert_equal(compiled, expected, "Failure in " +
+                             str([s.coordinates[0][0] for s in traj]))
+
+    def test_transition_frames(self):
+        seq = self._sequential(self.ensembles[0])
+        matchers = compile_sequence(seq.ensembles)
+        for traj in all_trajectories(self.values, 5):
+            masks = FrameMasks(traj)
+            seq._use_compiled = False
+            assert_equal(transition_frames(matchers, masks),
+                         seq.transition_frames(traj))
+
+    def test_frame_masks(self):
+        traj = make_1d_traj([0.0, 1.0, 1.0, 0.0, 3.0])
+        masks = FrameMasks(traj)
+        mask = masks.mask(self.stateA)
+        assert_equal(list(mask), [True, False, False, True, False])
+        assert_true(masks.mask(self.stateA) is mask)
+        assert_equal(masks.next_index(self.stateA, False, 0), 1)
+        assert_equal(masks.next_index(self.stateA, True, 1), 3)
+        assert_equal(masks.next_index(self.stateA, True, 4), 5)
+
+    def test_compile_sequences(self):
+        for ensemble in self.ensembles:
+            assert_is_none(compile_ensemble(ensemble))
+            assert_is_not_none(compile_ensemble(ensemble, sequences=True))
+
+    def test_iter_valid_slices(self):
+        for ensemble in self.ensembles:
+            seq = self._sequential(ensemble)
+            for traj in all_trajectories(self.values, 4):
+                for kwargs in [{}, {'overlap': 0, 'min_length': 2}]:
+                    seq._use_compiled = True
+                    compiled = (
+                        list(ensemble.iter_valid_slices(traj, **kwargs)),
+                        list(ensemble.iter_extendable_slices(traj, **kwargs))
+                    )
+                    seq._use_compiled = False
+                    expected = (
+                        list(ensemble.iter_valid_slices(traj, **kwargs)),
+                        list(ensemble.iter_extendable_slices(traj, **kwargs))
+                    )
+                    assert_equal(compiled, expected, "Failure in " +
+                                 str([s.coordinates[0][0] for s in traj]))
+
+    def test_split(self):
+        ensemble = self.ensembles[6]  # TIS
+        traj = make_1d_traj([1.0, 0.0, 1.0, 2.0, 3.0, 3.0, 2.0, 1.0, 0.0,
+                             1.0, 0.0, 0.0, 2.0, 1.0, 0.0])
+        subtrajs = ensemble.split(traj)
+        assert_equal(
+            [[s.coordinates[0][0] for s in subtraj] for subtraj in subtrajs],
+            [[0.0, 1.0, 2.0, 3.0], [0.0, 2.0, 1.0, 0.0]]
+        )
@@ -2705,6 +2705,133 @@ class TestVolumeCombinations(EnsembleTest):
         )
 
 
+class TestEnsembleStream(EnsembleTest):
+    def setup(self):
+        inX = AllInXEnsemble(vol1)
+        outX = AllOutXEnsemble(vol1)
+        self.ensembles = [
+            inX,
+            outX,
+            LengthEnsemble(3),
+            LengthEnsemble(slice(2, 5)),
+            inX | LengthEnsemble(2),
+            outX & LengthEnsemble(slice(0, 4)),
+            ~inX,
+            EmptyEnsemble(),
+            FullEnsemble(),
+            SequentialEnsemble([inX, outX, inX]),
+            SequentialEnsemble([inX & LengthEnsemble(1), outX,
+                                inX & LengthEnsemble(1)]),
+            paths.TISEnsemble(vol1, vol3, vol2, op),
+            paths.MinusInterfaceEnsemble(vol1, vol2)
+        ]
+
+    def _check_stream(self, check, stream, traj, direction):
+        if direction > 0:
+            initial, frames = traj[0:1], traj[1:]
+        else:
+            initial, frames = traj[-1:], traj[:-1].reversed
+        stream.start(initial)
+        current = paths.Trajectory(initial)
+        failmsg = "Failure in " + str(traj) + ": "
+        self._single_test(lambda t: stream.can_continue(), current,
+                          check(current), failmsg)
+        for frame in frames:
+            stream.extend(frame)
+            if direction > 0:
+                current.append(frame)
+            else:
+                current.insert(0, frame)
+            self._single_test(lambda t: stream.can_continue(), current,
+                              check(current), failmsg)
+
+    def test_stream_can_append(self):
+        for ens in self.ensembles:
+            for traj in ttraj.values():
+                for check in ['can_append', 'strict_can_append']:
+                    stream = ens.stream(check, +1)
+                    self._check_stream(getattr(ens, check), stream, traj,
+                                       +1)
+
+    def test_stream_can_prepend(self):
+        for ens in self.ensembles:
+            for traj in ttraj.values():
+                for check in ['can_prepend', 'strict_can_prepend']:
+                    stream = ens.stream(check, -1)
+                    self._check_stream(getattr(ens, check), stream, traj,
+                                       -1)
+
+    def test_specialized_streams(self):
+        inX = AllInXEnsemble(vol1)
+        assert_true(isinstance(inX.stream(), AllInVolumeStream))
+        assert_true(isinstance((inX & LengthEnsemble(2)).stream(),
+                               CombinationEnsembleStream))
+        assert_true(isinstance(EmptyEnsemble().stream(),
+                               ConstantEnsembleStream))
+        # general functions fall back to checking the full trajectory
+        assert_equal(type(inX.stream('__call__')), EnsembleStream)
+
+    def test_overridden_check_stream(self):
+        # subclasses that change a check get the generic stream
+        class ShortInXEnsemble(AllInXEnsemble):
+            def can_append(self, trajectory, trusted=False):
+                return len(trajectory) < 2
+
+        class LongerEnsemble(LengthEnsemble):
+            def can_append(self, trajectory, trusted=False):
+                return len(trajectory) < 4
+
+        traj = ttraj['upper_in_in_in']
+        for ens in [ShortInXEnsemble(vol1), LongerEnsemble(2)]:
+            stream = ens.stream('can_append')
+            assert_equal(type(stream), EnsembleStream)
+            self._check_stream(ens.can_append, stream, traj, +1)
+
+    def test_prefix_stream(self):
+        seq = SequentialEnsemble([AllInXEnsemble(vol1),
+                                  AllOutXEnsemble(vol1)])
+        traj = ttraj['upper_in_in_out_out_in_in']
+        for n in range(1, len(traj)):
+            ens = PrefixTrajectoryEnsemble(seq, traj[0:n])
+            stream = ens.stream('can_append')
+            self._check_stream(ens.can_append, stream, traj[n:], +1)
+
+    def test_suffix_stream(self):
+        seq = SequentialEnsemble([AllInXEnsemble(vol1),
+                                  AllOutXEnsemble(vol1)])
+        traj = ttraj['upper_in_in_out_out_in_in']
+        for n in range(1, len(traj)):
+            ens = SuffixTrajectoryEnsemble(seq, traj[n:])
+            stream = ens.stream('can_prepend')
+            # backward shooting: frames are reversed, and get appended
+            backward = traj[0:n].reversed
+            stream.start(backward[0:1])
+            results = [stream.can_continue()]
+            for i in range(1, len(backward)):
+                stream.extend(backward[i])
+                results.append(stream.can_continue())
+            expected = [ens.can_prepend(backward[0:i + 1])
+                        for i in range(len(backward))]
+            assert_equal(results, expected)
+
+    def test_interleaved_streams(self):
+        # streams of the same ensemble do not interfere
+        seq = SequentialEnsemble([AllInXEnsemble(vol1),
+                                  AllOutXEnsemble(vol1),
+                                  AllInXEnsemble(vol1)])
+        traj1 = ttraj['upper_in_out_out_in']
+        traj2 = ttraj['upper_in_in_in_out']
+        stream1 = seq.stream('can_append')
+        stream2 = seq.stream('can_append')
+        stream1.start(traj1[0:1])
+        stream2.start(traj2[0:1])
+        for i in range(1, 4):
+            stream1.extend(traj1[i])
+            stream2.extend(traj2[i])
+            assert_equal(stream1.can_continue(), seq.can_append(traj1[:i+1]))
+            assert_equal(stream2.can_continue(), seq.can_append(traj2[:i+1]))
+
+
 class TestAbstract(object):
     @raises_with_message_like(TypeError, "Can't instantiate abstract class")
     def test_abstract_ensemble(self):
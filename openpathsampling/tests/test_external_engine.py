@@ -6,11 +6,13 @@ from .test_helpers import assert_items_equal
 import openpathsampling as paths
 import openpathsampling.engines as peng
 from openpathsampling.engines.toy import ToySnapshot
+from openpathsampling.engines import external_engine
 
 import numpy as np
 
 import psutil
 import shlex
+import sys
 
 import time
 import os
@@ -76,6 +78,20 @@ class ExampleExternalEngine(peng.ExternalEngine):
         return (engine_path + " " + str(self.engine_sleep)
                 + " " + str(self.output_file) + " " + str(self.input_file))
 
+    def worker_command(self):
+        worker_path = os.path.join(self.engine_directory, "worker.py")
+        return (sys.executable + " " + worker_path + " "
+                + str(self.engine_sleep))
+
+    def frame_to_message(self, snapshot):
+        return "{pos} {vel}".format(pos=snapshot.xyz[0][0],
+                                    vel=snapshot.velocities[0][0])
+
+    def frame_from_message(self, message):
+        coords, vels = [float(value) for value in message.split()]
+        return ToySnapshot(coordinates=np.array([[coords]]),
+                           velocities=np.array([[vels]]))
+
 def setup_module():
     proc = psutil.Popen("make", cwd=engine_dir)
     proc.wait()
@@ -218,3 +234,92 @@ class TestExternalEngine(object):
         for testfile in glob.glob("test*out") + glob.glob("test*inp"):
             os.remove(testfile)
 
+
+
+class TestExternalEngineWorkerMode(object):
+    def setup(self):
+        self.descriptor = SnapshotDescriptor.construct(
+            snapshot_class=ToySnapshot,
+            snapshot_dimensions={'n_spatial': 1,
+                                 'n_atoms': 1}
+        )
+        options = {
+            'n_frames_max': 10000,
+            'engine_sleep': 0,
+            'name_prefix': "test",
+            'engine_directory': engine_dir,
+            'worker_mode': True
+        }
+        self.template = peng.toy.Snapshot(coordinates=np.array([[0.0]]),
+                                          velocities=np.array([[1.0]]))
+        self.engine = ExampleExternalEngine(options, self.descriptor,
+                                            self.template)
+        self.ensemble = paths.LengthEnsemble(5)
+
+    def teardown(self):
+        self.engine.stop_worker()
+
+    def test_generate(self):
+        traj = self.engine.generate(self.template,
+                                    [self.ensemble.can_append])
+        assert_items_equal(traj.xyz, [[[0.0]], [[1.0]], [[2.0]], [[3.0]],
+                                      [[4.0]]])
+
+    def test_worker_is_reused(self):
+        traj = self.engine.generate(self.template,
+                                    [self.ensemble.can_append])
+        worker = self.engine.worker
+        assert_true(worker.is_running())
+        # start the second trajectory where the first one ended
+        traj2 = self.engine.generate(traj[-1], [self.ensemble.can_append])
+        assert_true(self.engine.worker is worker)
+        assert_items_equal(traj2.xyz, [[[4.0]], [[5.0]], [[6.0]], [[7.0]],
+                                       [[8.0]]])
+        self.engine.stop_worker()
+        assert_equal(self.engine.worker, None)
+        assert_equal(worker.is_running(), False)
+
+    def test_zombie_worker(self):
+        self.engine.start(self.template)
+        worker = self.engine.worker
+        worker.kill()
+        # the killed worker is a zombie until it is waited for
+        while worker.status() != psutil.STATUS_ZOMBIE:
+            time.sleep(0.01)
+        assert_true(worker.is_running())
+        assert_equal(self.engine.worker_is_running(), False)
+        # a new trajectory replaces the worker
+        traj = self.engine.generate(self.template,
+                                    [self.ensemble.can_append])
+        assert_equal(len(traj), 5)
+        assert_true(self.engine.worker is not worker)
+
+    def test_worker_cleanup(self):
+        with self.engine as engine:
+            engine.generate(self.template, [self.ensemble.can_append])
+            worker = engine.worker
+        assert_equal(self.engine.worker, None)
+        assert_equal(worker.is_running(), False)
+
+        # workers of engines that are never stopped end at exit ...
+        self.engine.generate(self.template, [self.ensemble.can_append])
+        worker = self.engine.worker
+        external_engine._stop_all_workers()
+        assert_equal(worker.is_running(), False)
+
+        # ... or when the engine is garbage collected
+        engine = ExampleExternalEngine(self.engine.options, self.descriptor,
+                                       self.template)
+        engine.generate(self.template, [self.ensemble.can_append])
+        worker = engine.worker
+        del engine
+        assert_equal(worker.is_running(), False)
+
+    @raises(RuntimeError)
+    def test_dead_worker(self):
+        self.engine.start(self.template)
+        self.engine.worker.kill()
+        self.engine.worker.wait()
+        # frames sent before the worker died can still be read
+        for _ in range(1000000):
+            self.engine.generate_next_frame()
@@ -0,0 +1,143 @@
+from __future__ import absolute_import
+
+import os
+
+import numpy as np
+import pytest
+from nose.tools import assert_equal, assert_true, assert_false
+
+import openpathsampling as paths
+import openpathsampling.engines.toy as toys
+from openpathsampling.engines.frame_buffer import FrameBuffer, stack_frames
+from openpathsampling.netcdfplus.dictify import CachedUUIDObjectJSON
+from .test_helpers import data_filename
+
+
+class TestFrameBuffer(object):
+    def setup(self):
+        self.buffer = FrameBuffer({'coordinates': (1, 2)}, capacity=4)
+
+    def test_append(self):
+        views = []
+        for i in range(10):
+            block, row = self.buffer.append(
+                coordinates=np.array([[i, -i]]))
+            views.append(block['coordinates'][row])
+        assert_equal(len(self.buffer), 10)
+        # blocks of 4, 8 frames
+        assert_equal(len(self.buffer.blocks), 2)
+        assert_equal(self.buffer.nbytes, 12 * 2 * 8)
+        # growing keeps old views valid
+        for i, view in enumerate(views):
+            np.testing.assert_array_equal(view, [[i, -i]])
+
+    def test_locate(self):
+        for i in range(6):
+            self.buffer.append(coordinates=np.array([[i, i]]))
+        block, row = self.buffer.locate(5)
+        assert_true(block is self.buffer.blocks[1])
+        assert_equal(row, 1)
+        with pytest.raises(IndexError):
+            self.buffer.locate(6)
+
+
+class TestBufferedToySnapshot(object):
+    def setup(self):
+        pes = toys.HarmonicOscillator([1.0, 1.0], [1.0, 1.0], [0.0, 0.0])
+        topology = toys.Topology(n_spatial=2, masses=[1.0, 1.0], pes=pes)
+        self.engine = toys.Engine(
+            options={
+                'integ': toys.LangevinBAOABIntegrator(
+                    dt=0.02, temperature=0.1, gamma=2.5),
+                'n_frames_max': 100,
+                'frame_buffer': True
+            },
+            topology=topology
+        )
+        self.initial = toys.Snapshot(
+            coordinates=np.array([[0.0, 0.0]]),
+            velocities=np.array([[1.0, 0.5]]),
+            engine=self.engine
+        )
+        self.ensemble = paths.LengthEnsemble(20)
+        self.filename = data_filename("frame_buffer_test.nc")
+
+    def teardown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def _generate(self, direction=+1, n_frames_chunk=1):
+        self.engine.options['n_frames_chunk'] = n_frames_chunk
+        return self.engine.generate(self.initial, self.ensemble.can_append,
+                                    direction=direction)
+
+    def test_generate(self):
+        for chunk in [1, 4]:
+            traj = self._generate(n_frames_chunk=chunk)
+            assert_equal(len(traj), 20)
+            assert_true(isinstance(traj[1], toys.BufferedToySnapshot))
+            generated = traj[1:]
+            # the generated frames are a slice of the buffer
+            xyz = generated.xyz
+            assert_false(xyz.flags.owndata)
+            assert_true(np.shares_memory(xyz, generated[0].coordinates))
+            # but the snapshots cannot be changed through it
+            assert_false(xyz.flags.writeable)
+            with pytest.raises(ValueError):
+                xyz -= 1.0
+            assert_true(generated[0].coordinates.flags.writeable)
+            np.testing.assert_array_equal(
+                xyz, np.array([snap.xyz for snap in generated]))
+            # with the initial frame, the slabs are concatenated
+            np.testing.assert_array_equal(
+                traj.velocities,
+                np.array([snap.velocities for snap in traj]))
+
+    def test_reversed(self):
+        traj = self._generate()[1:]
+        snap = traj[0]
+        rev = snap.reversed
+        assert_false('velocities' in rev.__dict__)
+        assert_true(rev.coordinates is snap.coordinates)
+        np.testing.assert_array_equal(rev.velocities, -snap.velocities)
+        assert_true(rev.reversed is snap)
+
+        reversed_traj = traj.reversed
+        np.testing.assert_array_equal(reversed_traj.xyz, traj.xyz[::-1])
+        assert_true(np.shares_memory(reversed_traj.xyz, traj.xyz))
+        np.testing.assert_array_equal(reversed_traj.velocities,
+                                      -traj.velocities[::-1])
+
+        copied = rev.copy()
+        assert_equal(type(copied), toys.Snapshot)
+        np.testing.assert_array_equal(copied.velocities, rev.velocities)
+
+    def test_backward(self):
+        traj = self._generate(direction=-1)
+        assert_true(traj[-1] is self.initial)
+        np.testing.assert_array_equal(
+            traj.velocities, np.array([snap.velocities for snap in traj]))
+        assert_true(np.shares_memory(traj[:-1].xyz, traj[0].coordinates))
+
+    def test_stack_frames_without_buffer(self):
+        traj = paths.Trajectory([self.initial, self.initial.reversed])
+        assert_equal(stack_frames(traj, 'xyz'), None)
+
+    def test_to_dict(self):
+        rev = self._generate()[1].reversed
+        encoder = CachedUUIDObjectJSON()
+        decoded = CachedUUIDObjectJSON().from_json(encoder.to_json(rev))
+        np.testing.assert_array_equal(decoded.velocities, rev.velocities)
+
+    def test_storage(self):
+        traj = self._generate().reversed
+        storage = paths.Storage(self.filename, 'w')
+        storage.save(traj)
+        storage.close()
+
+        storage = paths.Storage(self.filename, 'r')
+        loaded = storage.trajectories[0]
+        np.testing.assert_allclose(loaded.velocities, traj.velocities,
+                                   rtol=1e-6)
+        np.testing.assert_allclose(loaded.xyz, traj.xyz, rtol=1e-6)
+        storage.close()
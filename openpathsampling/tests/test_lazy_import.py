@@ -0,0 +1,53 @@
+import subprocess
+import sys
+
+import pytest
+
+import openpathsampling as paths
+from openpathsampling.lazy_import import HAS_MODULE_GETATTR
+
+pytestmark = pytest.mark.skipif(not HAS_MODULE_GETATTR,
+                                reason="imports are eager before Python 3.7")
+
+
+def _modules_after_import(statement):
+    # run in a fresh interpreter: here everything has been imported already
+    code = "\n".join([
+        "import sys",
+        statement,
+        "print(' '.join(sorted(sys.modules)))"
+    ])
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return set(output.decode().split())
+
+
+def test_import_is_lazy():
+    modules = _modules_after_import("import openpathsampling")
+    for name in ['openpathsampling.analysis.replica_network',
+                 'openpathsampling.analysis.tis',
+                 'openpathsampling.step_visualizer_2D',
+                 'openpathsampling.engines.openmm',
+                 'matplotlib', 'networkx', 'mdtraj', 'IPython']:
+        assert name not in modules
+
+
+def test_lazy_attribute_imports_module():
+    modules = _modules_after_import(
+        "import openpathsampling as paths\npaths.ReplicaNetwork"
+    )
+    assert 'openpathsampling.analysis.replica_network' in modules
+
+
+def test_lazy_attributes():
+    from openpathsampling.analysis.replica_network import ReplicaNetwork
+    from openpathsampling.step_visualizer_2D import StepVisualizer2D
+    import openpathsampling.numerics
+    assert paths.ReplicaNetwork is ReplicaNetwork
+    assert paths.StepVisualizer2D is StepVisualizer2D
+    assert paths.numerics is openpathsampling.numerics
+    assert paths.analysis.tis.StandardTISAnalysis is \
+        openpathsampling.analysis.tis.StandardTISAnalysis
+    for name in ['ReplicaNetwork', 'numerics', 'analysis']:
+        assert name in dir(paths)
+    with pytest.raises(AttributeError):
+        paths.NotAnAttribute
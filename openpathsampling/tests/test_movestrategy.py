@@ -465,6 +465,43 @@ class TestEnsembleHopStrategy(MoveStrategyTestSetup):
         assert_equal(len(scheme.movers['repex']), 18)
 
 
+class TestConcurrentMoveStrategy(MoveStrategyTestSetup):
+    def test_make_movers(self):
+        scheme = MoveScheme(self.network)
+        scheme.apply_strategy(OneWayShootingStrategy())
+        strategy = ConcurrentMoveStrategy(n_workers=2)
+        movers = strategy.make_movers(scheme)
+        assert_equal(len(movers), 1)
+        assert_equal(type(movers[0]), paths.ConcurrentMover)
+        assert_equal(movers[0].movers, scheme.movers['shooting'])
+        assert_equal(movers[0].n_workers, 2)
+
+    def test_composition_with_default_scheme(self):
+        scheme = DefaultScheme(self.network, engine=None)
+        scheme.append(ConcurrentMoveStrategy())
+        root = scheme.move_decision_tree()
+        assert_equal(len(scheme.movers['shooting']), 1)
+        concurrent = scheme.movers['shooting'][0]
+        assert_equal(len(concurrent.movers), 6)
+        assert_equal(scheme.sanity_check(), True)
+        sig_in, sig_out = concurrent.ensemble_signature_set
+        assert_equal(len(sig_in), 6)
+        assert_equal(sig_in, sig_out)
+        scheme.build_balance_partners()
+        assert_equal(scheme.balance_partners[concurrent], [concurrent])
+
+    def test_commuting_movers(self):
+        scheme = DefaultScheme(self.network, engine=None)
+        root = scheme.move_decision_tree()
+        assert_equal(len(scheme.commuting_movers('shooting')), 1)
+        # nearest-neighbor replica exchanges overlap along an interface set
+        commuting = scheme.commuting_movers('repex')
+        assert_equal(len(commuting) > 1, True)
+        assert_equal(sum(len(c) for c in commuting), 6)
+        for movers in commuting:
+            assert_equal(paths.ConcurrentMover.commute(movers), True)
+
+
 class TestPathReversalStrategy(MoveStrategyTestSetup):
     def test_make_movers(self):
         strategy = PathReversalStrategy()
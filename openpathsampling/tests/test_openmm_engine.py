@@ -173,6 +173,18 @@ class TestOpenMMEngine(object):
         else:
             raise RuntimeError('Did not have correct MaxLengthError')
 
+    def test_generate_n_frames_until(self):
+        frames = self.engine.generate_n_frames_until(4, lambda frames: 1)
+        assert_equal(len(frames), 2)
+        assert(self.engine.current_snapshot is frames[-1])
+
+    def test_generate_chunked(self):
+        self.engine.options['n_frames_chunk'] = 3
+        ens = paths.LengthEnsemble(4)
+        traj = self.engine.generate(self.engine.current_snapshot,
+                                    [ens.can_append])
+        assert_equal(len(traj), 4)
+
     def test_snapshot_timestep(self):
         assert_equal(self.engine.snapshot_timestep, 4 * u.femtoseconds)
 
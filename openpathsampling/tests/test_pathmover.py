@@ -4,13 +4,15 @@
 from __future__ import print_function
 from __future__ import absolute_import
 
+import os
+
 from builtins import zip
 from builtins import str
 from builtins import range
 from builtins import object
 from nose.plugins.skip import SkipTest
 from nose.tools import (assert_equal, assert_not_equal, raises, assert_true,
-                        assert_in, assert_not_in)
+                        assert_in, assert_not_in, assert_false)
 from numpy.testing import assert_allclose
 
 from openpathsampling.collectivevariable import FunctionCV
@@ -981,6 +983,119 @@ class TestConditionalSequentialMover(TestSequentialMover):
     def test_restricted_by_ensemble(self):
         raise SkipTest
 
+class TestConcurrentMover(object):
+    def setup(self):
+        op = FunctionCV("myid", f=lambda snap: snap.coordinates[0][0])
+        stateA = CVDefinedVolume(op, -100, 0.0)
+        stateB = CVDefinedVolume(op, 0.65, 100)
+        interface0 = CVDefinedVolume(op, -100, 0.1)
+        interface1 = CVDefinedVolume(op, -100, 0.3)
+        self.tis0 = paths.TISEnsemble(stateA, stateB, interface0, op)
+        self.tis1 = paths.TISEnsemble(stateA, stateB, interface1, op)
+        integ = toys.LeapfrogVerletIntegrator(dt=0.1)
+        pes = toys.LinearSlope(m=[0.0], c=[0.0])
+        topology = toys.Topology(n_spatial=1, masses=[1.0], pes=pes)
+        self.engine = toys.Engine(options={'integ': integ,
+                                           'n_frames_max': 1000,
+                                           'n_steps_per_frame': 1},
+                                  topology=topology)
+        traj = paths.Trajectory([
+            toys.Snapshot(coordinates=np.array([[0.01*k - 0.005]]),
+                          velocities=np.array([[0.1]]),
+                          engine=self.engine)
+            for k in range(67)
+        ])
+        self.sample_set = SampleSet([
+            Sample(trajectory=traj, replica=0, ensemble=self.tis0),
+            Sample(trajectory=traj, replica=1, ensemble=self.tis1)
+        ])
+        self.shooters = [
+            OneWayShootingMover(ensemble=ens, selector=UniformSelector(),
+                                engine=self.engine)
+            for ens in [self.tis0, self.tis1]
+        ]
+
+    def test_commute(self):
+        assert_equal(ConcurrentMover.commute(self.shooters), True)
+        repex = ReplicaExchangeMover(self.tis0, self.tis1)
+        assert_equal(ConcurrentMover.commute(self.shooters + [repex]),
+                     False)
+        assert_equal(
+            ConcurrentMover.commuting_sets(
+                [self.shooters[0], repex, self.shooters[1]]),
+            [self.shooters, [repex]]
+        )
+
+    @raises(ValueError)
+    def test_noncommuting_movers(self):
+        ConcurrentMover(self.shooters
+                        + [ReplicaExchangeMover(self.tis0, self.tis1)])
+
+    def test_move(self):
+        mover = ConcurrentMover(self.shooters)
+        change = mover.move(self.sample_set)
+        assert_equal(len(change.subchanges), 2)
+        assert_equal(change.accepted, True)
+        new_set = self.sample_set.apply_samples(change.results)
+        new_set.sanity_check()
+        assert_equal(new_set[self.tis0].replica, 0)
+        assert_equal(new_set[self.tis1].replica, 1)
+        for sub, ens in zip(change.subchanges, [self.tis0, self.tis1]):
+            assert_equal(sub.results[0].ensemble, ens)
+
+    def _seeded_moves(self, n_workers):
+        mover = ConcurrentMover(self.shooters, n_workers=n_workers)
+        np.random.seed(7)
+        sample_set = self.sample_set
+        results = []
+        for _ in range(3):
+            change = mover.move(sample_set)
+            sample_set = sample_set.apply_samples(change.results)
+            results.append([
+                (sub.canonical.mover, sub.results[0].trajectory.xyz.tolist())
+                for sub in change.subchanges
+            ])
+        mover.close()
+        results.append(np.random.random())
+        return results
+
+    def test_parallel_move(self):
+        serial = self._seeded_moves(n_workers=None)
+        parallel = self._seeded_moves(n_workers=2)
+        assert_equal(serial, parallel)
+
+    def test_move_keeps_random_state(self):
+        # only the seeds of the moves are drawn from the global generator
+        mover = ConcurrentMover(self.shooters)
+        np.random.seed(7)
+        mover.move(self.sample_set)
+        after_move = np.random.random()
+        np.random.seed(7)
+        np.random.randint(2**31 - 1, size=len(self.shooters))
+        assert_equal(after_move, np.random.random())
+
+    def test_to_dict(self):
+        mover = ConcurrentMover(self.shooters, n_workers=2)
+        reloaded = ConcurrentMover.from_dict(mover.to_dict())
+        assert_equal(reloaded.n_workers, 2)
+        assert_equal(reloaded.movers, self.shooters)
+
+    def test_pathsampling_keeps_pool(self):
+        mover = ConcurrentMover(self.shooters, n_workers=2)
+        scheme = paths.LockedMoveScheme(mover)
+        sim = paths.PathSampling(storage=None, move_scheme=scheme,
+                                 sample_set=self.sample_set)
+        sim.output_stream = open(os.devnull, 'w')
+        sim.run(1)
+        pool = mover._pool
+        assert_true(pool.is_running)
+        sim.run(1)
+        assert_true(mover._pool is pool)
+        sim.close_worker_pools()
+        assert_equal(mover._pool, None)
+        assert_false(pool.is_running)
+
+
 class SubtrajectorySelectTester(object):
 
     def setup(self):
@@ -422,6 +422,54 @@ class TestCommittorSimulation(object):
         assert_true(counts['None-Right'] > 0)
         assert_equal(sum(counts.values()), 50)
 
+    def _seeded_committor_run(self, n_workers, as_chain=False):
+        paths.EngineMover.default_engine = None
+        snap1 = toys.Snapshot(coordinates=np.array([[0.1]]),
+                              velocities=np.array([[-1.0]]),
+                              engine=self.engine)
+        storage = paths.Storage(data_filename("committor_par.nc"), "w")
+        sim = CommittorSimulation(storage=storage,
+                                  engine=self.engine,
+                                  states=[self.left, self.right],
+                                  randomizer=paths.RandomVelocities(1.0),
+                                  initial_snapshots=[self.snap0, snap1])
+        sim.output_stream = open(os.devnull, 'w')
+        sim.run(5, as_chain=as_chain, n_workers=n_workers, seed=42)
+        # the movers know their engine; the global default is not needed
+        assert_equal(paths.EngineMover.default_engine, None)
+        summary = []
+        for step in storage.steps:
+            step.active.sanity_check()  # traj is in ensemble
+            sample = step.active[0]
+            assert_equal(step.simulation, sim)
+            assert_true(sample.ensemble in [sim.forward_ensemble,
+                                            sim.backward_ensemble])
+            summary.append((step.mccycle,
+                            step.change.canonical.mover.name,
+                            sample.trajectory.xyz.tolist()))
+        storage.close()
+        os.remove(data_filename("committor_par.nc"))
+        return summary
+
+    def test_parallel_committor_run(self):
+        serial = self._seeded_committor_run(n_workers=None)
+        parallel = self._seeded_committor_run(n_workers=2)
+        assert_equal(len(parallel), 10)
+        assert_equal([s[0] for s in parallel], list(range(10)))
+        assert_equal(serial, parallel)
+
+    def test_seeded_run_keeps_random_state(self):
+        state = np.random.get_state()
+        self._seeded_committor_run(n_workers=None)
+        after_run = np.random.random()
+        np.random.set_state(state)
+        assert_equal(after_run, np.random.random())
+
+    def test_parallel_committor_run_as_chain(self):
+        serial = self._seeded_committor_run(n_workers=None, as_chain=True)
+        parallel = self._seeded_committor_run(n_workers=2, as_chain=True)
+        assert_equal(serial, parallel)
+
 class TestDirectSimulation(object):
     def setup(self):
         pes = toys.HarmonicOscillator(A=[1.0], omega=[1.0], x0=[0.0])
@@ -693,3 +741,105 @@ class TestPathSampling(object):
         init_xyz = set(s.xyz.tostring() for s in initial_snaps)
         final_xyz = set(s.xyz.tostring() for s in final_snaps)
         assert init_xyz & final_xyz == set([])
+
+
+class TestMultiWalkerPathSampling(object):
+    def setup(self):
+        self.cv = paths.FunctionCV("x", lambda x: x.xyz[0][0])
+        self.state_A = paths.CVDefinedVolume(self.cv, float("-inf"), 0.0)
+        self.state_B = paths.CVDefinedVolume(self.cv, 1.0, float("inf"))
+        pes = paths.engines.toy.LinearSlope([0, 0, 0], 0)
+        integ = paths.engines.toy.LangevinBAOABIntegrator(0.01, 0.1, 2.5)
+        topology = paths.engines.toy.Topology(n_spatial=3, masses=[1.0],
+                                              pes=pes)
+        self.engine = paths.engines.toy.Engine(options={'integ': integ},
+                                               topology=topology)
+        paths.EngineMover.default_engine = self.engine
+
+        network = paths.TPSNetwork(self.state_A, self.state_B)
+        self.scheme = paths.OneWayShootingMoveScheme(
+            network=network,
+            selector=paths.UniformSelector(),
+            engine=self.engine
+        )
+        trajs = [make_1d_traj([-0.1, 0.2, 0.5, 0.8, 1.1]),
+                 make_1d_traj([-0.2, 0.3, 0.6, 1.2])]
+        self.init_conds = [
+            self.scheme.initial_conditions_from_trajectories(traj)
+            for traj in trajs
+        ]
+
+    def teardown(self):
+        paths.EngineMover.default_engine = None
+
+    def _seeded_run(self, n_workers):
+        filename = data_filename("multi_walker.nc")
+        storage = paths.Storage(filename, "w")
+        sim = MultiWalkerPathSampling(storage=storage,
+                                      move_scheme=self.scheme,
+                                      sample_sets=self.init_conds,
+                                      n_workers=n_workers,
+                                      seed=42,
+                                      steps_per_round=2)
+        sim.output_stream = open(os.devnull, 'w')
+        sim.run(3)
+        summary = []
+        for step in storage.steps:
+            step.active.sanity_check()
+            walker_id = sim.walker_id(step)
+            summary.append((walker_id, step.mccycle,
+                            [s.trajectory.xyz.tolist()
+                             for s in step.active]))
+        assert_equal(
+            [s.mccycle for s in sim.walker_steps(storage.steps, 1)],
+            [0, 1, 2, 3]
+        )
+        assert_equal(
+            [s.mccycle for s in sim.walker_steps(list(storage.steps), 0)],
+            [0, 1, 2, 3]
+        )
+        storage.close()
+        os.remove(filename)
+        return summary
+
+    def test_run(self):
+        sim = MultiWalkerPathSampling(storage=None,
+                                      move_scheme=self.scheme,
+                                      sample_sets=self.init_conds)
+        sim.output_stream = open(os.devnull, 'w')
+        sim.run(3)
+        assert_equal(len(sim.walkers), 2)
+        for walker in sim.walkers:
+            assert_equal(walker.step, 3)
+            assert_equal(walker.current_step.simulation, walker)
+            walker.sample_set.sanity_check()
+        assert_equal(sim.step, 3)
+
+    def test_to_dict(self):
+        sim = MultiWalkerPathSampling(storage=None,
+                                      move_scheme=self.scheme,
+                                      sample_sets=self.init_conds,
+                                      steps_per_round=3)
+        reloaded = MultiWalkerPathSampling.from_dict(sim.to_dict())
+        assert_equal(reloaded.steps_per_round, 3)
+        assert_equal(reloaded.walker_id(sim.walkers[1].current_step), 1)
+
+    def test_seeded_run_keeps_random_state(self):
+        sim = MultiWalkerPathSampling(storage=None,
+                                      move_scheme=self.scheme,
+                                      sample_sets=self.init_conds,
+                                      seed=42)
+        sim.output_stream = open(os.devnull, 'w')
+        state = np.random.get_state()
+        sim.run(2)
+        after_run = np.random.random()
+        np.random.set_state(state)
+        assert_equal(after_run, np.random.random())
+
+    def test_parallel_run(self):
+        serial = self._seeded_run(n_workers=None)
+        parallel = self._seeded_run(n_workers=2)
+        assert_equal(len(parallel), 8)
+        assert_equal(sorted(s[:2] for s in parallel),
+                     [(w, n) for w in range(2) for n in range(4)])
+        assert_equal(serial, parallel)
@@ -6,6 +6,7 @@ from openpathsampling.tests.test_helpers import (
     assert_equal_array_array, assert_not_equal_array_array, make_1d_traj,
     assert_items_equal, CalvinistDynamics
 )
+import numpy as np
 import pytest
 
 from openpathsampling.shooting import *
@@ -77,6 +78,43 @@ class TestGaussianBiasSelector(SelectorTest):
         expected = pytest.approx(self.f[frame] / norm)
         assert self.sel.probability(traj[frame], traj) == expected
 
+    def test_biases(self):
+        biases = self.sel._biases(self.mytraj)
+        assert isinstance(biases, np.ndarray)
+        assert list(biases) == pytest.approx(self.f)
+        generic = ShootingPointSelector._biases(self.sel, self.mytraj)
+        assert list(generic) == pytest.approx(self.f)
+
+    def test_sum_bias_cached(self):
+        calls = []
+        cv = paths.FunctionCV("Id2", lambda x: calls.append(x) or
+                              x.xyz[0][0])
+        sel = GaussianBiasSelector(cv, alpha=2.0, l_0=0.25)
+        assert sel.sum_bias(self.mytraj) == pytest.approx(sum(self.f))
+        n_calls = len(calls)
+        for _ in range(10):
+            sel.pick(self.mytraj)
+        sel.probability_ratio(self.mytraj[1], self.mytraj, self.mytraj)
+        assert len(calls) == n_calls
+
+        # a trajectory with more frames is a different entry
+        longer = self.mytraj + make_1d_traj([0.25])
+        assert sel.sum_bias(longer) == pytest.approx(sum(self.f) + 1.0)
+
+        # changing a parameter changes the biases
+        sel.l_0 = 0.0
+        expected = np.exp(-2.0 * self.mytraj.xyz[:, 0, 0] ** 2)
+        assert sel.sum_bias(self.mytraj) == pytest.approx(sum(expected))
+
+    def test_pick_cumulative(self):
+        sel = ShootingPointSelector()
+        sel._biases = lambda traj: np.array([0.0, 1.0, 0.0, 3.0, 0.0])
+        np.random.seed(3)
+        picks = collections.Counter(sel.pick(self.mytraj)
+                                    for _ in range(400))
+        assert set(picks) == {1, 3}
+        assert picks[3] > 2 * picks[1]
+
 
 class TestFirstFrameSelector(SelectorTest):
     def test_pick(self):
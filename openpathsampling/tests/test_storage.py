@@ -6,20 +6,34 @@ from __future__ import absolute_import
 from builtins import zip
 from builtins import range
 from builtins import object
+import gc
+import logging
 import os
+import subprocess
+import sys
+import threading
+from uuid import UUID
 
 import pytest
 
-from nose.tools import (assert_equal)
+from nose.tools import (assert_equal, assert_true, assert_false)
 
 import openpathsampling as paths
 
 import openpathsampling.engines.openmm as peng
 import openpathsampling.engines.toy as toys
 
-from openpathsampling.netcdfplus import ObjectJSON
+from openpathsampling.netcdfplus import ObjectJSON, ByteLRUCache, MaxCache, \
+    StorableObject, estimate_nbytes
+from openpathsampling.netcdfplus.codec import get_codec, json_codec
+from openpathsampling.netcdfplus.writer import IOLock
+from openpathsampling.netcdfplus.stores.object import HashedList, \
+    CompactHashedList
 from openpathsampling.storage import Storage
-from .test_helpers import (data_filename, md, compare_snapshot)
+from openpathsampling.storage.stores.snapshot_wrapper import \
+    ReversalHashedList, CompactReversalHashedList
+from .test_helpers import (data_filename, md, compare_snapshot,
+                           make_1d_traj)
 
 import numpy as np
 from nose.plugins.skip import SkipTest
@@ -405,3 +419,749 @@ class TestStorage(object):
 
         assert(os.path.isfile(self.filename))
         assert(store.storage_version == paths.version.version)
+
+
+class TestWriteBuffer(object):
+    def setup(self):
+        self.filename = data_filename("write_buffer_test.nc")
+        toy_topology = toys.Topology(
+            n_spatial=2,
+            masses=[1.0, 1.0],
+            pes=None
+        )
+        engine = toys.Engine({}, toy_topology)
+        self.traj = paths.Trajectory([
+            toys.Snapshot(
+                coordinates=np.array([[0.1 * i, -0.1 * i]]),
+                velocities=np.array([[1.0, 0.5 * i]]),
+                engine=engine
+            )
+            for i in range(10)
+        ])
+
+    def teardown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def test_buffered_save(self):
+        storage = Storage(filename=self.filename, mode='w')
+        storage.set_write_buffer(100)
+        storage.trajectories.save(self.traj)
+
+        # the rows are only in memory
+        assert_equal(len(storage.variables['trajectories_snapshots']), 0)
+        # but reading through the store writes them first
+        assert_equal(len(storage.trajectories), 1)
+        assert_equal(len(storage.variables['trajectories_snapshots']), 1)
+
+        storage.trajectories.save(self.traj.reversed)
+        storage.sync()
+        assert_equal(len(storage.variables['trajectories_snapshots']), 2)
+        storage.close()
+
+        storage = Storage(filename=self.filename, mode='r')
+        assert_equal(len(storage.trajectories), 2)
+        loaded = storage.trajectories[0]
+        for snap, loaded_snap in zip(self.traj, loaded):
+            np.testing.assert_array_equal(snap.coordinates,
+                                          loaded_snap.coordinates)
+            np.testing.assert_array_equal(snap.velocities,
+                                          loaded_snap.velocities)
+        loaded = storage.trajectories[1]
+        assert_equal(len(loaded), len(self.traj))
+        np.testing.assert_array_equal(loaded[0].velocities,
+                                      -self.traj[-1].velocities)
+        storage.close()
+
+    def test_buffer_flushed_at_threshold(self):
+        storage = Storage(filename=self.filename, mode='w')
+        storage.set_write_buffer(4)
+        for snap in self.traj:
+            storage.snapshots.save(snap)
+        # 10 snapshots: two full buffers have been written, 2 are left
+        n_written = len(storage.variables['snapshots_uuid'])
+        assert_equal(n_written, 8)
+        storage.set_write_buffer(0)
+        assert_equal(len(storage.variables['snapshots_uuid']), 10)
+        storage.close()
+
+
+class TestBackgroundWriter(object):
+    def setup(self):
+        self.filename = data_filename("background_writer_test.nc")
+        toy_topology = toys.Topology(
+            n_spatial=2,
+            masses=[1.0, 1.0],
+            pes=None
+        )
+        engine = toys.Engine({}, toy_topology)
+        self.trajs = [
+            paths.Trajectory([
+                toys.Snapshot(
+                    coordinates=np.array([[0.1 * i + j, -0.1 * i]]),
+                    velocities=np.array([[1.0, 0.5 * i]]),
+                    engine=engine
+                )
+                for i in range(5)
+            ])
+            for j in range(6)
+        ]
+
+    def teardown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def test_save_in_background(self):
+        storage = Storage(filename=self.filename, mode='w')
+        storage.start_background_writer(max_queue=2)
+        assert storage.has_background_writer
+        for traj in self.trajs:
+            storage.save_in_background(traj)
+        storage.sync_all(block=False)
+        storage.sync_all()
+        assert_equal(len(storage.trajectories), len(self.trajs))
+        storage.close()
+        assert not storage.has_background_writer
+
+        storage = Storage(filename=self.filename, mode='r')
+        assert_equal(len(storage.trajectories), len(self.trajs))
+        for traj, loaded in zip(self.trajs, storage.trajectories):
+            for snap, loaded_snap in zip(traj, loaded):
+                np.testing.assert_array_equal(snap.coordinates,
+                                              loaded_snap.coordinates)
+        storage.close()
+
+    def test_error_is_raised(self):
+        storage = Storage(filename=self.filename, mode='w')
+        storage.start_background_writer()
+        # a plain object cannot be stored
+        storage.save_in_background(object())
+        with pytest.raises(Exception):
+            storage.wait_for_writer()
+        # later jobs run normally again
+        storage.save_in_background(self.trajs[0])
+        storage.sync()
+        assert_equal(len(storage.trajectories), 1)
+        storage.close()
+
+    def test_io_lock(self):
+        lock = IOLock()
+        owned = []
+        with lock:
+            with lock:
+                assert_equal(lock.depth, 2)
+            thread = threading.Thread(
+                target=lambda: owned.append(lock.is_owned()))
+            thread.start()
+            thread.join()
+            assert_true(lock.is_owned())
+        assert_equal(owned, [False])
+        assert_equal(lock.is_owned(), False)
+
+    def test_loads_hold_lock(self):
+        storage = Storage(filename=self.filename, mode='w')
+        storage.save(self.trajs[0])
+        storage.trajectories.clear_cache()
+        storage.snapshots.clear_cache()
+        loaded = threading.Event()
+
+        def load():
+            storage.trajectories[0]
+            loaded.set()
+
+        # a load waits while the lock is held, e.g. by the writer
+        with storage.io_lock:
+            thread = threading.Thread(target=load)
+            thread.start()
+            assert_equal(loaded.wait(0.2), False)
+        thread.join()
+        assert_true(loaded.is_set())
+        storage.close()
+
+    def test_load_while_writing(self):
+        storage = Storage(filename=self.filename, mode='w')
+        storage.save(self.trajs[0])
+        storage.start_background_writer(max_queue=2)
+        for traj in self.trajs[1:]:
+            storage.save_in_background(traj)
+            storage.trajectories.clear_cache()
+            storage.snapshots.clear_cache()
+            loaded = storage.trajectories[0]
+            np.testing.assert_array_equal(loaded.xyz, self.trajs[0].xyz)
+        storage.sync()
+        assert_equal(len(storage.trajectories), len(self.trajs))
+        storage.close()
+
+    def test_queue_drained_at_exit(self):
+        # the storage is never closed; the exit handler writes the queue
+        code = "\n".join([
+            "import numpy as np",
+            "import openpathsampling as paths",
+            "import openpathsampling.engines.toy as toys",
+            "topology = toys.Topology(n_spatial=1, masses=[1.0], pes=None)",
+            "engine = toys.Engine({}, topology)",
+            "storage = paths.Storage(%r, 'w')" % self.filename,
+            "storage.start_background_writer(max_queue=2)",
+            "for i in range(5):",
+            "    storage.save_in_background(paths.Trajectory([",
+            "        toys.Snapshot(coordinates=np.array([[float(i)]]),",
+            "                      velocities=np.array([[0.0]]),",
+            "                      engine=engine)]))",
+            "storage.sync_in_background()",
+        ])
+        subprocess.check_call([sys.executable, "-c", code])
+        storage = Storage(filename=self.filename, mode='r')
+        assert_equal(len(storage.trajectories), 5)
+        storage.close()
+
+
+class TestFeatureBlock(object):
+    def setup(self):
+        self.filename = data_filename("feature_block_test.nc")
+        toy_topology = toys.Topology(
+            n_spatial=2,
+            masses=[1.0, 1.0],
+            pes=None
+        )
+        engine = toys.Engine({}, toy_topology)
+        self.coordinates = np.array([[[0.1 * i, -0.1 * i]]
+                                     for i in range(10)])
+        self.velocities = np.array([[[1.0, 0.5 * i]] for i in range(10)])
+        traj = paths.Trajectory([
+            toys.Snapshot(
+                coordinates=coordinates,
+                velocities=velocities,
+                engine=engine
+            )
+            for coordinates, velocities in zip(self.coordinates,
+                                               self.velocities)
+        ])
+        storage = Storage(filename=self.filename, mode='w')
+        storage.save(traj)
+        storage.save(traj.reversed)
+        storage.close()
+        # make sure that no snapshot is left in memory
+        del traj, storage
+        gc.collect()
+        self.storage = Storage(filename=self.filename, mode='r')
+
+    def teardown(self):
+        self.storage.close()
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def test_load_feature_block(self):
+        snapshots = self.storage.snapshots
+        traj = self.storage.trajectories[0]
+        frames = [7, 0, 1, 2, 7]
+        indices = [snapshots.index[traj.get_as_proxy(i).__uuid__]
+                   for i in frames]
+        indices.append(indices[3] ^ 1)  # frame 2 reversed
+        coordinates = snapshots.load_feature_block('coordinates', indices)
+        velocities = snapshots.load_feature_block('velocities', indices)
+        assert_equal(coordinates.shape, (6, 1, 2))
+        np.testing.assert_allclose(coordinates,
+                                   self.coordinates[frames + [2]], rtol=1e-6)
+        np.testing.assert_allclose(velocities[:5], self.velocities[frames],
+                                   rtol=1e-6)
+        np.testing.assert_allclose(velocities[5], -self.velocities[2],
+                                   rtol=1e-6)
+
+    def test_trajectory_attributes(self):
+        forward, backward = self.storage.trajectories[:]
+        # attribute access does not load the snapshots
+        np.testing.assert_allclose(forward.xyz, self.coordinates, rtol=1e-6)
+        assert all(proxy._subject is None for proxy in forward.as_proxies())
+
+        items = ['xyz', 'coordinates', 'velocities']
+        blocks = [forward._load_feature_block(item) for item in items]
+        for item, block in zip(items, blocks):
+            assert_equal(block.shape, (10, 1, 2))
+            np.testing.assert_array_equal(getattr(forward, item), block)
+
+        # loading the snapshots gives the same
+        for item, block in zip(items, blocks):
+            np.testing.assert_array_equal(
+                block, np.array([getattr(snap, item) for snap in forward]))
+
+        np.testing.assert_allclose(backward.xyz, self.coordinates[::-1],
+                                   rtol=1e-6)
+        np.testing.assert_allclose(backward.velocities,
+                                   -self.velocities[::-1], rtol=1e-6)
+
+    def test_unstored_frames(self):
+        forward = self.storage.trajectories[0]
+        snap = toys.Snapshot(coordinates=np.array([[5.0, 5.0]]),
+                             velocities=np.array([[0.0, 0.0]]))
+        mixed = paths.Trajectory(forward.as_proxies()[:3] + [snap])
+        assert_equal(mixed._load_feature_block('xyz'), None)
+        np.testing.assert_allclose(
+            mixed.xyz, list(self.coordinates[:3]) + [snap.xyz], rtol=1e-6)
+        # the first frames are in memory now
+        assert_equal(forward._load_feature_block('xyz'), None)
+
+
+def run_toy_tps(filename, cv, n_steps):
+    state_A = paths.CVDefinedVolume(cv, float("-inf"), 0.0)
+    state_B = paths.CVDefinedVolume(cv, 1.0, float("inf"))
+    pes = toys.LinearSlope([0, 0, 0], 0)
+    integ = toys.LangevinBAOABIntegrator(0.01, 0.1, 2.5)
+    topology = toys.Topology(n_spatial=3, masses=[1.0], pes=pes)
+    engine = toys.Engine(options={'integ': integ}, topology=topology)
+    network = paths.TPSNetwork(state_A, state_B)
+    scheme = paths.OneWayShootingMoveScheme(
+        network=network,
+        selector=paths.UniformSelector(),
+        engine=engine
+    )
+    init_traj = make_1d_traj([-0.1, 0.2, 0.5, 0.8, 1.1])
+    init_cond = scheme.initial_conditions_from_trajectories(init_traj)
+
+    storage = Storage(filename, 'w')
+    sim = paths.PathSampling(storage=storage, move_scheme=scheme,
+                             sample_set=init_cond)
+    sim.output_stream = open(os.devnull, 'w')
+    sim.run(n_steps)
+    storage.close()
+
+
+class TestAnalysisArrays(object):
+    def setup(self):
+        self.filename = data_filename("analysis_arrays_test.nc")
+        self.cv = paths.FunctionCV(
+            "x", lambda x: x.xyz[0][0], cv_time_reversible=True
+        ).with_diskcache()
+        run_toy_tps(self.filename, self.cv, 5)
+
+    def teardown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def test_lazy_analysis_storage(self):
+        storage = paths.AnalysisStorage(self.filename, lazy=True)
+        assert_equal(len(storage.trajectories.cache), 0)
+        arrays = storage.arrays
+        assert_equal(len(arrays.step_mccycle), 6)
+        assert_equal(list(arrays.step_mccycle), list(range(6)))
+
+        step_active = arrays.step_active[:]
+        sample_trajectory = arrays.sample_trajectory[:]
+        for step_idx, step in enumerate(storage.steps):
+            assert_equal(step_active[step_idx],
+                         storage.samplesets.index[step.active.__uuid__])
+            sample_idxs = arrays.sampleset_samples[step_active[step_idx]]
+            assert_equal(
+                list(sample_idxs),
+                [storage.samples.index[s.__uuid__] for s in step.active]
+            )
+            for sample_idx, sample in zip(sample_idxs, step.active):
+                assert_equal(arrays.sample_replica[sample_idx],
+                             sample.replica)
+                traj_idx = sample_trajectory[sample_idx]
+                assert_equal(
+                    traj_idx,
+                    storage.trajectories.index[sample.trajectory.__uuid__]
+                )
+                snapshots = arrays.trajectory_snapshots[traj_idx]
+                assert_equal(
+                    list(snapshots),
+                    [storage.snapshots.index[snap.__uuid__]
+                     for snap in sample.trajectory.as_proxies()]
+                )
+                cv = storage.cvs[self.cv.name]
+                np.testing.assert_allclose(
+                    arrays.cv_values(cv, snapshots),
+                    [snap.xyz[0][0] for snap in sample.trajectory],
+                    rtol=1e-6
+                )
+        storage.close()
+
+    def test_lazy_array(self):
+        storage = Storage(self.filename, 'r')
+        replicas = storage.arrays.sample_replica
+        assert_equal(replicas.shape, (len(storage.samples),))
+        values = np.asarray(replicas)
+        np.testing.assert_array_equal(replicas[::2], values[::2])
+        np.testing.assert_array_equal(replicas[[3, 0, 3]], values[[3, 0, 3]])
+        np.testing.assert_array_equal(replicas[values == 0],
+                                      values[values == 0])
+        assert_equal(replicas[-1], values[-1])
+        assert_equal(list(replicas), list(values))
+        storage.close()
+
+
+class TestStepIndex(object):
+    def setup(self):
+        self.filename = data_filename("step_index_test.nc")
+        self.cv = paths.FunctionCV("x", lambda x: x.xyz[0][0])
+        run_toy_tps(self.filename, self.cv, 10)
+        self.storage = paths.AnalysisStorage(self.filename)
+        self.steps = list(self.storage.steps)
+        self.index = self.storage.step_index()
+
+    def teardown(self):
+        self.storage.close()
+        for filename in [self.filename,
+                         paths.storage.StepIndex.cache_filename(self.storage)]:
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+    def test_tables(self):
+        index = self.index
+        assert_equal(len(index), len(self.steps))
+        assert_equal(list(index.mccycle), [s.mccycle for s in self.steps])
+        assert_equal(list(index.accepted),
+                     [s.change.accepted for s in self.steps])
+        pathmovers = self.storage.pathmovers
+        for step, mover in zip(self.steps, index.canonical_mover):
+            canonical = step.change.canonical.mover
+            assert_equal(mover, pathmovers.index[canonical.__uuid__]
+                         if canonical is not None else -1)
+
+        trajectories = self.storage.trajectories
+        for step, row in zip(self.steps, index.replica_trajectory):
+            sample = step.active[0]
+            assert_equal(row[index.replica_column(0)],
+                         trajectories.index[sample.trajectory.__uuid__])
+            col = index.ensemble_column(sample.ensemble)
+            assert_equal(index.ensemble_replica[step.mccycle, col], 0)
+
+        assert_equal(index[3], self.steps[3])
+        assert_equal(len(index[2:5]), 3)
+        assert_equal(list(index[2:5].mccycle), [2, 3, 4])
+
+    def test_cache(self):
+        filename = paths.storage.StepIndex.cache_filename(self.storage)
+        # only cached on request
+        assert_false(os.path.isfile(filename))
+        self.storage.step_index(cache=True)
+        assert_true(os.path.isfile(filename))
+        cached = self.storage.step_index(cache=True)
+        for name in ['steps', 'change', 'accepted', 'ensemble_trajectory',
+                     'change_accepted']:
+            np.testing.assert_array_equal(getattr(cached, name),
+                                          getattr(self.index, name))
+        for sub, cached_sub in zip(self.index.change_subchanges,
+                                   cached.change_subchanges):
+            np.testing.assert_array_equal(sub, cached_sub)
+
+    def test_weighted_trajectories(self):
+        from openpathsampling.analysis.tis.core import \
+            steps_to_weighted_trajectories
+        ensembles = self.storage.schemes[0].network.sampling_ensembles
+        assert_equal(
+            steps_to_weighted_trajectories(self.index[1:], ensembles),
+            steps_to_weighted_trajectories(self.steps[1:], ensembles)
+        )
+
+    def test_move_acceptance(self):
+        from openpathsampling.high_level.move_scheme import \
+            MoveAcceptanceAnalysis
+        scheme = self.storage.schemes[0]
+        from_index = MoveAcceptanceAnalysis(scheme).add_steps(self.index)
+        from_steps = MoveAcceptanceAnalysis(scheme).add_steps(self.steps)
+        assert_equal(dict(from_index._trials), dict(from_steps._trials))
+        assert_equal(dict(from_index._accepted), dict(from_steps._accepted))
+
+    def test_replica_network(self):
+        scheme = self.storage.schemes[0]
+        from_index = paths.ReplicaNetwork(scheme, self.index)
+        from_steps = paths.ReplicaNetwork(scheme, self.steps)
+        assert_equal(from_index.traces, from_steps.traces)
+        assert_equal(from_index.analysis, from_steps.analysis)
+
+    def test_channel_analysis(self):
+        channels = {
+            'low': paths.AllInXEnsemble(
+                paths.CVDefinedVolume(self.cv, -1.0, 0.6))
+        }
+        from_index = paths.ChannelAnalysis(self.index, channels)
+        from_steps = paths.ChannelAnalysis(self.steps, channels)
+        assert_equal(from_index._results, from_steps._results)
+
+
+class TestByteLRUCache(object):
+    def setup(self):
+        self.snapshots = [toys.Snapshot(coordinates=np.zeros((100, 3)),
+                                        velocities=np.zeros((100, 3)))
+                          for _ in range(5)]
+        self.nbytes = estimate_nbytes(self.snapshots[0])
+
+    def test_estimate_nbytes(self):
+        assert_true(self.nbytes > 2 * 100 * 3 * 8)
+        large = toys.Snapshot(coordinates=np.zeros((1000, 3)),
+                              velocities=np.zeros((1000, 3)))
+        assert_true(estimate_nbytes(large) > 9 * self.nbytes)
+
+    def test_budget(self):
+        cache = ByteLRUCache(int(2.5 * self.nbytes))
+        for idx, snap in enumerate(self.snapshots):
+            cache[idx] = snap
+        assert_equal(cache.count, (2, 3))
+        assert_equal(list(cache._cache.keys()), [3, 4])
+        assert_true(cache.nbytes <= cache.max_bytes)
+        assert_equal(cache.stats.evictions, 3)
+
+        # weak references are moved back into the LRU part
+        assert_true(cache[0] is self.snapshots[0])
+        assert_equal(list(cache._cache.keys()), [4, 0])
+        assert_equal(cache.stats.hits, 1)
+        assert_equal(cache.get(5), None)
+        assert_equal(cache.stats.misses, 1)
+
+        cache.max_bytes = self.nbytes
+        assert_equal(cache.count[0], 1)
+
+    def test_storage_budget(self):
+        filename = data_filename("cache_budget_test.nc")
+        storage = Storage(filename, 'w')
+        storage.set_cache_budget(2 ** 20)
+        assert_true(isinstance(storage.snapshots.cache, ByteLRUCache))
+        assert_true(isinstance(storage.cvs.cache, MaxCache))
+        storage.save(make_1d_traj([0.1, 0.2, 0.3]))
+        stats = storage.cache_stats()['snapshots']
+        hits = stats.hits
+        storage.snapshots[0]
+        assert_equal(stats.hits, hits + 1)
+        storage.close()
+        os.remove(filename)
+
+
+class TestStorageStats(object):
+    def setup(self):
+        self.filename = data_filename("storage_stats_test.nc")
+        self.cv = paths.FunctionCV("x", lambda x: x.xyz[0][0])
+        self.storage = Storage(self.filename, 'w')
+        self.storage.save(self.cv)
+        self.storage.enable_stats()
+
+    def teardown(self):
+        self.storage.close()
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def test_counts(self):
+        traj = make_1d_traj([0.1, 0.2, 0.3])
+        self.storage.save(traj)
+        self.cv(traj)
+        self.cv(traj)
+        stats = self.storage.stats()
+        assert_equal(stats['cvs']['x']['eval']['hits'], 3)
+        assert_equal(stats['cvs']['x']['cache']['hits'], 3)
+        assert_equal(stats['cvs']['x']['cache']['misses'], 3)
+
+        store = self.storage.trajectories
+        store.clear_cache()
+        store[0]
+        store[0]
+        assert_equal(store.stats.misses, 1)
+        assert_equal(store.stats.hits, 1)
+        assert_true('trajectories' in self.storage.stats_report())
+
+        self.storage.disable_stats()
+        assert_equal(store.stats, None)
+        assert_equal(self.cv.chain_stats, None)
+        assert_equal(self.storage.stats(), {'stores': {}, 'cvs': {}})
+
+    def test_log_stats(self):
+        records = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                records.append(record)
+
+        handler = Handler()
+        stats_logger = logging.getLogger('openpathsampling.storage.stats')
+        stats_logger.addHandler(handler)
+        stats_logger.setLevel(logging.INFO)
+        try:
+            traj = make_1d_traj([0.1, 0.2])
+            self.cv(traj)
+            self.storage.log_stats(1)
+            self.cv(traj)
+            self.storage.log_stats(2)
+        finally:
+            stats_logger.removeHandler(handler)
+
+        assert_equal([r.stats['mccycle'] for r in records], [1, 2])
+        assert_equal(records[0].stats['cvs']['x']['eval']['hits'], 2)
+        assert_equal(records[1].stats['cvs']['x']['eval']['hits'], 0)
+        assert_equal(records[1].stats['cvs']['x']['cache']['hits'], 2)
+
+
+class TestCompactHashedList(object):
+    def setup(self):
+        self.keys = [StorableObject.get_uuid() for _ in range(200)]
+
+    def _compare(self, index, compact):
+        assert_equal(len(index), len(compact))
+        assert_equal(index.list, compact.list)
+        for pos in range(len(index)):
+            assert_equal(index.index(pos), compact.index(pos))
+
+    def test_like_hashed_list(self):
+        index = HashedList()
+        compact = CompactHashedList()
+        for idx in [index, compact]:
+            idx.extend(self.keys[:150])
+            for key in self.keys[150:180]:
+                idx.append(key)
+
+        self._compare(index, compact)
+        for key in self.keys[:180]:
+            assert_equal(index[key], compact[key])
+        for key in self.keys[180:]:
+            assert_true(key not in compact)
+            assert_equal(compact.get(key), None)
+
+        compact.mark(self.keys[190])
+        assert_equal(compact[self.keys[190]], -2)
+        compact.unmark(self.keys[190])
+        assert_true(self.keys[190] not in compact)
+
+        # a failed save removes the last entry again
+        compact.append(self.keys[190])
+        del compact[self.keys[190]]
+        assert_equal(len(compact), 180)
+        assert_true(self.keys[190] not in compact)
+
+    def test_setitem(self):
+        index = HashedList()
+        compact = CompactHashedList()
+        for idx in [index, compact]:
+            idx.extend(self.keys[:100])
+            # move a key to a new position, then replace another key
+            idx[self.keys[5]] = 7
+            idx[self.keys[150]] = 20
+
+        assert_equal(compact[self.keys[5]], 7)
+        assert_equal(compact[self.keys[150]], 20)
+        for key in [self.keys[7], self.keys[20]]:
+            assert_true(key not in compact)
+        for key in self.keys[21:100]:
+            assert_equal(index[key], compact[key])
+        assert_equal(compact.list[7], self.keys[5])
+
+        with pytest.raises(IndexError):
+            compact[self.keys[160]] = 101
+        assert_equal(len(compact), 100)
+        assert_true(self.keys[160] not in compact)
+
+    def test_reversal(self):
+        index = ReversalHashedList()
+        compact = CompactReversalHashedList()
+        for idx in [index, compact]:
+            idx.extend(self.keys[:100])
+            idx.append(self.keys[100] | 1)
+
+        self._compare(index, compact)
+        for key in self.keys[:101]:
+            assert_equal(index[key], compact[key])
+            assert_equal(index[key ^ 1], compact[key ^ 1])
+
+    def test_extend_strings(self):
+        compact = CompactReversalHashedList()
+        compact.extend_strings([str(UUID(int=key)) for key in self.keys])
+        assert_equal(compact.list, self.keys)
+        assert_equal(compact[self.keys[10] | 1], 21)
+        assert_true(compact.nbytes < 40 * len(self.keys))
+
+    def test_storage(self):
+        filename = data_filename("compact_index_test.nc")
+        traj = make_1d_traj([0.1, 0.2, 0.3])
+        storage = Storage(filename, 'w')
+        storage.save(traj)
+        storage.close()
+
+        storage = Storage(filename, 'r')
+        assert_true(isinstance(storage.snapshots.index,
+                               CompactReversalHashedList))
+        for idx, snap in enumerate(traj):
+            assert_equal(storage.snapshots.index[snap.__uuid__], 2 * idx)
+            assert_equal(storage.snapshots.index[snap.reversed.__uuid__],
+                         2 * idx + 1)
+        assert_equal(storage.trajectories.index[traj.__uuid__], 0)
+        assert_equal([s.xyz[0][0] for s in storage.trajectories[0]],
+                     [0.1, 0.2, 0.3])
+        storage.close()
+        os.remove(filename)
+
+
+class TestCodec(object):
+    def setup(self):
+        pytest.importorskip('msgpack')
+        self.filename = data_filename("codec_test.nc")
+        self.simplifier = ObjectJSON()
+        self.obj = {
+            'array': np.arange(12, dtype=np.float32).reshape(3, 4),
+            'list': [1, 2.5, 'a'],
+            'tuple': (1, None),
+            2: 'int key'
+        }
+
+    def teardown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def _assert_loaded(self, loaded):
+        np.testing.assert_array_equal(loaded['array'], self.obj['array'])
+        assert_equal(loaded['array'].dtype, np.float32)
+        assert_equal(loaded['list'], self.obj['list'])
+        assert_equal(loaded['tuple'], self.obj['tuple'])
+
+    def test_get_codec(self):
+        assert_true(get_codec(None) is json_codec)
+        assert_true(get_codec('json') is json_codec)
+        assert_true(get_codec(json_codec) is json_codec)
+        assert_true(get_codec('msgpack').binary)
+        with pytest.raises(ValueError):
+            get_codec('unknown')
+
+    def test_dumps_loads(self):
+        data = self.simplifier.dumps(self.obj, 'msgpack')
+        assert_true(isinstance(data, bytes))
+        # the array is stored as raw buffer, not as base64
+        assert_true(self.obj['array'].tobytes() in data)
+        loaded = self.simplifier.loads(data, 'msgpack')
+        self._assert_loaded(loaded)
+        # integer keys survive msgpack, but not JSON
+        assert_equal(loaded[2], 'int key')
+
+        json_str = self.simplifier.to_json(self.obj)
+        assert_true(len(data) < len(json_str))
+        loaded = self.simplifier.from_json(json_str)
+        self._assert_loaded(loaded)
+        assert_equal(loaded['2'], 'int key')
+
+    def test_storage(self):
+        traj = make_1d_traj([0.1, 0.2, 0.3])
+        storage = Storage(self.filename, 'w', codec='msgpack')
+        storage.save(traj)
+        storage.tag['obj'] = self.obj
+        storage.close()
+
+        storage = Storage(self.filename, 'r')
+        assert_equal(storage.codec.name, 'msgpack')
+        assert_equal(storage.variables['tag_json'].codec, 'msgpack')
+        self._assert_loaded(storage.tag['obj'])
+        assert_equal([s.xyz[0][0] for s in storage.trajectories[0]],
+                     [0.1, 0.2, 0.3])
+        assert_equal(storage.repr_json(storage.trajectories[0]), None)
+        storage.close()
+
+    def test_append_to_json_storage(self):
+        storage = Storage(self.filename, 'w')
+        storage.tag['json'] = self.obj
+        storage.close()
+
+        # existing variables keep their codec
+        storage = Storage(self.filename, 'a', codec='msgpack')
+        assert_true(not hasattr(storage.variables['tag_json'], 'codec'))
+        storage.tag['more'] = self.obj
+        storage.close()
+
+        storage = Storage(self.filename, 'r')
+        assert_equal(storage.codec.name, 'json')
+        self._assert_loaded(storage.tag['json'])
+        self._assert_loaded(storage.tag['more'])
+        storage.close()
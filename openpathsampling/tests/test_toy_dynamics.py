@@ -130,6 +130,40 @@ class TestCombinations(object):
         assert_almost_equal(self.simpletest.kinetic_energy(self), 0.4575)
 
 
+class TestBatchedPES(object):
+    def setup(self):
+        self.positions = np.array([init_pos, [0.1, -0.2], [0.9, 0.5]])
+        self.velocities = np.array([init_vel, [0.2, 0.1], [-0.3, 0.4]])
+        self.mass = sys_mass
+        self.pes = gaussian + outer - linear + harmonic
+
+    def _single(self, idx):
+        single = TestBatchedPES()
+        single.positions = self.positions[idx]
+        single.velocities = self.velocities[idx]
+        single.mass = self.mass
+        return single
+
+    def test_V(self):
+        batch_V = self.pes.V(self)
+        assert_equal(batch_V.shape, (3,))
+        for idx in range(3):
+            assert_almost_equal(batch_V[idx], self.pes.V(self._single(idx)))
+
+    def test_dVdx(self):
+        batch_dVdx = self.pes.dVdx(self)
+        assert_equal(batch_dVdx.shape, (3, 2))
+        for idx in range(3):
+            np.testing.assert_allclose(batch_dVdx[idx],
+                                       self.pes.dVdx(self._single(idx)))
+
+    def test_kinetic_energy(self):
+        batch_KE = self.pes.kinetic_energy(self)
+        for idx in range(3):
+            assert_almost_equal(batch_KE[idx],
+                                self.pes.kinetic_energy(self._single(idx)))
+
+
 # === TESTS FOR TOY ENGINE OBJECT =========================================
 
 class Test_convert_fcn(object):
@@ -233,12 +267,104 @@ class TestToyEngine(object):
             assert_items_equal(s1.coordinates[0], s2.coordinates[0])
             assert_items_equal(s1.velocities[0], s2.velocities[0])
 
+    def test_generate_n_frames_until(self):
+        self.sim.initialized = True
+        orig = self.sim.current_snapshot.copy()
+        frames = self.sim.generate_n_frames_until(5, lambda frames: 2)
+        assert_equal(len(frames), 3)
+        # the engine continues from the stopping frame
+        assert_items_equal(self.sim.current_snapshot.coordinates[0],
+                           frames[-1].coordinates[0])
+        self.sim.current_snapshot = orig
+        single = self.sim.generate_n_frames(3)
+        for (s1, s2) in zip(frames, single):
+            np.testing.assert_allclose(s1.coordinates, s2.coordinates)
+            np.testing.assert_allclose(s1.velocities, s2.velocities)
+
+    def test_generate_chunked(self):
+        self.sim.options['n_frames_max'] = 100
+        cv = paths.FunctionCV("x", lambda snap: snap.xyz[0][0])
+        ens = paths.AllInXEnsemble(paths.CVDefinedVolume(cv, -1.0, 0.15))
+        for direction in [+1, -1]:
+            for snap in self._batch_snapshots():
+                self.sim.options['n_frames_chunk'] = 1
+                single = self.sim.generate(snap, [ens.can_append],
+                                           direction=direction)
+                self.sim.options['n_frames_chunk'] = 7
+                chunked = self.sim.generate(snap, [ens.can_append],
+                                            direction=direction)
+                assert_equal(len(chunked), len(single))
+                for (s1, s2) in zip(chunked, single):
+                    np.testing.assert_allclose(s1.coordinates,
+                                               s2.coordinates)
+                    np.testing.assert_allclose(s1.velocities,
+                                               s2.velocities)
+
+    def test_generate_chunked_max_length(self):
+        self.sim.options['n_frames_chunk'] = 3
+        self.sim.options['on_max_length'] = 'stop'
+        traj = self.sim.generate(self.sim.current_snapshot, [true_func])
+        assert_equal(len(traj), self.sim.n_frames_max)
+
     def test_start_with_snapshot(self):
         snap = toy.Snapshot(coordinates=np.array([1,2]),
                         velocities=np.array([3,4]))
         self.sim.start(snapshot=snap)
         self.sim.stop([snap])
 
+    def _batch_snapshots(self):
+        return [
+            toy.Snapshot(coordinates=np.array([[x, 0.0]]),
+                         velocities=np.array([[1.0, 0.5]]),
+                         engine=self.sim)
+            for x in [0.0, 0.05, 0.12]
+        ]
+
+    def test_generate_batch(self):
+        self.sim.options['n_frames_max'] = 100
+        cv = paths.FunctionCV("x", lambda snap: snap.xyz[0][0])
+        ens = paths.AllInXEnsemble(paths.CVDefinedVolume(cv, -1.0, 0.15))
+        snapshots = self._batch_snapshots()
+        batch = self.sim.generate_batch(snapshots, [ens.can_append])
+        assert_equal(len(batch), len(snapshots))
+        # walkers drop out at different times
+        assert_equal(len(set(len(traj) for traj in batch)), 3)
+        for snap, traj in zip(snapshots, batch):
+            single = self.sim.generate(snap, [ens.can_append])
+            assert_equal(traj[0], snap)
+            assert_equal(len(traj), len(single))
+            for (s1, s2) in zip(traj, single):
+                np.testing.assert_allclose(s1.coordinates, s2.coordinates)
+                np.testing.assert_allclose(s1.velocities, s2.velocities)
+
+    def test_generate_batch_backward(self):
+        ens = paths.LengthEnsemble(4)
+        snapshots = self._batch_snapshots()
+        batch = self.sim.generate_batch(snapshots, [ens.can_prepend],
+                                        direction=-1)
+        for snap, traj in zip(snapshots, batch):
+            single = self.sim.generate(snap, [ens.can_prepend],
+                                       direction=-1)
+            assert_equal(len(traj), 4)
+            assert_equal(traj[-1], snap)
+            for (s1, s2) in zip(traj, single):
+                np.testing.assert_allclose(s1.coordinates, s2.coordinates)
+                np.testing.assert_allclose(s1.velocities, s2.velocities)
+
+    def test_generate_batch_max_length(self):
+        snapshots = self._batch_snapshots()
+        try:
+            self.sim.generate_batch(snapshots, [true_func])
+        except paths.engines.EngineMaxLengthError as e:
+            assert_equal(len(e.last_trajectory), self.sim.n_frames_max)
+        else:
+            raise RuntimeError('Did not raise MaxLength Error')
+
+        self.sim.options['on_max_length'] = 'stop'
+        batch = self.sim.generate_batch(snapshots, [true_func])
+        assert_equal([len(traj) for traj in batch],
+                     [self.sim.n_frames_max] * len(snapshots))
+
 
 # === TESTS FOR TOY INTEGRATORS ===========================================
 
@@ -362,6 +362,58 @@ class TestCVRangeVolumePeriodic(object):
                      volume.PeriodicCVDefinedVolume(op_id, -100, 75))
 
 
+class TestEvaluateTrajectory(object):
+    def setup(self):
+        self.values = [-1.0, -0.75, -0.5, -0.3, 0.0, 0.25, 0.3, 0.5, 0.75,
+                       1.0, float('nan')]
+        self.values_periodic = [-400.0, -200.0, -180.0, -100.0, -60.0, 0.0,
+                                60.0, 75.0, 100.0, 179.0, 180.0, 250.0,
+                                500.0]
+
+    def _check(self, vol, values):
+        result = vol.evaluate_trajectory(values)
+        assert_equal(result.dtype, bool)
+        assert_equal(list(result), [vol(value) for value in values])
+
+    def test_cv_defined_volume(self):
+        for vol in [volA, volB, volC, volD,
+                    volume.CVDefinedVolume(op_id, float('-inf'), 0.0),
+                    volume.CVDefinedVolume(op_id, 0.0, float('inf'))]:
+            self._check(vol, self.values)
+
+    def test_combinations(self):
+        for vol in [volA | volA2, volA & volA2, volA ^ volA2, volA - volA2,
+                    ~volA, ~volA | (volB & volA2),
+                    volume.EmptyVolume(), volume.FullVolume()]:
+            self._check(vol, self.values[:-1])
+
+    def test_periodic_volume(self):
+        vols = [
+            volume.PeriodicCVDefinedVolume(op_id, -150, 70, -180, 180),
+            volume.PeriodicCVDefinedVolume(op_id, 70, -150, -180, 180),
+            volume.PeriodicCVDefinedVolume(op_id, 150, 250, -180, 180),
+            volume.PeriodicCVDefinedVolume(op_id, -180, 180, -180, 180),
+            volume.PeriodicCVDefinedVolume(op_id, -100, 75),
+            volume.PeriodicCVDefinedVolume(op_id, 75, -100)
+        ]
+        for vol in vols:
+            self._check(vol, self.values_periodic)
+
+    def test_short_circuit(self):
+        # the second volume is only evaluated where it is needed
+        calls = []
+
+        class Recorder(CallIdentity):
+            def __call__(self, value):
+                calls.append(value)
+                return value
+
+        vol2 = volume.CVDefinedVolume(Recorder(), -0.5, 0.5)
+        result = (volB | vol2).evaluate_trajectory([0.0, 0.3, 0.6])
+        assert_equal(list(result), [True, True, True])
+        assert_equal(calls, [[0.0]])
+
+
 class TestAbstract(object):
     @raises_with_message_like(TypeError, "Can't instantiate abstract class")
     def test_abstract_volume(self):
@@ -2,36 +2,33 @@ import sys
 import os
 import hashlib
 
-try:
-    import IPython
-    import IPython.display
-
-    def in_ipynb():
-        try:
-            ipython = get_ipython()
-
-            import IPython.terminal.interactiveshell
-            import ipykernel.zmqshell
-
-            if isinstance(ipython, IPython.terminal.interactiveshell.TerminalInteractiveShell):
-                # we are running inside an IPYTHON console
-                return False
-            elif isinstance(ipython, ipykernel.zmqshell.ZMQInteractiveShell):
-                # we run in an IPYTHON notebook
-                return True
-            else:
-                return False
-        except NameError:
-            # No IPYTHON
+
+def in_ipynb():
+    # IPython is always imported if we run inside of it, so there is no
+    # need for the slow import otherwise
+    if 'IPython' not in sys.modules:
+        return False
+
+    try:
+        import IPython
+        ipython = IPython.get_ipython()
+
+        import IPython.terminal.interactiveshell
+        import ipykernel.zmqshell
+
+        if isinstance(ipython, IPython.terminal.interactiveshell.TerminalInteractiveShell):
+            # we are running inside an IPYTHON console
             return False
-        except:
-            # No idea, but we should not fail because of that
+        elif isinstance(ipython, ipykernel.zmqshell.ZMQInteractiveShell):
+            # we run in an IPYTHON notebook
+            return True
+        else:
             return False
+    except:
+        # No idea, but we should not fail because of that
+        return False
 
-    is_ipynb = in_ipynb()
-
-except ImportError:
-    is_ipynb = False
+is_ipynb = in_ipynb()
 
 last_output = None
 
@@ -49,6 +46,7 @@ def refresh_output(output_str, print_anyway=True, refresh=True,
 
     if refresh:
         if is_ipynb:
+            import IPython.display
             IPython.display.clear_output(wait=True)
         elif output_stream is sys.stdout:
             if last_output is not None:
@@ -6,10 +6,19 @@ Created on 03.09.2014
 
 from . import range_logic
 import abc
+import numpy as np
 from openpathsampling.netcdfplus import StorableNamedObject
 
 # TODO: Make Full and Empty be Singletons to avoid storing them several times!
 
+def _frames(trajectory):
+    """The frames of a trajectory (as proxies, if possible) in a list"""
+    try:
+        return trajectory.as_proxies()
+    except AttributeError:
+        return list(trajectory)
+
+
 def join_volumes(volume_list, name=None):
     """
     Make the union of a list of volumes. (Useful shortcut.)
@@ -58,6 +67,27 @@ class Volume(StorableNamedObject):
         '''
         return False # pragma: no cover
 
+    def evaluate_trajectory(self, trajectory):
+        """
+        Test all frames of a trajectory at once.
+
+        Volumes that are based on collective variables evaluate the CV for
+        the whole trajectory in one call and combine the results with
+        array operations; the default tests frame by frame.
+
+        Parameters
+        ----------
+        trajectory : :class:`.Trajectory` or list of :class:`.BaseSnapshot`
+            the frames to test
+
+        Returns
+        -------
+        np.ndarray of bool
+            for each frame, `True` if it is in the volume
+        """
+        return np.array([self(frame) for frame in _frames(trajectory)],
+                        dtype=bool)
+
     def __str__(self):
         '''
         Returns a string representation of the volume
@@ -123,12 +153,15 @@ class VolumeCombination(Volume):
     This should be treated as an abstract class. For storage purposes, use
     specific subclasses in practice.
     """
-    def __init__(self, volume1, volume2, fnc, str_fnc):
+    def __init__(self, volume1, volume2, fnc, str_fnc, array_fnc=None):
         super(VolumeCombination, self).__init__()
         self.volume1 = volume1
         self.volume2 = volume2
         self.fnc = fnc
         self.sfnc = str_fnc
+        if array_fnc is None:
+            array_fnc = np.vectorize(fnc, otypes=[bool])
+        self.array_fnc = array_fnc
 
     def __call__(self, snapshot):
         # short circuit following JHP's implementation in ensemble.py
@@ -143,6 +176,21 @@ class VolumeCombination(Volume):
         #return self.fnc(self.volume1.__call__(snapshot),
                         #self.volume2.__call__(snapshot))
 
+    def evaluate_trajectory(self, trajectory):
+        frames = _frames(trajectory)
+        a = self.volume1.evaluate_trajectory(frames)
+        res_true = self.array_fnc(a, True)
+        res_false = self.array_fnc(a, False)
+        # as in __call__, the second volume is only tested for the frames
+        # where the result depends on it
+        undecided = np.flatnonzero(res_true != res_false)
+        if len(undecided) == 0:
+            return res_true
+        result = res_true
+        b = self.volume2.evaluate_trajectory([frames[i] for i in undecided])
+        result[undecided] = self.array_fnc(a[undecided], b)
+        return result
+
     def __str__(self):
         return '(' + self.sfnc.format(str(self.volume1), str(self.volume2)) + ')'
 
@@ -157,7 +205,8 @@ class UnionVolume(VolumeCombination):
             volume1=volume1,
             volume2=volume2,
             fnc=lambda a, b: a or b,
-            str_fnc='{0} or {1}'
+            str_fnc='{0} or {1}',
+            array_fnc=np.logical_or
         )
 
 
@@ -168,7 +217,8 @@ class IntersectionVolume(VolumeCombination):
             volume1=volume1,
             volume2=volume2,
             fnc=lambda a, b: a and b,
-            str_fnc='{0} and {1}'
+            str_fnc='{0} and {1}',
+            array_fnc=np.logical_and
         )
 
 
@@ -179,7 +229,8 @@ class SymmetricDifferenceVolume(VolumeCombination):
             volume1=volume1,
             volume2=volume2,
             fnc=lambda a, b: a ^ b,
-            str_fnc='{0} xor {1}'
+            str_fnc='{0} xor {1}',
+            array_fnc=np.logical_xor
         )
 
 
@@ -190,7 +241,8 @@ class RelativeComplementVolume(VolumeCombination):
             volume1=volume1,
             volume2=volume2,
             fnc=lambda a, b: a and not b,
-            str_fnc='{0} and not {1}'
+            str_fnc='{0} and not {1}',
+            array_fnc=lambda a, b: np.logical_and(a, np.logical_not(b))
         )
 
 
@@ -203,6 +255,9 @@ class NegatedVolume(Volume):
     def __call__(self, snapshot):
         return not self.volume(snapshot)
 
+    def evaluate_trajectory(self, trajectory):
+        return np.logical_not(self.volume.evaluate_trajectory(trajectory))
+
     def __str__(self):
         return '(not ' + str(self.volume) + ')'
 
@@ -215,6 +270,9 @@ class EmptyVolume(Volume):
     def __call__(self, snapshot):
         return False
 
+    def evaluate_trajectory(self, trajectory):
+        return np.zeros(len(trajectory), dtype=bool)
+
     def __and__(self, other):
         return self
 
@@ -242,6 +300,9 @@ class FullVolume(Volume):
     def __call__(self, snapshot):
         return True
 
+    def evaluate_trajectory(self, trajectory):
+        return np.ones(len(trajectory), dtype=bool)
+
     def __invert__(self):
         return EmptyVolume()
 
@@ -411,6 +472,28 @@ class CVDefinedVolume(Volume):
 
         return True
 
+    def _cv_values(self, trajectory):
+        """Values of the CV for all frames, as a float array"""
+        values = self.collectivevariable(_frames(trajectory))
+        try:
+            array = np.asarray(values, dtype=float)
+        except (TypeError, ValueError):
+            array = None
+        if array is None or array.shape != (len(values),):
+            array = np.array([value.__float__() for value in values],
+                             dtype=float)
+        return array
+
+    def evaluate_trajectory(self, trajectory):
+        l = self._cv_values(trajectory)
+        # same tests as in __call__; negated comparisons keep `nan` in
+        result = np.ones(len(l), dtype=bool)
+        if self.lambda_min != float('-inf'):
+            result &= np.logical_not(self.lambda_min > l)
+        if self.lambda_min != float('inf'):
+            result &= np.logical_not(self.lambda_max <= l)
+        return result
+
     def __str__(self):
         return '{{x|{2}(x) in [{0:g}, {1:g}]}}'.format(
             self.lambda_min, self.lambda_max, self.collectivevariable.name)
@@ -454,6 +537,9 @@ class PeriodicCVDefinedVolume(CVDefinedVolume):
                 class MonkeyPatch(type(self)):
                     def __call__(self, *arg, **kwarg):
                         return True
+
+                    def evaluate_trajectory(self, trajectory):
+                        return np.ones(len(trajectory), dtype=bool)
                 self.__class__ = MonkeyPatch
             else:
                 self.lambda_min = self.do_wrap(lambda_min)
@@ -483,6 +569,17 @@ class PeriodicCVDefinedVolume(CVDefinedVolume):
 
             return wrapped
 
+    def _do_wrap_array(self, values):
+        """Array version of :meth:`.do_wrap`"""
+        val = values - self._period_shift
+        positive = values - np.trunc(val / self._period_len) \
+            * self._period_len
+        wrapped = values + np.trunc((self._period_len - val)
+                                    / self._period_len) * self._period_len
+        wrapped = np.where(wrapped >= self._period_len,
+                           wrapped - self._period_len, wrapped)
+        return np.where(val > 0, positive, wrapped)
+
     # next few functions add support for range logic
     def _copy_with_new_range(self, lmin, lmax):
         return PeriodicCVDefinedVolume(self.collectivevariable, lmin, lmax,
@@ -516,6 +613,15 @@ class PeriodicCVDefinedVolume(CVDefinedVolume):
         else:
             return self.lambda_min <= l < self.lambda_max
 
+    def evaluate_trajectory(self, trajectory):
+        l = self._cv_values(trajectory)
+        if self.wrap:
+            l = self._do_wrap_array(l)
+        if self.lambda_min > self.lambda_max:
+            return np.logical_or(l >= self.lambda_min, l < self.lambda_max)
+        else:
+            return np.logical_and(self.lambda_min <= l, l < self.lambda_max)
+
     def __str__(self):
         if self.wrap:
             fcn = 'x|({0}(x) - {2:g}) % {1:g} + {2:g}'.format(